@@ -34,6 +34,7 @@ from neural_compressor.utils.utility import Statistics
 from neural_compressor.experimental.data.dataloaders.base_dataloader import BaseDataLoader
 from neural_compressor.conf.dotdict import deep_get
 from neural_compressor.utils.utility import CpuInfo
+from neural_compressor.utils.calibration_cache import CalibrationCache
 import math
 import sys
 import re
@@ -123,6 +124,8 @@ class ONNXRUNTIMEAdaptor(Adaptor):
             "reduce_range" in framework_specific_info else not CpuInfo().vnni
         self.benchmark = (GLOBAL_STATE.STATE == MODE.BENCHMARK)
         os.makedirs(self.work_space, exist_ok=True)
+        self.calib_cache = CalibrationCache(self.work_space) if \
+            framework_specific_info.get('calibration_cache', False) else None
         self.pre_optimized_model = None
         self.smooth_quant_model = None
         self.quantizable_op_types = []
@@ -515,8 +518,9 @@ class ONNXRUNTIMEAdaptor(Adaptor):
                   data_loader, self.quantizable_op_types, \
                   black_nodes=black_nodes, white_nodes=white_nodes, \
                   iterations=list(range(0, quantize_config['calib_iteration'])),
-                  backend=self.backend, reduce_range=self.reduce_range)
-        self.min_max = augment.dump_minmax()
+                  backend=self.backend, reduce_range=self.reduce_range,
+                  num_workers=self.recipes.get('calibration_workers', 1))
+        self.min_max = augment.dump_minmax(calib_cache=self.calib_cache)
         quantize_params = augment.dump_calibration(quantize_config, min_max=self.min_max)
         return quantize_params
 
@@ -24,7 +24,12 @@
 
 import copy
 import logging
+import os
+import queue
 import sys
+import threading
+
+import psutil
 
 import numpy as np
 import onnx
@@ -36,6 +41,7 @@ from importlib.util import find_spec
 from neural_compressor.model.onnx_model import ONNXModel
 from neural_compressor.adaptor.ox_utils.util import make_dquant_node, is_B_transposed, \
     _get_qrange_for_qType, calculate_scale_zp
+from neural_compressor.adaptor.ox_utils.calibrator import CALIBRATOR
 
 logger = logging.getLogger("neural_compressor")
 ONNX18_VERSION = Version("1.8.0")
@@ -52,7 +58,8 @@ class ONNXRTAugment:
                  white_nodes=[],
                  iterations=[],
                  backend=['CPUExecutionProvider'],
-                 reduce_range=False):
+                 reduce_range=False,
+                 num_workers=1):
         """Initialization.
 
         Args:
@@ -64,6 +71,9 @@ class ONNXRTAugment:
             iterations (list, optional): tensor of which iteration will be collected. Defaults to [].
             backend (list, optional): execution provider for onnxruntime. Defaults to ['CPUExecutionProvider'].
             reduce_range (bool, optional): use 7 bit or not. Defaults to False.
+            num_workers (int, optional): number of inference sessions calibrating shards of the
+                                         dataloader in parallel, each with its share of the
+                                         physical cores as intra-op threads. Defaults to 1.
         """
         self.model_wrapper = model_wrapper
         self.model = model_wrapper.model
@@ -84,6 +94,7 @@ class ONNXRTAugment:
         self.dynamically_quantized = False
         self.ort_version = Version(onnxruntime.__version__)
         self.reduce_range = reduce_range
+        self.num_workers = max(1, num_workers)
 
     def augment_graph(self, activation_only=False, weight_only=False):
         """Augment_graph.
@@ -205,15 +216,57 @@ class ONNXRTAugment:
                             location="weights.pb",
                             convert_attribute=False)
 
-    def get_intermediate_outputs(self, calib_mode=None):
-        """Gather intermediate model outputs after running inference."""
+    def get_intermediate_outputs(self, calib_mode=None, calib_kwargs=None):
+        """Gather intermediate model outputs after running inference.
+
+        Args:
+            calib_mode (str, optional): None to keep the output tensors of every iteration,
+                                        otherwise the method of the calibrator in `CALIBRATOR`
+                                        ('naive' or 'per_channel_percentile')
+                                        which folds each batch into running statistics.
+                                        Defaults to None.
+            calib_kwargs (dict, optional): the kwargs to create the calibrators. Defaults to None.
+
+        Returns:
+            node_output_names (list): the names of the collected tensors
+            output_dicts (dict): key is the tensor name while the value is the list of output
+                                 tensors if calib_mode is None, otherwise the calibrator
+        """
+        if calib_mode is not None and calib_mode not in CALIBRATOR:
+            raise ValueError('Unknown value for calib_mode. Currently only {} modes are ' \
+                             'supported.'.format(', '.join(CALIBRATOR.keys())))
         # conduct inference session and get intermediate outputs
+        num_workers = self.num_workers if calib_mode is not None else 1
+        intra_op_num_threads = 0
+        if num_workers > 1:
+            cores = psutil.cpu_count(logical=False) or os.cpu_count()
+            intra_op_num_threads = max(1, cores // num_workers)
+        sessions = [self._create_session(intra_op_num_threads) for _ in range(num_workers)]
+        inputs_names = [i.name for i in sessions[0].get_inputs()]
+        node_output_names = [output.name if output.name not in self.dequantized_output \
+                                 else self.dequantized_output[output.name] \
+                             for output in sessions[0].get_outputs()]
+
+        if num_workers > 1:
+            output_dicts = self._collect_in_parallel(sessions, inputs_names, node_output_names,
+                                                     calib_mode, calib_kwargs)
+        else:
+            output_dicts = {}
+            for ort_inputs in self._get_ort_inputs(inputs_names):
+                self._collect_outputs(sessions[0].run(None, ort_inputs), node_output_names,
+                                      output_dicts, calib_mode, calib_kwargs)
+
+        return list(output_dicts.keys()), output_dicts
+
+    def _create_session(self, intra_op_num_threads=0):
+        """Create an inference session of the augmented model."""
         so = onnxruntime.SessionOptions()
+        so.intra_op_num_threads = intra_op_num_threads
         if sys.version_info < (3, 10) and find_spec('onnxruntime_extensions'):  # pragma: no cover
             from onnxruntime_extensions import get_library_path
             so.register_custom_ops_library(get_library_path())
 
-        session = onnxruntime.InferenceSession(
+        return onnxruntime.InferenceSession(
                     self.augmented_model.SerializeToString(),
                     so,
                     provider=self.backend) if not self.model_wrapper.is_large_model else \
@@ -222,16 +275,15 @@ class ONNXRTAugment:
                     so,
                     provider=self.backend)
 
-        intermediate_outputs = []
-        len_inputs = len(session.get_inputs())
-        inputs_names = [session.get_inputs()[i].name for i in range(len_inputs)]
-        output_dicts = {}
-
-        node_output_names = [output.name if output.name not in self.dequantized_output \
-                                 else self.dequantized_output[output.name] \
-                             for output in session.get_outputs()]
-
+    def _get_ort_inputs(self, inputs_names):
+        """Yield the feed dicts of the calibration iterations."""
+        len_inputs = len(inputs_names)
         for idx, (inputs, labels) in enumerate(self.dataloader):
+            if self.iterations != []:
+                if idx > max(self.iterations):
+                    break
+                if idx not in self.iterations:
+                    continue
             ort_inputs = {}
             if len_inputs == 1:
                 ort_inputs.update(
@@ -248,27 +300,71 @@ class ONNXRTAugment:
                             ort_inputs.update({inputs_names[i]: np.array(inputs[i])})
                         else:
                             ort_inputs.update({inputs_names[i]: inputs[i]})
-            if self.iterations != []:
-                if idx > max(self.iterations):
+            yield ort_inputs
+
+    def _collect_outputs(self, outputs, node_output_names, output_dicts, calib_mode, calib_kwargs=None):
+        """Append the outputs of one iteration or fold them into the calibrators."""
+        for output_idx, output in enumerate(outputs):
+            if calib_mode is None:
+                output_dicts.setdefault(node_output_names[output_idx], \
+                                        []).append(output)
+            elif output.size != 0:
+                # fold the batch into the running statistics right away
+                if node_output_names[output_idx] not in output_dicts:
+                    output_dicts[node_output_names[output_idx]] = \
+                        CALIBRATOR[calib_mode](**(calib_kwargs or {}))
+                output_dicts[node_output_names[output_idx]].collect(output)
+
+    def _collect_in_parallel(self, sessions, inputs_names, node_output_names, calib_mode,
+                             calib_kwargs=None):
+        """Shard the calibration iterations across sessions and merge the calibrators.
+
+        The dataloader is iterated by the calling thread and the feed dicts are
+        dispatched through a bounded queue to one worker thread per session. Each
+        worker folds its outputs into its own calibrators, which are merged at the end.
+        """
+        batches = queue.Queue(maxsize=2 * len(sessions))
+        shard_dicts = [{} for _ in sessions]
+        errors = []
+
+        def _worker(session, output_dicts):
+            while True:
+                ort_inputs = batches.get()
+                if ort_inputs is None:
                     break
-                if idx in self.iterations:
-                    for output_idx, output in enumerate(session.run(None, ort_inputs)):
-                        if calib_mode == 'naive' and output.size != 0:
-                            output_dicts.setdefault(node_output_names[output_idx], \
-                                                    []).append([output.min(), output.max()])
-                        elif calib_mode == None:
-                            output_dicts.setdefault(node_output_names[output_idx], \
-                                                    []).append(output)
-            else:
-                for output_idx, output in enumerate(session.run(None, ort_inputs)):
-                    if calib_mode == 'naive' and output.size != 0:
-                        output_dicts.setdefault(node_output_names[output_idx], \
-                                                []).append([output.min(), output.max()])
-                    elif calib_mode == None:
-                        output_dicts.setdefault(node_output_names[output_idx], \
-                                                []).append(output)
+                if errors:
+                    continue
+                try:
+                    self._collect_outputs(session.run(None, ort_inputs), node_output_names,
+                                          output_dicts, calib_mode, calib_kwargs)
+                except Exception as e:  # pragma: no cover
+                    errors.append(e)
+
+        workers = [threading.Thread(target=_worker, args=(session, output_dicts), daemon=True) \
+                   for session, output_dicts in zip(sessions, shard_dicts)]
+        for worker in workers:
+            worker.start()
+        try:
+            for ort_inputs in self._get_ort_inputs(inputs_names):
+                if errors:
+                    break
+                batches.put(ort_inputs)
+        finally:
+            for _ in workers:
+                batches.put(None)
+            for worker in workers:
+                worker.join()
+        if errors:
+            raise errors[0]
 
-        return list(output_dicts.keys()), output_dicts
+        output_dicts = {}
+        for shard_dict in shard_dicts:
+            for name, calibrator in shard_dict.items():
+                if name not in output_dicts:
+                    output_dicts[name] = calibrator
+                else:
+                    output_dicts[name].merge(calibrator)
+        return output_dicts
 
     def _dequantize(self, tensor, scale_tensor, zo_tensor):
         """Helper function to dequantize tensor."""
@@ -351,35 +447,54 @@ class ONNXRTAugment:
 
     def _map_calibration(self, node_output_names, output_dicts, calib_mode='naive'):
         """Map tensor names and min/max values."""
-        merged_dict = {}
-        for name, minmaxs in output_dicts.items():
-            for minmax in minmaxs:
-                merged_dict.setdefault(name + '_Min', []).append(minmax[0])
-                merged_dict.setdefault(name + '_Max', []).append(minmax[1])
-
-        # Characterizing distribution of a node's values across test data sets
-        clean_merged_dict = dict((i, merged_dict[i]) for i in merged_dict)
-        if calib_mode == 'naive':
-            pairs = [
-                tuple([
-                    float(min(clean_merged_dict[name + '_Min'])),
-                    float(max(clean_merged_dict[name + '_Max']))
-                ]) for name in node_output_names
-            ]
-        else:
-            raise ValueError('Unknown value for calib_mode. \
-                             Currently only naive mode is supported.')
+        if calib_mode not in CALIBRATOR:
+            raise ValueError('Unknown value for calib_mode. Currently only {} modes are ' \
+                             'supported.'.format(', '.join(CALIBRATOR.keys())))
 
-        final_dict = dict(zip(node_output_names, pairs))
+        final_dict = {}
+        for name in node_output_names:
+            if name not in output_dicts or output_dicts[name].calib_range is None:
+                continue
+            rmin, rmax = output_dicts[name].calib_range
+            final_dict[name] = (float(rmin), float(rmax))
 
         return final_dict
 
-    def dump_minmax(self, calib_mode='naive'):
-        """Get min/max values of tensors."""
+    def dump_minmax(self, calib_mode='naive', calib_cache=None):
+        """Get min/max values of tensors.
+
+        Args:
+            calib_mode (str, optional): the method of the calibrator in `CALIBRATOR`. Defaults to 'naive'.
+            calib_cache (CalibrationCache, optional): cache of the min/max values keyed by the model,
+                                                      the dataloader and the calibration iterations.
+                                                      The inference is skipped if the cache covers all
+                                                      the tensors to calibrate. Defaults to None.
+        """
         self.augment_graph()
+        if calib_cache is None:
+            node_output_names, output_dicts = self.get_intermediate_outputs(calib_mode)
+            return self._map_calibration(node_output_names, output_dicts,
+                                         calib_mode=calib_mode)
+
+        if self.model_wrapper.is_large_model:  # pragma: no cover
+            # models larger than 2GB can't be serialized, identify them by path and mtime
+            fingerprint = '{}:{}'.format(self.model_wrapper.model_path,
+                                         os.path.getmtime(self.model_wrapper.model_path))
+        else:
+            fingerprint = self.model.SerializeToString(deterministic=True)
+        key = calib_cache.get_key(fingerprint, self.dataloader, (calib_mode, self.iterations))
+        cached = calib_cache.load(key) or {}
+        tensor_names = [self.dequantized_output.get(output.name, output.name) \
+                        for output in self.augmented_model.graph.output]
+        if all(name in cached for name in tensor_names):
+            return {name: cached[name] for name in tensor_names if cached[name] is not None}
+
         node_output_names, output_dicts = self.get_intermediate_outputs(calib_mode)
-        return self._map_calibration(node_output_names, output_dicts,
-                                     calib_mode=calib_mode)
+        min_max = self._map_calibration(node_output_names, output_dicts, calib_mode=calib_mode)
+        # tensors without values are cached as None so they don't trigger a new calibration
+        cached.update({name: min_max.get(name) for name in tensor_names})
+        calib_cache.save(key, cached)
+        return min_max
 
     def dump_calibration(self, q_config, calib_mode='naive', min_max=None):
         """Gather calibration params for quantization.
@@ -595,35 +710,6 @@ class ONNXRTAugment:
                     tensors_to_dump.add(node.input[0])
         return tensors_to_dump
 
-    def _get_max_per_channel(self, datas: list, percentile):
-        """Get the max values per input channel.
-
-        Args:
-            datas: The tensors
-            percentile: percentile of calibration to remove outliers
-
-        Returns:
-            The max values per input channel
-        """
-        permute_datas = []
-        for data in datas:
-            if len(data.shape) == 3:  # TODO  mammul batchsize*seq*inchannel, conv:batchsize*inchannle*f*f
-                tensor = np.abs(np.reshape(data, (-1, data.shape[-1])))
-                permute_datas.append(tensor)
-            elif len(data.shape) == 4:
-                tensor = np.swapaxes(data, 1, -1)
-                tensor = np.abs(np.reshape(tensor, (-1, tensor.shape[-1])))
-                permute_datas.append(tensor)
-            elif len(data.shape) == 2:
-                permute_datas.append(np.abs(data))
-            else:
-                assert False, "not supported"
-        permute_datas = np.stack(permute_datas, axis=0)
-        permute_datas = permute_datas.reshape(-1, permute_datas.shape[-1])
-        max_per_channels = np.percentile(permute_datas, percentile, axis=0)
-        max_per_channels = max_per_channels.astype(np.single)
-        return max_per_channels
-
     def calib_smooth(self, percentile, op_types):
         """Smooth model calibration.
 
@@ -641,14 +727,17 @@ class ONNXRTAugment:
         tensors_to_dump = self._get_input_tensor_of_ops(op_types)
         self.model_wrapper.add_tensors_to_outputs(tensors_to_dump)
         self.augmented_model = self.model_wrapper.model
-        _, output_dicts = self.get_intermediate_outputs()
+        # estimate the percentile per channel batch by batch instead of keeping all the tensors
+        _, output_dicts = self.get_intermediate_outputs('per_channel_percentile',
+                                                        {'percentile': percentile})
 
         # remove the input tensors of {op_types} to outputs of the model
         self.model_wrapper.remove_tensors_from_outputs(tensors_to_dump)
         max_vals_per_channel = {}
         shape_infos = {}
         for key in tensors_to_dump:
-            max_val_per_channel = self._get_max_per_channel(output_dicts[key], percentile=percentile)
-            max_vals_per_channel[key] = max_val_per_channel
-            shape_infos[key] = output_dicts[key][0].shape
+            assert output_dicts[key].max_per_channel is not None, \
+                "The shape {} of tensor {} is not supported.".format(output_dicts[key].shape, key)
+            max_vals_per_channel[key] = output_dicts[key].max_per_channel
+            shape_infos[key] = output_dicts[key].shape
         return max_vals_per_channel, shape_infos
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Streaming calibrators which fold each batch of tensor values into running statistics."""
+
+import numpy as np
+
+CALIBRATOR = {}
+
+def calib_registry(calib_method):
+    """The class decorator used to register all Calibrator subclasses."""
+    def decorator_calib(cls):
+        assert cls.__name__.endswith(
+            'Calibrator'), "The name of subclass of Calibrator should end with \'Calibrator\' substring."
+        if calib_method in CALIBRATOR: # pragma: no cover
+            raise ValueError('Cannot have two calibrators with the same method.')
+        CALIBRATOR[calib_method] = cls
+        return cls
+    return decorator_calib
+
+
+class CalibratorBase(object):
+    """Base calibrator.
+
+    A calibrator observes the values of one tensor batch by batch and only keeps
+    the statistics needed to derive its calibration range, so memory usage is
+    independent of the number of calibration iterations.
+    """
+
+    def __init__(self):
+        """Initialization."""
+        self._calib_min = None
+        self._calib_max = None
+
+    def collect(self, datas):
+        """Fold one batch of tensor values into the running statistics."""
+        datas = np.asarray(datas)
+        if datas.size == 0:
+            return
+        self._collect(datas)
+
+    def _collect(self, datas):
+        """Update the running statistics with a non-empty array."""
+        raise NotImplementedError
+
+    def merge(self, other):
+        """Merge the statistics collected by another calibrator of the same type."""
+        if other.calib_range is not None:
+            self._update_min_max(np.array([other._calib_min, other._calib_max]))
+
+    def clear(self):
+        """Clear the collected statistics."""
+        self._calib_min = None
+        self._calib_max = None
+
+    def _update_min_max(self, datas):
+        """Update the running min/max values."""
+        self._calib_min = np.min(datas) if self._calib_min is None else \
+            np.minimum(self._calib_min, np.min(datas))
+        self._calib_max = np.max(datas) if self._calib_max is None else \
+            np.maximum(self._calib_max, np.max(datas))
+
+    @property
+    def calib_range(self):
+        """Get the calibration range as (min, max), None if nothing was collected."""
+        if self._calib_min is None:
+            return None
+        return self._calib_min, self._calib_max
+
+
+@calib_registry(calib_method='naive')
+class MinMaxCalibrator(CalibratorBase):
+    """Calibrator which keeps the running min/max values."""
+
+    def _collect(self, datas):
+        """Update the running min/max values."""
+        self._update_min_max(datas)
+
+
+def _rebin(hist, width, new_width):
+    """Re-bin the per-channel histograms into bins of new_width, which is no less than width.
+
+    Each bin is moved into the new bin covering its center, which is exact if the widths of
+    each channel are equal or the new width is a power of two multiple of the old one.
+    """
+    channels, num_bins = hist.shape
+    ratio = np.divide(width, new_width, out=np.zeros_like(width), where=new_width > 0)
+    indices = np.minimum(np.floor((np.arange(num_bins) + 0.5) * ratio[:, None]).astype(np.int64),
+                         num_bins - 1)
+    indices += np.arange(channels)[:, None] * num_bins
+    return np.bincount(indices.ravel(), weights=hist.ravel(),
+                       minlength=channels * num_bins).reshape(channels, num_bins)
+
+
+@calib_registry(calib_method='per_channel_percentile')
+class PerChannelPercentileCalibrator(CalibratorBase):
+    """Calibrator which estimates a percentile of the absolute values of each input channel.
+
+    The input channel is the 2nd dim of 4-D tensors, e.g. the input of Conv, and the last dim
+    of others, e.g. the input of MatMul. A histogram of absolute values is kept per channel,
+    and the bin width of a channel is doubled by merging pairs of bins whenever a batch exceeds
+    its range, so memory usage only depends on the channels and bins while each batch is
+    folded in linear time.
+    """
+
+    def __init__(self, num_bins=2048, percentile=99.999):
+        """Initialization.
+
+        Args:
+            num_bins (int, optional): number of bins of the histogram per channel. Defaults to 2048.
+            percentile (float, optional): percentile of absolute values to keep. Defaults to 99.999.
+        """
+        super().__init__()
+        self.num_bins = num_bins
+        self.percentile = percentile
+        self.clear()
+
+    @staticmethod
+    def _to_channels(datas):
+        """Get the absolute values as an array of shape (-1, channels)."""
+        if datas.ndim == 4:
+            datas = np.swapaxes(datas, 1, -1)
+        return np.abs(datas.reshape(-1, datas.shape[-1] if datas.ndim > 0 else 1))
+
+    def _collect(self, datas):
+        """Update the running min/max values and the per-channel histograms."""
+        self._update_min_max(datas)
+        if self.shape is None:
+            self.shape = datas.shape
+        if not self.per_channel:
+            return
+        datas = self._to_channels(datas)
+        channels, num_bins = datas.shape[-1], self.num_bins
+        if self._histogram is None:
+            self._histogram = np.zeros((channels, num_bins))
+            self._width = np.zeros(channels)
+            self._max = np.zeros(channels)
+        elif channels != len(self._width):
+            self._disable_per_channel()
+            return
+        batch_max = np.max(datas, axis=0).astype(np.float64)
+        grow = batch_max > self._width * num_bins
+        if np.any(grow):
+            width, max_val = self._width[grow], batch_max[grow]
+            safe_width = np.where(width > 0, width, 1.)
+            new_width = np.where(width > 0,
+                                 width * 2. ** np.ceil(np.log2(max_val / (safe_width * num_bins))),
+                                 max_val / num_bins)
+            self._histogram[grow] = _rebin(self._histogram[grow], width, new_width)
+            self._width[grow] = new_width
+        self._max = np.maximum(self._max, batch_max)
+        safe_width = np.where(self._width > 0, self._width, 1.)
+        indices = np.minimum((datas / safe_width).astype(np.int64), num_bins - 1)
+        indices += np.arange(channels) * num_bins
+        self._histogram += np.bincount(indices.ravel(),
+                                       minlength=channels * num_bins).reshape(channels, num_bins)
+
+    def merge(self, other):
+        """Merge the statistics collected by another calibrator of the same type.
+
+        The histograms of each channel are re-binned into the larger bin width of the two.
+        """
+        if other.shape is None:
+            return
+        super().merge(other)
+        if self.shape is None:
+            self.shape, self.per_channel = other.shape, other.per_channel
+            if other.per_channel:
+                self._histogram = other._histogram.copy()
+                self._width, self._max = other._width.copy(), other._max.copy()
+        elif not (self.per_channel and other.per_channel and len(self._width) == len(other._width)):
+            self._disable_per_channel()
+        else:
+            width = np.maximum(self._width, other._width)
+            self._histogram = _rebin(self._histogram, self._width, width) + \
+                _rebin(other._histogram, other._width, width)
+            self._width, self._max = width, np.maximum(self._max, other._max)
+
+    def _disable_per_channel(self):
+        """Only keep the min/max values for tensors whose channels change, which aren't inputs of SmoothQuant ops."""
+        self.per_channel = False
+        self._histogram = self._width = self._max = None
+
+    def clear(self):
+        """Clear the collected statistics."""
+        super().clear()
+        self.shape = None
+        self.per_channel = True
+        self._histogram = None
+        self._width = None
+        self._max = None
+
+    def _order_statistic(self, cdf, rank):
+        """Estimate the value of the given 0-based rank per channel, assuming the values spread evenly in bins."""
+        indices = np.argmax(cdf > rank[:, None], axis=1)
+        channels = np.arange(len(indices))
+        lower = np.where(indices > 0, cdf[channels, indices - 1], 0.)
+        count = self._histogram[channels, indices]
+        fraction = np.divide(rank - lower + 0.5, count, out=np.zeros_like(rank), where=count > 0)
+        return (indices + fraction) * self._width
+
+    @property
+    def max_per_channel(self):
+        """Get the percentile of the absolute values per channel, None if unavailable.
+
+        The percentile is linearly interpolated between the two nearest ranks as `np.percentile`.
+        """
+        if self._histogram is None:
+            return None
+        if self.percentile >= 100:
+            return self._max.astype(np.single)
+        cdf = np.cumsum(self._histogram, axis=1)
+        rank = (cdf[:, -1] - 1) * self.percentile / 100.
+        lower_rank = np.floor(rank)
+        upper_rank = np.minimum(lower_rank + 1, cdf[:, -1] - 1)
+        lower_val = self._order_statistic(cdf, lower_rank)
+        upper_val = self._order_statistic(cdf, upper_rank)
+        value = lower_val + (rank - lower_rank) * (upper_val - lower_val)
+        return np.minimum(value, self._max).astype(np.single)
@@ -28,9 +28,11 @@ from .adaptor import adaptor_registry, Adaptor
 from ..utils.utility import LazyImport, CpuInfo, GLOBAL_STATE, MODE
 from ..utils.utility import Statistics
 from ..utils import logger
+from ..utils.calibration_cache import CalibrationCache
 from .query import QueryBackendCapability
 from ..data.dataloaders.base_dataloader import BaseDataLoader
 from .torch_utils.smooth_quant import TorchSmoothQuant
+from .torch_utils.observer_stats import ObserverStats
 torch = LazyImport("torch")
 json = LazyImport("json")
 hvd = LazyImport("horovod.torch")
@@ -767,6 +769,8 @@ class TemplateAdaptor(Adaptor):
         self.q_func = framework_specific_info.get('q_func', None)
         self.benchmark = (GLOBAL_STATE.STATE == MODE.BENCHMARK)
         self.workspace_path = framework_specific_info['workspace_path']
+        self.calib_cache = CalibrationCache(self.workspace_path) if \
+            framework_specific_info.get('calibration_cache', False) else None
         self.is_baseline = False if GLOBAL_STATE.STATE == MODE.BENCHMARK else True
         self.query_handler = None
         self.approach = ''
@@ -873,6 +877,40 @@ class TemplateAdaptor(Adaptor):
 
                 self.calib_func(q_model, dataloader, iterations, conf)
 
+    def cached_model_calibration(self,
+                                 q_model,
+                                 dataloader,
+                                 iterations=1,
+                                 conf=None,
+                                 calib_sampling_size=1):
+        """Calibrate the model, or restore the observer statistics from the calibration cache.
+
+        The observer statistics are cached by the prepared model structure, its weights,
+        the dataloader and the calibration iterations.
+        """
+        if self.calib_cache is None:
+            return self.model_calibration(q_model, dataloader, iterations, conf,
+                                          calib_sampling_size)
+        observers = OrderedDict((name, module) for name, module in q_model.named_modules() \
+                                if isinstance(module, torch.quantization.ObserverBase))
+        weights = {name: tensor for name, tensor in q_model.state_dict().items() \
+                   if name.rpartition('.')[0] not in observers}
+        key = self.calib_cache.get_key([str(q_model), getattr(q_model, 'code', ''), weights],
+                                       dataloader, (iterations, calib_sampling_size))
+        stats = self.calib_cache.load(key)
+        if stats is not None and list(stats.keys()) == list(observers.keys()):
+            try:
+                for name, state_dict in stats.items():
+                    observers[name].load_state_dict(state_dict)
+                return
+            except Exception as e:  # pragma: no cover
+                logger.warning("Fail to restore the cached observer statistics due to {}, "
+                               "calibrate the model instead.".format(e))
+        self.model_calibration(q_model, dataloader, iterations, conf, calib_sampling_size)
+        self.calib_cache.save(key, OrderedDict(
+            (name, {k: v.cpu() for k, v in observer.state_dict().items()}) \
+            for name, observer in observers.items()))
+
     def eval_func(self, model, dataloader, postprocess, metrics, measurer, iteration, conf=None):
         results = []
         try:
@@ -1277,6 +1315,8 @@ class PyTorchAdaptor(TemplateAdaptor):
         self.fused_dict = {}
 
         self.optype_statistics = None
+        # the activation statistics reused by the tune_cfgs of the same calibration data
+        self.observer_stats = ObserverStats()
 
     @dump_elapsed_time("Pass quantize model")
     def quantize(self, tune_cfg, model, dataloader, q_func=None):
@@ -1337,10 +1377,19 @@ class PyTorchAdaptor(TemplateAdaptor):
             add_observer_(q_model._model)
             if q_func is None:
                 iterations = tune_cfg.get('calib_iteration', 1)
-                self.model_calibration(q_model._model,
-                                       dataloader,
-                                       iterations,
-                                       calib_sampling_size=tune_cfg.get('calib_sampling_size', 1))
+                calib_sampling_size = tune_cfg.get('calib_sampling_size', 1)
+                if self.performance_only:
+                    self.cached_model_calibration(q_model._model, dataloader, iterations,
+                                                  calib_sampling_size=calib_sampling_size)
+                else:
+                    observers = OrderedDict((name, module) for name, module in \
+                        q_model._model.named_modules() if isinstance(module, torch.quantization.ObserverBase))
+                    key = ObserverStats.get_key(model._model, dataloader, iterations, calib_sampling_size)
+                    if not self.observer_stats.restore(key, observers):
+                        # collect the statistics of both minmax and kl for the later tune_cfgs
+                        with self.observer_stats.collect(key, observers):
+                            self.cached_model_calibration(q_model._model, dataloader, iterations,
+                                                          calib_sampling_size=calib_sampling_size)
             else:
                 q_func(q_model._model)
         elif self.approach == 'quant_aware_training':
@@ -3073,7 +3122,7 @@ class PyTorch_FXAdaptor(TemplateAdaptor):
                 if q_func is not None:
                     q_func(q_model._model)
                 else:
-                    self.model_calibration(
+                    self.cached_model_calibration(
                         q_model._model,
                         dataloader,
                         iterations,
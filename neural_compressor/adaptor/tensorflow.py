@@ -29,6 +29,7 @@ from ..utils.utility import LazyImport, CpuInfo, singleton, Dequantize, dump_ela
 from ..utils.utility import Statistics, GLOBAL_STATE, MODE
 from ..utils.utility import version1_lt_version2, version1_gte_version2, version1_eq_version2
 from ..utils import logger
+from ..utils.calibration_cache import CalibrationCache
 from ..conf.dotdict import deep_get
 from ..data.dataloaders.base_dataloader import BaseDataLoader
 
@@ -77,6 +78,12 @@ class TensorFlowAdaptor(Adaptor):
         self.backend = self.framework_specific_info['backend']
         self.format = self.framework_specific_info['format']
         os.makedirs(self.work_dir, exist_ok=True)
+        self.calib_cache = CalibrationCache(self.work_dir) if \
+            self.framework_specific_info.get('calibration_cache', False) else None
+        from .tf_utils.pre_optimize_cache import PreOptimizeCache
+        # the pre-optimized graphs are cached, in the workspace and memory, only along with the calibration cache
+        self.pre_optimize_cache = PreOptimizeCache(self.work_dir if \
+            self.framework_specific_info.get('calibration_cache', False) else None)
 
         self.model = None
         self.pre_optimized_model = None
@@ -575,7 +582,8 @@ class TensorFlowAdaptor(Adaptor):
                                         qdq_enabled=self.qdq_enabled,
                                         new_api=self.new_api,
                                         performance_only = self.performance_only,
-                                        use_bf16=self.use_bf16).convert()
+                                        use_bf16=self.use_bf16,
+                                        calib_cache=self.calib_cache).convert()
             except Exception: # pragma: no cover
                 from .tf_utils.util import get_model_input_shape
                 batch_size = get_model_input_shape(model)
@@ -594,7 +602,8 @@ class TensorFlowAdaptor(Adaptor):
                                         qdq_enabled=self.qdq_enabled,
                                         new_api=self.new_api,
                                         performance_only = self.performance_only,
-                                        use_bf16=self.use_bf16).convert()
+                                        use_bf16=self.use_bf16,
+                                        calib_cache=self.calib_cache).convert()
         else: # pragma: no cover
             if hasattr(data_loader, 'batch_size') and \
               calib_sampling_size % data_loader.batch_size != 0:
@@ -615,7 +624,8 @@ class TensorFlowAdaptor(Adaptor):
                                 qdq_enabled=self.qdq_enabled,
                                 new_api=self.new_api,
                                 performance_only = self.performance_only,
-                                use_bf16=self.use_bf16).convert()
+                                use_bf16=self.use_bf16,
+                                calib_cache=self.calib_cache).convert()
         #just save framework_specific_info feature for recover
         converted_model.q_config.update({'framework_specific_info': \
                                             self.framework_specific_info})
@@ -864,19 +874,31 @@ class TensorFlowAdaptor(Adaptor):
         """
         from .tf_utils.graph_rewriter.generic.pre_optimize import PreOptimization
 
-        self.pre_optimizer_handle = PreOptimization(model, self.new_api, self.device)
-
-        self.pre_optimized_model = self.pre_optimizer_handle.get_optimized_model(self.itex_mode)
+        key, entry = self._pre_optimize(model)
         model.graph_def = self.pre_optimized_model.graph_def
-
-        self.exclude_node_names = self.pre_optimizer_handle.get_excluded_node_names()
+        if 'capability' in entry:
+            for name, value in entry['capability_state'].items():
+                setattr(self, name, copy.deepcopy(value))
+            self.quantize_config['op_wise_config'].update(
+                copy.deepcopy(entry['op_wise_config']))
+            capability = copy.deepcopy(entry['capability'])
+            logger.debug("Dump framework quantization capability:")
+            logger.debug(capability)
+            return capability
+
+        if self.pre_optimizer_handle is None:
+            # the pre-optimized graph is from the cache, match the patterns on it
+            self.pre_optimizer_handle = PreOptimization(
+                self.pre_optimized_model, self.new_api, self.device)
+
+        self.exclude_node_names = list(entry['excluded_node_names'])
         patterns = self.query_handler.generate_internal_patterns()
         bf16_patterns = self.query_handler.get_bf16_patterns()
         matched_nodes = self.pre_optimizer_handle.get_matched_nodes(patterns)
         matched_bf16_nodes = self.pre_optimizer_handle.get_matched_nodes(bf16_patterns)
-        original_graph_node_name = [i.name for i in model.graph_def.node]
+        node_index = {node.name: index for index, node in enumerate(model.graph_def.node)}
         matched_nodes = sorted(matched_nodes, reverse=True, key=lambda i: (
-            original_graph_node_name.index(i[0]), len(i[-1])))
+            node_index[i[0]], len(i[-1])))
 
         def check_match(patterns, input_pattern):
             for i in patterns:
@@ -919,8 +941,47 @@ class TensorFlowAdaptor(Adaptor):
         logger.debug("Dump framework quantization capability:")
         logger.debug(capability)
 
+        entry['capability'] = copy.deepcopy(capability)
+        entry['capability_state'] = {name: copy.deepcopy(getattr(self, name)) for name in \
+            ('exclude_node_names', 'quantizable_op_details', 'bf16_op_details', 'recipes_ops',
+             '_init_op_stat')}
+        entry['op_wise_config'] = copy.deepcopy(self.quantize_config['op_wise_config'])
+        self.pre_optimize_cache.save(key, entry)
         return capability
 
+    def _pre_optimize(self, model):
+        """Pre-optimize the model, the pre-optimized graph is reused from the cache if any.
+
+        Args:
+            model (tf.compat.v1.GraphDef): the fp32 model.
+
+        Returns:
+            tuple: the cache key and the cache entry of the model.
+        """
+        from .tf_utils.graph_rewriter.generic.pre_optimize import PreOptimization
+
+        # the capability query cached along with the graph depends on the setting as well
+        key = self.pre_optimize_cache.get_key(
+            model.graph_def, adaptor=type(self).__name__, new_api=self.new_api,
+            device=self.device, itex_mode=self.itex_mode, performance_only=self.performance_only,
+            recipes=repr(self.recipes), input_node_names=model.input_node_names,
+            output_node_names=model.output_node_names, bf16=CpuInfo().bf16,
+            force_bf16=os.getenv('FORCE_BF16'), force_concat=os.getenv('TF_FORCE_CONCAT_OPTS'))
+        entry = self.pre_optimize_cache.load(key)
+        if entry is not None:
+            graph_def = tensorflow.compat.v1.GraphDef()
+            graph_def.ParseFromString(entry['graph_def'])
+            self.pre_optimizer_handle = None
+            self.pre_optimized_model = PreOptimization.copy_model(model, graph_def)
+            return key, entry
+
+        self.pre_optimizer_handle = PreOptimization(model, self.new_api, self.device)
+        self.pre_optimized_model = self.pre_optimizer_handle.get_optimized_model(self.itex_mode)
+        entry = {'graph_def': self.pre_optimized_model.graph_def.SerializeToString(),
+                 'excluded_node_names': list(self.pre_optimizer_handle.get_excluded_node_names())}
+        self.pre_optimize_cache.save(key, entry)
+        return key, entry
+
     def set_tensor(self, model, tensor_dict):
         """Quantize the bias and weight tensors in tensor_dict."""
         from .tf_utils.graph_util import GraphAnalyzer
@@ -1494,9 +1555,7 @@ class TensorFlowAdaptor(Adaptor):
         Returns:
             tf.compat.v1.GraphDef: the quantized model
         """
-        from .tf_utils.graph_rewriter.generic.pre_optimize import PreOptimization
-        self.pre_optimizer_handle = PreOptimization(model, self.new_api, self.device)
-        self.pre_optimized_model = self.pre_optimizer_handle.get_optimized_model(self.itex_mode)
+        self._pre_optimize(model)
         model.graph_def = self.pre_optimized_model.graph_def
 
         from .tf_utils.graph_converter_without_calib import GraphConverterWithoutCalib
@@ -1563,6 +1622,8 @@ class TensorFlowAdaptor(Adaptor):
           1. Backup the tune cfg
           2. Fallback each int8 op and compute its mse if use fallback (with 'fallback == True'),
             or re-quantize each fp32 op(fallen back in the previous stage) and compute its MSE if not.
+            The MSE is estimated from a single quantized model if the boundary tensors of the ops
+            are found in it.
           3. Sorted op name list according to its MSE
         
         Args:
@@ -1592,7 +1653,7 @@ class TensorFlowAdaptor(Adaptor):
         # Step2. compute mse
         mse_result = self._get_mse_order(
             model, deepcopy(tune_cfg), replace_cfgs, ops_list, dataloader, 
-            output_op_names, confidence_batches)
+            output_op_names, confidence_batches, fallback)
 
         # Step3. sort
         mse_order = [op for op, _ in sorted(mse_result.items(), key=lambda i: i[1])]
@@ -1602,12 +1663,25 @@ class TensorFlowAdaptor(Adaptor):
         return mse_order
 
     def _get_mse_order(self, fp32_model, tune_cfg, replace_cfgs, ops_lst, dataloader, 
-                       output_op_names, confidence_batches):
-        """Compute MSE."""
+                       output_op_names, confidence_batches, fallback=True):
+        """Compute MSE.
+
+        The MSE of the ops is estimated from a single quantized model if the boundary tensors
+        of all the ops are found, otherwise each op is replaced and quantized one by one.
+        """
         op_cfg = tune_cfg['op']
         mse_result = {}
         partial_dataloader = self._partial_dataloader(dataloader, confidence_batches)
-        
+
+        if ops_lst:
+            mse_result = self._estimate_mse_order(fp32_model, tune_cfg, replace_cfgs, ops_lst,
+                                                  partial_dataloader, output_op_names, fallback)
+            if mse_result is not None:
+                return mse_result
+            logger.debug("Fail to find the boundary tensors of the ops, " \
+                         "quantize the model for each op to compute the MSE.")
+            mse_result = {}
+
         fp32_output = self._inference_model_on_batches(
             fp32_model, tune_cfg, partial_dataloader, output_op_names)
 
@@ -1628,6 +1702,142 @@ class TensorFlowAdaptor(Adaptor):
 
         return mse_result
 
+    def _estimate_mse_order(self, fp32_model, tune_cfg, replace_cfgs, ops_lst, dataloader,
+                            output_op_names, fallback=True):
+        """Estimate MSE from a single quantized model.
+
+        The model is quantized once, with all the ops re-quantized in the re-quantize stage. The
+        float tensors in both the fp32 and the quantized model, i.e. the outputs of the fp32 ops
+        and of the Dequantize ops named after the fp32 ops they replace, are fetched in the same
+        inference of the fp32 and the quantized model as the outputs. The contribution of an op
+        is the increase of the relative quantization error from its input boundary tensors to
+        its output boundary tensors, and the output MSE is split over the ops by it: the larger
+        the contribution, the lower the MSE after the op falls back, and the higher the MSE
+        after the op is re-quantized.
+
+        Returns:
+            dict: the estimated MSE of each op, None if any boundary tensor is missing.
+        """
+        from .tf_utils.util import generate_feed_dict
+
+        q_tune_cfg = copy.deepcopy(tune_cfg)
+        if not fallback:
+            for op in ops_lst:
+                q_tune_cfg['op'][op] = replace_cfgs[op]
+        q_model = self.quantize(q_tune_cfg, fp32_model, dataloader)
+        boundaries = self._get_boundary_tensors(fp32_model.graph_def, q_model.graph_def, ops_lst)
+        if boundaries is None:
+            return None
+
+        tensor_names = sorted(set(name for inputs, outputs in boundaries.values() \
+                                  for name in inputs + outputs))
+
+        def _get_fetches(model):
+            fetches = [model.graph.get_tensor_by_name(name + ':0') for name in tensor_names]
+            for op in output_op_names:
+                fetches.extend(model.graph.get_operation_by_name(op).outputs)
+            return fetches
+
+        fp32_fetches, q_fetches = _get_fetches(fp32_model), _get_fetches(q_model)
+        # the squared error and the squared fp32 value of the boundary tensors
+        noise = dict.fromkeys(tensor_names, 0.)
+        signal = dict.fromkeys(tensor_names, 0.)
+        fp32_output, q_output = [], []
+        for inputs, _ in dataloader:
+            fp32_pred = fp32_model.sess.run(fp32_fetches,
+                                            generate_feed_dict(fp32_model.input_tensor, inputs))
+            q_pred = q_model.sess.run(q_fetches, generate_feed_dict(q_model.input_tensor, inputs))
+            for name, fp32_value, q_value in zip(tensor_names, fp32_pred, q_pred):
+                if fp32_value.shape != q_value.shape or \
+                        not np.issubdtype(fp32_value.dtype, np.floating):
+                    return None
+                fp32_value = fp32_value.astype(np.float64)
+                noise[name] += np.square(q_value - fp32_value).sum()
+                signal[name] += np.square(fp32_value).sum()
+            fp32_output.extend(fp32_pred[len(tensor_names):])
+            q_output.extend(q_pred[len(tensor_names):])
+
+        relative_error = {name: noise[name] / max(signal[name], 1e-12) for name in tensor_names}
+        contribution = {}
+        for op in ops_lst:
+            inputs, outputs = boundaries[op]
+            if not outputs:
+                contribution[op] = 0.
+                continue
+            input_error = max([relative_error[name] for name in inputs], default=0.)
+            contribution[op] = max(0., max(relative_error[name] for name in outputs) - input_error)
+
+        mse = self._calculate_mse(fp32_output, q_output)
+        total = sum(contribution.values())
+        mse_result = {}
+        for op in ops_lst:
+            ratio = contribution[op] / total if total > 0 else 0.
+            mse_result[op] = mse * (1. - ratio) if fallback else mse * ratio
+        return mse_result
+
+    def _get_boundary_tensors(self, fp32_graph_def, q_graph_def, ops_lst):
+        """Get the input and output boundary tensors of the ops.
+
+        A boundary tensor is a float tensor of a node in both the fp32 and the quantized graph.
+        The output boundary tensors of an op are the nearest ones from the op to the outputs,
+        the input boundary tensors are the nearest ones from the inputs of the op to the inputs.
+        An op not quantized in the quantized graph has no boundary tensors.
+
+        Returns:
+            dict: op -> (input tensor names, output tensor names), None if the output boundary
+                  tensors of a quantized op aren't found.
+        """
+        from collections import deque
+        from .tf_utils.util import int8_node_name_reverse
+        from .tf_utils.graph_util import GraphRewriterHelper as Helper
+
+        fp32_nodes = {node.name: node for node in fp32_graph_def.node}
+        q_nodes = {node.name: node for node in q_graph_def.node}
+        quantized_names = set(int8_node_name_reverse(node) for node in q_graph_def.node \
+                              if 'Quantized' in node.op)
+        inputs, outputs = {}, {}
+        for node in fp32_graph_def.node:
+            inputs[node.name] = [Helper.node_name_from_input(name) for name in node.input \
+                                 if not name.startswith('^')]
+            for input_name in inputs[node.name]:
+                outputs.setdefault(input_name, []).append(node.name)
+
+        float_type = tensorflow.float32.as_datatype_enum
+
+        def _is_boundary(name):
+            q_node = q_nodes.get(name)
+            if q_node is None or name not in fp32_nodes or fp32_nodes[name].op == 'Const':
+                return False
+            if q_node.op == 'Dequantize':
+                return True
+            return 'Quantize' not in q_node.op and fp32_nodes[name].attr['T'].type == float_type
+
+        def _search(start_names, next_names):
+            boundary_names = []
+            visited, queue = set(start_names), deque(start_names)
+            while queue:
+                name = queue.popleft()
+                if _is_boundary(name):
+                    boundary_names.append(name)
+                    continue
+                for next_name in next_names.get(name, []):
+                    if next_name not in visited:
+                        visited.add(next_name)
+                        queue.append(next_name)
+            return boundary_names
+
+        boundaries = {}
+        for op in ops_lst:
+            op_name = op[0]
+            if op_name not in quantized_names or op_name not in fp32_nodes:
+                boundaries[op] = ([], [])
+                continue
+            output_names = _search([op_name], outputs)
+            if not output_names:
+                return None
+            boundaries[op] = (_search(inputs[op_name], inputs), output_names)
+        return boundaries
+
     def _partial_dataset_of(self, dataloader, confidence_batches):
         """Partial dataset."""
         from neural_compressor.experimental.data.datasets.dummy_dataset import DummyDataset
@@ -1740,7 +1950,8 @@ class Tensorflow_ITEXAdaptor(TensorFlowAdaptor):
                                     qdq_enabled=self.qdq_enabled,
                                     new_api=self.new_api,
                                     performance_only = self.performance_only,
-                                    use_bf16=self.use_bf16).convert()
+                                    use_bf16=self.use_bf16,
+                                    calib_cache=self.calib_cache).convert()
             except Exception: # pragma: no cover
                 from .tf_utils.util import get_model_input_shape
                 batch_size = get_model_input_shape(model)
@@ -1760,7 +1971,8 @@ class Tensorflow_ITEXAdaptor(TensorFlowAdaptor):
                                 qdq_enabled=self.qdq_enabled,
                                 new_api=self.new_api,
                                 performance_only = self.performance_only,
-                                use_bf16=self.use_bf16).convert()
+                                use_bf16=self.use_bf16,
+                                calib_cache=self.calib_cache).convert()
         else: # pragma: no cover
             if hasattr(data_loader, 'batch_size') and \
               calib_sampling_size % data_loader.batch_size != 0:
@@ -1782,7 +1994,8 @@ class Tensorflow_ITEXAdaptor(TensorFlowAdaptor):
                                    qdq_enabled=self.qdq_enabled,
                                    new_api=self.new_api,
                                    performance_only = self.performance_only,
-                                   use_bf16=self.use_bf16).convert()
+                                   use_bf16=self.use_bf16,
+                                   calib_cache=self.calib_cache).convert()
 
         self._dump_model_op_stats(converted_model.graph_def)
 
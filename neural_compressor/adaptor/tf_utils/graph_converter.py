@@ -92,7 +92,8 @@ class GraphConverter:
                  qdq_enabled=False,
                  new_api=False,
                  performance_only=False,
-                 use_bf16=False):
+                 use_bf16=False,
+                 calib_cache=None):
         """Convert graph.
 
         :param model: input tensorflow model.
@@ -101,6 +102,7 @@ class GraphConverter:
         :param bf16_ops: fall back to bf16 dtype op list
         :param data_loader: for calibration phase used dataloader
         :param fake_quant: for quantization-aware training model conversion to default model
+        :param calib_cache: CalibrationCache to reuse the sampling results across tunings
         """
         self.model = model
         #(TODO) does it right to make the internal model format as graph_def
@@ -123,6 +125,13 @@ class GraphConverter:
         self._calibration_data = []
         self._fp32_print_data = []
         self.data_loader = data_loader
+        self.calib_cache = calib_cache
+        # The calibration tensors are fetched as extra outputs of the calibration runs instead of
+        # being printed to a log, except for the graphs with v1 control flow, whose tensors inside
+        # the while loops or untaken branches can't be fetched.
+        self._fetch_calibration_data = not any(
+            node.op in ('Enter', 'Switch') for node in self.model.graph_def.node)
+        self._kl_node_names = []
         self._check_tf_version()
         self._check_args()
 
@@ -159,11 +168,12 @@ class GraphConverter:
         self.exclude_node_names = []
 
     # pylint: disable=no-member
-    def _inference(self, model):
+    def _inference(self, model, callback=None):
         """Run the calibration on the input graph.
 
         Args:
             model(TensorflowBaseModel): input TensorflowBaseModel
+            callback(callable): called with the output tensor values of each iteration
         """
         # ITEX optimization has broken INC calibration process.
         # INC needs turn off ITEX optimization pass in calibration stage.
@@ -182,9 +192,13 @@ class GraphConverter:
         logger.info("Start sampling on calibration dataset.")
         if hasattr(self.data_loader, "__len__") and len(self.data_loader) == 0:
             feed_dict = {}
-            _ = sess.run(output_tensor, feed_dict) if iter_op==[] \
-                else iterator_sess_run(sess, iter_op, \
-                    feed_dict, output_tensor, self.calib_iteration)
+            if iter_op == []:
+                results = sess.run(output_tensor, feed_dict)
+                if callback:
+                    callback(results)
+            else:
+                iterator_sess_run(sess, iter_op, feed_dict, output_tensor,
+                                  self.calib_iteration, callback=callback)
         for idx, (inputs, labels) in enumerate(self.data_loader):
             if len(input_tensor) == 1:
                 feed_dict = {}
@@ -242,9 +256,13 @@ class GraphConverter:
                             if check_shape(dis_tensor, dis_input):
                                 feed_dict.update({dis_tensor: dis_input})
                                 break
-            _ = sess.run(output_tensor, feed_dict) if iter_op==[] \
-                else iterator_sess_run(sess, iter_op, \
-                    feed_dict, output_tensor, self.calib_iteration)
+            if iter_op == []:
+                results = sess.run(output_tensor, feed_dict)
+                if callback:
+                    callback(results)
+            else:
+                iterator_sess_run(sess, iter_op, feed_dict, output_tensor,
+                                  self.calib_iteration, callback=callback)
             if idx + 1 == self.calib_iteration:
                 break
         os.environ["ITEX_REMAPPER"] = "1"
@@ -431,6 +449,9 @@ class GraphConverter:
 
         for i in output_node_names:
             self._kl_keys.append(';' + i + '__print__;__KL')
+        self._kl_node_names = output_node_names
+        if self._fetch_calibration_data:
+            return self._fp32_model
 
         fp32_graph_def = graph_pb2.GraphDef()
         fp32_graph_def.CopyFrom(self._fp32_model.graph_def)
@@ -503,18 +524,16 @@ class GraphConverter:
                     self.op_wise_config,
                     self.new_api).do_transformation()
 
+                min_max_tensors = []
                 for i in self.quantized_node_info:
-                    sampling_graph_def, output_names = InsertPrintMinMaxNode(
-                        sampling_graph_def, i[0], i[-1], self.new_api).do_transformation()
+                    insert_print_node = InsertPrintMinMaxNode(sampling_graph_def, i[0], i[-1],
+                        self.new_api, insert_print=not self._fetch_calibration_data)
+                    sampling_graph_def, output_names = insert_print_node.do_transformation()
                     output_tensor_names.extend(output_names)
+                    min_max_tensors.extend(insert_print_node.min_max_tensors)
                 if self.quantized_node_info:
-                    sampling_graph_def.library.CopyFrom(self.model.graph_def.library)
-                    self._sampling_model.graph_def = sampling_graph_def
-                    self._sampling_model.output_tensor_names = output_tensor_names
-                    tmp_dump_file = tempfile.mkstemp(suffix='.log')[1]
-                    with CaptureOutputToFile(tmp_dump_file):
-                        self._inference(self._sampling_model)
-                    self._calibration_data = Helper.gen_valid_sampling_log(tmp_dump_file)
+                    self._calibration_data = self._sampling(sampling_graph_def, output_tensor_names,
+                                                            min_max_tensors)
 
                 del output_tensor_names
                 del sampling_graph_def
@@ -594,8 +613,49 @@ class GraphConverter:
             self._tmp_model.graph_def = self._tmp_graph_def
             self._tmp_model.save(self._int8_dynamic_range_model_path)
 
+    def _sampling(self, sampling_graph_def, output_tensor_names, min_max_tensors):
+        """Run the sampling graph and get the min/max values of the inserted nodes.
+
+        The values are fetched as extra outputs of the calibration runs, or parsed from the
+        log of the Print nodes if the graph has v1 control flow.
+        The sampling log is cached by the sampling graph, the dataloader and the calibration
+        iterations if the calibration cache is enabled.
+        """
+        sampling_graph_def.library.CopyFrom(self.model.graph_def.library)
+        key = None
+        if self.calib_cache is not None:
+            key = self.calib_cache.get_key(sampling_graph_def.SerializeToString(deterministic=True),
+                                           self.data_loader, self.calib_iteration)
+            calibration_data = self.calib_cache.load(key)
+            if calibration_data is not None:
+                return calibration_data
+
+        self._sampling_model.graph_def = sampling_graph_def
+        if self._fetch_calibration_data:
+            self._sampling_model.output_tensor_names = output_tensor_names + \
+                [tensor_name for _, tensor_name in min_max_tensors]
+            num_outputs = len(output_tensor_names)
+            sampling_values = []
+            self._inference(self._sampling_model,
+                            callback=lambda results: sampling_values.append(results[num_outputs:]))
+            calibration_data = Helper.gen_sampling_data(
+                [message for message, _ in min_max_tensors], sampling_values)
+        else:
+            self._sampling_model.output_tensor_names = output_tensor_names
+            tmp_dump_file = tempfile.mkstemp(suffix='.log')[1]
+            with CaptureOutputToFile(tmp_dump_file):
+                self._inference(self._sampling_model)
+            calibration_data = Helper.gen_valid_sampling_log(tmp_dump_file)
+        if key is not None:
+            self.calib_cache.save(key, calibration_data)
+        return calibration_data
+
     def _generate_calibration_data(self, tmp_path, output_data, enable_kl_algo=False):
         """Generate the calibration data."""
+        if self._fetch_calibration_data:
+            self._fetch_kl_calibration_data(enable_kl_algo)
+            return
+
         tmp_dump_file = os.path.join(os.path.dirname(self.output_graph), 'requant_min_max.log')
 
         logger.debug("Generate calibration data and save to {}.".format(tmp_dump_file))
@@ -620,6 +680,26 @@ class GraphConverter:
                 else:
                     self._kl_op_dict[key] = combine_histogram(self._kl_op_dict[key], fp32_data)
 
+    def _fetch_kl_calibration_data(self, enable_kl_algo=False):
+        """Generate the KL histograms from the fp32 tensors fetched during the calibration."""
+        model = Model(self._fp32_model.graph_def, **self._tmp_model.kwargs)
+        model.output_tensor_names = self.output_tensor_names + \
+            [node_name + ':0' for node_name in self._kl_node_names]
+        model.input_tensor_names = self.input_tensor_names
+        num_outputs = len(self.output_tensor_names)
+
+        def update_histogram(results):
+            if not enable_kl_algo:
+                return
+            for node_name, fp32_data in zip(self._kl_node_names, results[num_outputs:]):
+                key = self._print_node_mapping[node_name] + '_eightbit_requant_range'
+                if key not in self._kl_op_dict:
+                    self._kl_op_dict[key] = get_tensor_histogram(fp32_data)
+                else:
+                    self._kl_op_dict[key] = combine_histogram(self._kl_op_dict[key], fp32_data)
+
+        self._inference(model, callback=update_histogram)
+
     def _freeze_requantization_ranges(self, additional_data=None):
         """Freeze requantization ranges after doing quantization."""
         self._tmp_graph_def, quantizev2_max = FreezeValueTransformer(
@@ -802,20 +882,18 @@ class GraphConverter:
                                     self.new_api,
                                     True).do_transformation()
 
+        min_max_tensors = []
         for i in self.quantized_node_info:
-            sampling_graph_def, output_names = InsertPrintMinMaxNode(
-                sampling_graph_def, i[0], i[-1], self.new_api).do_transformation()
+            insert_print_node = InsertPrintMinMaxNode(sampling_graph_def, i[0], i[-1],
+                self.new_api, insert_print=not self._fetch_calibration_data)
+            sampling_graph_def, output_names = insert_print_node.do_transformation()
             output_tensor_names.extend(output_names)
+            min_max_tensors.extend(insert_print_node.min_max_tensors)
 
 
         if self.quantized_node_info:
-            sampling_graph_def.library.CopyFrom(self.model.graph_def.library)
-            self._sampling_model.graph_def = sampling_graph_def
-            self._sampling_model.output_tensor_names = output_tensor_names
-            tmp_dump_file = tempfile.mkstemp(suffix='.log')[1]
-            with CaptureOutputToFile(tmp_dump_file):
-                self._inference(self._sampling_model)
-            self._calibration_data = Helper.gen_valid_sampling_log(tmp_dump_file)
+            self._calibration_data = self._sampling(sampling_graph_def, output_tensor_names,
+                                                    min_max_tensors)
 
         del sampling_graph_def
         del output_tensor_names
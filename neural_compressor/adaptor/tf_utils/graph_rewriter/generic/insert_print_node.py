@@ -29,13 +29,27 @@ from neural_compressor.adaptor.tf_utils.util import version1_gt_version2
 class InsertPrintMinMaxNode(GraphRewriterBase):
     """InsertPrintMinMaxNode Pass for tensorflow sampling."""
 
-    def __init__(self, model, pre_node_name, post_node_name, new_api):
-        """Intilization."""
+    def __init__(self, model, pre_node_name, post_node_name, new_api, insert_print=True):
+        """Intilization.
+
+        Args:
+            model (graphdef): input model
+            pre_node_name (string): the name of the quantized node.
+            post_node_name (string): the name of the last node of the quantized pattern.
+            new_api (bool): whether the new quantization API is used.
+            insert_print (bool, optional): whether to insert the Print nodes. If False, only the
+                                           Min/Max nodes are inserted, and their tensors are
+                                           fetched by the caller, see min_max_tensors.
+                                           Defaults to True.
+        """
         super().__init__(model)
         self.pre_node_name = pre_node_name
         self.post_node_name = post_node_name
         self.signature = pre_node_name + post_node_name
         self.new_api = new_api
+        self.insert_print = insert_print
+        # (print message, tensor name) of the inserted Min/Max nodes
+        self.min_max_tensors = []
 
     def do_transformation(self):
         """Insert print node in the graph to do the calibration."""
@@ -163,8 +177,17 @@ class InsertPrintMinMaxNode(GraphRewriterBase):
                     attr_value_pb2.AttrValue.ListValue(type=attr_u))
                 max_print_node.attr["U"].list.CopyFrom(
                     attr_value_pb2.AttrValue.ListValue(type=attr_u))
+                self.min_max_tensors.append((max_msg, max_input_name + ':0'))
+                self.min_max_tensors.append((min_msg, min_input_name + ':0'))
                 post_node_names = graph_info[Helper.node_name_from_input(each_node_name)].outputs
-                if post_node_names:
+                if not self.insert_print:
+                    cur_graph.add_node(reshape_dims_node, None, [reshape_input_name])
+                    cur_graph.add_node(reduction_dims_node, None, [max_input_name, min_input_name])
+                    cur_graph.add_node(reshape_input_node, each_node_name,
+                                       [max_input_name, min_input_name])
+                    cur_graph.add_node(max_input_node, reshape_input_name, [])
+                    cur_graph.add_node(min_input_node, reshape_input_name, [])
+                elif post_node_names:
                     for post_node_name in post_node_names:
                         post_node = graph_info[post_node_name].node
                         if each_node_name not in post_node.input:
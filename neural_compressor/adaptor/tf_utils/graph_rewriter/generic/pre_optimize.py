@@ -48,6 +48,7 @@ from .fuse_layer_norm import FuseLayerNormOptimizer
 from .strip_equivalent_nodes import StripEquivalentNodesOptimizer
 from .dilated_contraction import DilatedContraction
 from .convert_placeholder_to_const import ConvertPlaceholderToConst
+from ..pass_manager import PassManager
 from neural_compressor.adaptor.tf_utils.util import version1_gte_version2, version1_eq_version2
 
 class PreOptimization():
@@ -80,6 +81,29 @@ class PreOptimization():
         self._excluded_node_names = []
 
 
+    @staticmethod
+    def copy_model(model, graph_def=None):
+        """Copy the model with its names and workspace.
+
+        Args:
+            model (TensorflowBaseModel): the model to copy.
+            graph_def (graphdef, optional): the graph of the copied model. Defaults to None.
+
+        Returns:
+            TensorflowBaseModel: the copied model.
+        """
+        from neural_compressor.model import Model
+
+        copied_model = Model(model._model, **model.kwargs)
+        copied_model.name = model.name
+        copied_model.model_type = model.model_type
+        copied_model.output_tensor_names = model.output_tensor_names
+        copied_model.input_tensor_names = model.input_tensor_names
+        copied_model.workspace_path = model.workspace_path
+        if graph_def is not None:
+            copied_model.graph_def = graph_def
+        return copied_model
+
     def get_excluded_node_names(self):
         """Get the excluded node name.
 
@@ -104,14 +128,7 @@ class PreOptimization():
         Returns:
             [graphdef]: the optimized graphdef object.
         """
-        from neural_compressor.model import Model
-
-        origin_model = Model(self.model._model, **self.model.kwargs)
-        origin_model.name = self.model.name
-        origin_model.model_type = self.model.model_type
-        origin_model.output_tensor_names = self.model.output_tensor_names
-        origin_model.input_tensor_names = self.model.input_tensor_names
-        origin_model.workspace_path = self.model.workspace_path
+        origin_model = self.copy_model(self.model)
 
         output_node_names = self.model.output_node_names
         input_node_names = self.model.input_node_names
@@ -156,86 +173,75 @@ class PreOptimization():
                 node.device = ''
             self._tmp_graph_def = cur_graph.dump_graph()
 
-        self._tmp_graph_def = ConvertPlaceholderToConst(self._tmp_graph_def).do_transformation()
+        # Most of the passes only rewrite a few op types, they are skipped if the graph has none.
+        # The executed passes still parse the graph by themselves, see the TODO of PassManager.
+        manager = PassManager(self._tmp_graph_def)
+        manager.run(ConvertPlaceholderToConst, trigger_ops=('PlaceholderWithDefault',))
 
-        self._tmp_graph_def = SwitchOptimizer(self._tmp_graph_def).do_transformation()
+        manager.run(SwitchOptimizer, trigger_ops=('Switch',))
 
-        self._tmp_graph_def = GrapplerOptimizer(
-            self._tmp_graph_def, input_output_names, self.optimization).do_transformation()
+        manager.run(GrapplerOptimizer, input_output_names, self.optimization)
 
-        self._tmp_graph_def = StripUnusedNodesOptimizer(self._tmp_graph_def,
-            input_node_names, output_node_names).do_transformation()
+        manager.run(StripUnusedNodesOptimizer, input_node_names, output_node_names)
 
-        self._tmp_graph_def = RemoveTrainingNodesOptimizer(
-            self._tmp_graph_def, protected_nodes=input_output_names).do_transformation()
+        manager.run(RemoveTrainingNodesOptimizer, protected_nodes=input_output_names)
 
-        self._tmp_graph_def = SplitSharedInputOptimizer(self._tmp_graph_def).do_transformation()
+        manager.run(SplitSharedInputOptimizer)
 
         # Put FuseDecomposedBNOptimizer before GraphFoldConstantOptimizer
         # The 'Sub' op in the small decomposed ops of BN will be converted to const by GraphFoldConstantOptimizer.
         # Then the FuseDecomposedBNOptimizer can't fuse the small decomposed ops to BN.
         if self.new_api:
-            self._tmp_graph_def = FuseDecomposedBNOptimizer(self._tmp_graph_def).do_transformation()
-            self._tmp_graph_def = FuseDecomposedINOptimizer(self._tmp_graph_def).do_transformation()
-            self._tmp_graph_def = FuseLayerNormOptimizer(self._tmp_graph_def).do_transformation()
+            manager.run(FuseDecomposedBNOptimizer, trigger_ops=('Rsqrt',))
+            manager.run(FuseDecomposedINOptimizer, trigger_ops=('SquaredDifference',))
+            manager.run(FuseLayerNormOptimizer, trigger_ops=('FusedBatchNormV3',))
 
-        self._tmp_graph_def = GraphFoldConstantOptimizer(self._tmp_graph_def).do_transformation()
+        manager.run(GraphFoldConstantOptimizer)
 
         if not self.new_api:
-            self._tmp_graph_def = FuseDecomposedBNOptimizer(self._tmp_graph_def).do_transformation()
+            manager.run(FuseDecomposedBNOptimizer, trigger_ops=('Rsqrt',))
 
-        self._tmp_graph_def = FuseColumnWiseMulOptimizer(self._tmp_graph_def).do_transformation()
+        manager.run(FuseColumnWiseMulOptimizer, trigger_ops=('Mul',))
 
-        self._tmp_graph_def = StripUnusedNodesOptimizer(self._tmp_graph_def,
-            input_node_names, output_node_names).do_transformation()
+        manager.run(StripUnusedNodesOptimizer, input_node_names, output_node_names)
 
-        self._tmp_graph_def = FuseGeluOptimizer(self._tmp_graph_def).do_transformation()
+        manager.run(FuseGeluOptimizer, trigger_ops=('Tanh', 'Erf'))
 
-        self._tmp_graph_def = GraphCseOptimizer(self._tmp_graph_def).do_transformation()
+        manager.run(GraphCseOptimizer)
 
-        self._tmp_graph_def = FoldBatchNormNodesOptimizer(
-            self._tmp_graph_def).do_transformation()
+        manager.run(FoldBatchNormNodesOptimizer, trigger_ops=(
+            'BatchNormWithGlobalNormalization', 'FusedBatchNorm', 'FusedBatchNormV3', '_FusedBatchNormEx'))
 
-        self._tmp_graph_def = RenameBatchNormOptimizer(
-            self._tmp_graph_def).do_transformation()
+        manager.run(RenameBatchNormOptimizer, trigger_ops=('FusedBatchNorm', 'FusedBatchNormV2'))
 
-        self._tmp_graph_def = ConvertLeakyReluOptimizer(
-            self._tmp_graph_def).do_transformation()
+        manager.run(ConvertLeakyReluOptimizer, trigger_ops=('Maximum',))
 
-        self._tmp_graph_def = ConvertAddToBiasAddOptimizer(
-            self._tmp_graph_def).do_transformation()
+        manager.run(ConvertAddToBiasAddOptimizer, trigger_ops=('Add', 'AddV2'))
 
-        self._tmp_graph_def = FuseTransposeReshapeOptimizer(
-            self._tmp_graph_def).do_transformation()
+        manager.run(FuseTransposeReshapeOptimizer, trigger_ops=('Transpose',))
 
-        self._tmp_graph_def = FuseConvWithMathOptimizer(
-            self._tmp_graph_def).do_transformation()
+        manager.run(FuseConvWithMathOptimizer, trigger_ops=('RealDiv',))
 
-        self._tmp_graph_def = ExpandDimsOptimizer(
-            self._tmp_graph_def).do_transformation()
+        manager.run(ExpandDimsOptimizer, trigger_ops=('ExpandDims',))
 
-        self._tmp_graph_def = FetchWeightFromReshapeOptimizer(
-            self._tmp_graph_def).do_transformation()
+        manager.run(FetchWeightFromReshapeOptimizer, trigger_ops=('Pack',))
         if not self.new_api and not itex_mode:
             #TODO we need to remove below optimizer once the TF enabled the single
             # matmul op quantization
-            self._tmp_graph_def = InjectDummyBiasAddOptimizer(
-                self._tmp_graph_def, output_node_names).do_transformation()
-        self._tmp_graph_def = FuseBiasAddAndAddOptimizer(
-            self._tmp_graph_def).do_transformation()
+            manager.run(InjectDummyBiasAddOptimizer, output_node_names,
+                        trigger_ops=('MatMul', 'Conv2D'))
+        manager.run(FuseBiasAddAndAddOptimizer, trigger_ops=('BiasAdd',))
 
-        self._tmp_graph_def = MoveSqueezeAfterReluOptimizer(
-            self._tmp_graph_def).do_transformation()
+        manager.run(MoveSqueezeAfterReluOptimizer, trigger_ops=('Squeeze', 'Reshape'))
 
-        self._tmp_graph_def = ConvertNanToRandom(
-            self._tmp_graph_def).do_transformation()
+        manager.run(ConvertNanToRandom)
 
-        self._tmp_graph_def = StripEquivalentNodesOptimizer(
-            self._tmp_graph_def, output_node_names).do_transformation()
+        manager.run(StripEquivalentNodesOptimizer, output_node_names)
 
         if self.new_api or itex_mode:
-            self._tmp_graph_def = DilatedContraction(
-                self._tmp_graph_def).do_transformation()
+            manager.run(DilatedContraction, trigger_ops=('SpaceToBatchND',))
+        manager.summary()
+        self._tmp_graph_def = manager.graph_def
         self._tmp_graph_def.library.CopyFrom(self.model.graph_def.library)
 
         origin_model.graph_def = self._tmp_graph_def
@@ -253,14 +259,11 @@ class PreOptimization():
             [string list]: It will return the list that contains the matched nodes name
                 and pattern. ['matched_node_a_name', 'matched_node_a_name',['MatMul','BiasAdd']]
         """
-        self.analyzer.graph = self._tmp_graph_def
+        # the model graph is already pre-optimized if it isn't optimized by get_optimized_model
+        self.analyzer.graph = self._tmp_graph_def if self._tmp_graph_def is not None \
+            else self.model.graph_def
         self.analyzer.parse_graph()
-        res = []
-
-        for sub_pattern in patterns:
-            res.extend([i for i in self.analyzer.query_fusion_pattern_nodes(
-                sub_pattern) if i not in res])
-        return res
+        return self.analyzer.query_multi_fusion_pattern_nodes(patterns)
 
     def has_positive_input(self, node_name):
         """Check the specified node has the positive input or not.
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Pass manager skipping the graph rewriters by their trigger op types."""
+
+import logging
+import time
+from collections import Counter, OrderedDict
+
+logger = logging.getLogger("neural_compressor")
+
+
+# TODO share one node/consumer index among the passes, updated by the GraphAnalyzer add_node,
+# remove_node and replace_node, instead of the parse_graph of each pass. It needs these helpers
+# to keep the consumer lists consistent, e.g. remove_node leaves the node in the outputs of its
+# inputs, and the passes to take the index instead of a graphdef.
+class PassManager():
+    """Run the graph rewriter passes on a graph one after another.
+
+    A pass registered with trigger op types is skipped if none of them is in the current graph,
+    e.g. the BatchNorm folding of a graph without BatchNorm. The passes still parse the graph by
+    themselves. The elapsed time of each pass is kept in pass_time.
+
+    Example::
+
+        manager = PassManager(graph_def)
+        manager.run(SwitchOptimizer, trigger_ops=('Switch',))
+        manager.run(StripUnusedNodesOptimizer, input_node_names, output_node_names)
+        graph_def = manager.graph_def
+    """
+
+    def __init__(self, graph_def):
+        """Initilization.
+
+        Args:
+            graph_def (graphdef): the input graph.
+        """
+        self.graph_def = graph_def
+        # op type -> count of the current graph, counted when a trigger op is checked
+        self._op_types = None
+        # pass name -> elapsed time in seconds, accumulated if the pass runs more than once
+        self.pass_time = OrderedDict()
+        self.skipped_passes = []
+
+    def has_op(self, *op_types):
+        """Check whether the current graph has any of the op types."""
+        if self._op_types is None:
+            self._op_types = Counter(node.op for node in self.graph_def.node)
+        return any(self._op_types[op_type] > 0 for op_type in op_types)
+
+    def run(self, rewriter, *args, trigger_ops=None, **kwargs):
+        """Run a graph rewriter on the current graph.
+
+        Args:
+            rewriter (class): the GraphRewriterBase subclass, which is initialized with the
+                              current graph followed by args and kwargs.
+            trigger_ops (tuple of string, optional): the op types the pass rewrites. The pass is
+                                                     skipped if the graph has none of them.
+                                                     Defaults to None, i.e. always run the pass.
+
+        Returns:
+            graphdef: the rewritten graph, which is also the current graph of the manager.
+        """
+        name = rewriter.__name__
+        if trigger_ops and not self.has_op(*trigger_ops):
+            logger.debug("Skip {} as the graph has none of {}.".format(name, list(trigger_ops)))
+            self.skipped_passes.append(name)
+            return self.graph_def
+
+        start = time.time()
+        self.graph_def = rewriter(self.graph_def, *args, **kwargs).do_transformation()
+        self._op_types = None
+        self.pass_time[name] = self.pass_time.get(name, 0.) + time.time() - start
+        return self.graph_def
+
+    def update(self, graph_def):
+        """Set the current graph rewritten out of the manager."""
+        self.graph_def = graph_def
+        self._op_types = None
+
+    def summary(self):
+        """Log the elapsed time of the passes, the slowest first."""
+        for name, elapsed in sorted(self.pass_time.items(), key=lambda item: -item[1]):
+            logger.debug("{}: {} ms".format(name, round(elapsed * 1000, 2)))
+        if self.skipped_passes:
+            logger.debug("Skipped passes: {}.".format(', '.join(self.skipped_passes)))
@@ -20,7 +20,7 @@ import copy
 
 import re
 import logging
-from collections import namedtuple
+from collections import namedtuple, deque
 import numpy as np
 
 from tensorflow.core.framework import graph_pb2
@@ -172,7 +172,60 @@ class GraphAnalyzer():
         else:
             return self._search_patterns(patterns)
 
-    def _search_patterns(self, input_pattern):
+    def query_multi_fusion_pattern_nodes(self, patterns):
+        """Query the nodes aggregation status of several patterns with one op type index.
+
+        Args:
+            patterns (list): the patterns, each of them follows the _search_patterns definition.
+
+        Returns:
+            [string list]: The matched node names of all the patterns in the patterns order,
+                the duplicated matches are only kept once.
+        """
+        op_index = self._get_op_index()
+        res = []
+        matched = set()
+        for pattern in patterns:
+            for i in self._search_patterns(pattern, op_index):
+                key = self._get_match_key(i)
+                if key not in matched:
+                    matched.add(key)
+                    res.append(i)
+        return res
+
+    def _get_op_index(self):
+        """Index the node names of the graph by their op types, in the graph order."""
+        op_index = {}
+        for position, (node_name, v) in enumerate(self.node_name_details.items()):
+            op_index.setdefault(v.node.op, []).append((position, node_name))
+        return op_index
+
+    @staticmethod
+    def _get_match_key(matched_res):
+        """Get the hashable key of a matched result, the node names followed by the op types."""
+        return tuple(matched_res[:-1]) + (tuple(matched_res[-1]),)
+
+    # pattern key -> the op types the pattern could end with
+    _compiled_patterns = {}
+
+    def _compile_pattern(self, input_pattern):
+        """Get the op types of the nodes which the search of a pattern starts from.
+
+        The search walks the pattern backward from the last op of the match, which is one of the
+        trailing optional ops or the last mandatory op of the pattern.
+        """
+        key = tuple((type(i).__name__, tuple(i) if isinstance(i, (list, tuple)) else i)
+                    for i in input_pattern)
+        if key not in self._compiled_patterns:
+            end_op_types = set()
+            for creteria in reversed(input_pattern):
+                end_op_types.update([creteria] if isinstance(creteria, str) else creteria)
+                if not isinstance(creteria, tuple):
+                    break
+            self._compiled_patterns[key] = end_op_types
+        return self._compiled_patterns[key]
+
+    def _search_patterns(self, input_pattern, op_index=None):
         """Search user specified patterns on internal grpah structure.
 
         Args:
@@ -186,6 +239,8 @@ class GraphAnalyzer():
             Conv2D + BiasAdd + AddN + Relu6
             Conv2D + BiasAdd + Relu
             Conv2D + BiasAdd + Relu6
+            op_index (dict, optional): the node names indexed by op types, see _get_op_index.
+                Defaults to None, i.e. index the current graph.
 
         Return: [string list]. Each matched pattern composed of matched node name and we put the
                     match node op as the last element of each pair.
@@ -256,12 +311,11 @@ class GraphAnalyzer():
 
             if start_index == end_index:
                 if matched_flag:
-                    matched_res = copy.deepcopy(op_names)
-                    matched_res.reverse()
-                    op_types_copy = copy.deepcopy(op_types)
-                    op_types_copy.reverse()
-                    matched_res.append(op_types_copy)
-                    if matched_res not in output_result:
+                    matched_res = op_names[::-1]
+                    matched_res.append(op_types[::-1])
+                    key = self._get_match_key(matched_res)
+                    if key not in matched_keys:
+                        matched_keys.add(key)
                         output_result.append(matched_res)
 
                     op_names.pop()
@@ -276,31 +330,23 @@ class GraphAnalyzer():
                     op_types.pop()
 
         output_result = []
-
-        for _, v in self.node_name_details.items():
-            start_index = len(input_pattern) - 1
-            while start_index >= 0:
-                find_first_match = _validate_input(v.node.op, input_pattern[start_index])
-                if find_first_match:
-                    break
-
-                if isinstance(input_pattern[start_index], tuple):
-                    start_index -= 1
-                    continue
-
-                start_index = -2
-
-            if start_index < 0:
-                continue
-
+        matched_keys = set()
+
+        if op_index is None:
+            op_index = self._get_op_index()
+        # only the nodes whose op could end the pattern start the search, in the graph order
+        start_nodes = sorted(i for op_type in self._compile_pattern(input_pattern)
+                             for i in op_index.get(op_type, []))
+        for _, node_name in start_nodes:
             visited_op_name = []
             visited_op_types = []
 
-            _dfs(visited_op_name, visited_op_types, self.node_name_details, v.node, input_pattern)
+            _dfs(visited_op_name, visited_op_types, self.node_name_details,
+                 self.node_name_details[node_name].node, input_pattern)
 
         sorted_output = sorted(output_result, key=lambda i: i[-1])
 
-        useless_match_list = []
+        useless_match_index = set()
         for index, value in enumerate(sorted_output):
 
             if index == len(sorted_output) - 1:
@@ -309,10 +355,10 @@ class GraphAnalyzer():
             next_matched_op_names = sorted_output[index + 1][:-1]
             if len(value[:-1]) < len(next_matched_op_names) and \
                     _compare_list(value[:-1], next_matched_op_names):
-                useless_match_list.append(value)
+                useless_match_index.add(index)
 
-        for i in useless_match_list:
-            sorted_output.remove(i)
+        sorted_output = [value for index, value in enumerate(sorted_output)
+                         if index not in useless_match_index]
 
         longest_match = {}
         final_output = []
@@ -601,11 +647,11 @@ class GraphAnalyzer():
         self.parent_frame_details = OrderedDict()
         input_node_names, _ = self.get_graph_input_output()
 
-        traverse_list = copy.deepcopy(input_node_names)
-        visited = []
+        traverse_list = deque(input_node_names)
+        visited = set()
 
         while traverse_list:
-            node_name = traverse_list.pop(0)
+            node_name = traverse_list.popleft()
             node_details = self.node_name_details[node_name]
 
             if node_details.node.name in visited:
@@ -631,7 +677,7 @@ class GraphAnalyzer():
                         if node_details.node.name in self.parent_frame_details:
                             self.parent_frame_details[output] = self.parent_frame_details[node_details.node.name]
 
-            visited.append(node_details.node.name)
+            visited.add(node_details.node.name)
         return self.parent_frame_details
 
     def parse_graph(self, input_graph_def=None):
@@ -921,6 +967,49 @@ class GraphRewriterHelper():
 
         return int32_bias
 
+    @staticmethod
+    def _gen_sampling_per_iter(data):
+        """Merge the requantization min/max values of an iteration into a single line."""
+        res = []
+        requant_tmp = []
+        for i in data:
+            if i.find("__print__;__requant_") == -1:
+                res.append(i)
+            else:
+                requant_tmp.append(i)
+        sorted_requant = sorted(requant_tmp)
+        odd_list = sorted_requant[::2]
+        even_list = sorted_requant[1::2]
+        for index, value in enumerate(even_list):
+            min_value = min(0, float(value.split(':')[1][1:-1]))
+            max_value = float(odd_list[index].split(':')[1][1:-1])
+            max_value = max_value if max_value > min_value else min_value + 1e-05
+            mixed_str = value.split(':')[0] + '_max:[' + \
+                str(min_value) + '][' + str(max_value) + ']'
+
+            res.append(mixed_str)
+        return res
+
+    @staticmethod
+    def gen_sampling_data(messages, sampling_values):
+        """Generate the sampling min max value from the fetched Min/Max tensors.
+
+        The values are formatted as the lines of gen_valid_sampling_log, without the precision
+        loss of the printed tensors.
+
+        Args:
+          messages: the print messages of the Min/Max tensors.
+          sampling_values: the values of the Min/Max tensors of each iteration.
+
+        Returns:
+          the sampling min max value.
+        """
+        final_res = []
+        for values in sampling_values:
+            final_res.extend(GraphRewriterHelper._gen_sampling_per_iter(
+                ['{}[{!r}]'.format(msg, float(value)) for msg, value in zip(messages, values)]))
+        return final_res
+
     @staticmethod
     def gen_valid_sampling_log(log_path):
         """Generate the valid sampling log.
@@ -931,26 +1020,6 @@ class GraphRewriterHelper():
         Returns:
           the sampling min max value.
         """
-        def gen_per_iter(data):
-            res = []
-            requant_tmp = []
-            for i in data:
-                if i.find("__print__;__requant_") == -1:
-                    res.append(i)
-                else:
-                    requant_tmp.append(i)
-            sorted_requant = sorted(requant_tmp)
-            odd_list = sorted_requant[::2]
-            even_list = sorted_requant[1::2]
-            for index, value in enumerate(even_list):
-                min_value = min(0, float(value.split(':')[1][1:-1]))
-                max_value = float(odd_list[index].split(':')[1][1:-1])
-                max_value = max_value if max_value > min_value else min_value + 1e-05
-                mixed_str = value.split(':')[0] + '_max:[' + \
-                    str(min_value) + '][' + str(max_value) + ']'
-
-                res.append(mixed_str)
-            return res
         with open(log_path) as f:
             valid_data = [i.strip() for i in f.readlines() if i.startswith(';')]
 
@@ -965,9 +1034,11 @@ class GraphRewriterHelper():
         final_res = []
 
         for i in range(iterations):
-            final_res.extend(gen_per_iter(valid_data[int(i*step): int(step*( i+ 1))]))
+            final_res.extend(GraphRewriterHelper._gen_sampling_per_iter(
+                valid_data[int(i*step): int(step*( i+ 1))]))
             if i + 1 == iterations and int(step*( i+ 1)) < len(valid_data):
-                final_res.extend(gen_per_iter(valid_data[int(step*( i+ 1)): len(valid_data)]))
+                final_res.extend(GraphRewriterHelper._gen_sampling_per_iter(
+                    valid_data[int(step*( i+ 1)): len(valid_data)]))
 
         return final_res
 
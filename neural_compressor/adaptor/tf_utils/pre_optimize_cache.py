@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cache of the pre-optimized graphs reused across the tuning trials and runs."""
+
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+import tensorflow as tf
+
+from neural_compressor.utils import logger
+from neural_compressor.version import __version__
+
+
+def get_itex_version():
+    """Get the version of intel_extension_for_tensorflow, None if it isn't installed."""
+    try:
+        from importlib.metadata import version
+        return version('intel_extension_for_tensorflow')
+    except Exception:
+        return None
+
+
+class PreOptimizeCache(object):
+    """Cache of the pre-optimized graphs keyed by the fp32 graph and the pre-optimization setting.
+
+    An entry is a dict of the serialized pre-optimized graph under 'graph_def' and whatever the
+    adaptor derives from it, e.g. the capability query result. The cache is only enabled with a
+    workspace, i.e. along with the calibration cache. The entries are then saved in the
+    pre_optimize_cache sub-directory of the workspace, and the max_memory_entries recently used
+    ones are also kept in memory, shared by the adaptors of the process, so the repeated tunings
+    and the recover of the same model skip the pre-optimization.
+    """
+
+    # key -> entry, the recently used entries of the session
+    _memory = OrderedDict()
+    max_memory_entries = 4
+
+    def __init__(self, workspace_path=None):
+        """Init a PreOptimizeCache object.
+
+        Args:
+            workspace_path (str, optional): the tuning workspace, the entries are saved in its
+                                            pre_optimize_cache sub-directory. Defaults to None,
+                                            i.e. disable the cache.
+        """
+        self.cache_dir = os.path.join(os.path.abspath(os.path.expanduser(workspace_path)),
+                                      'pre_optimize_cache') if workspace_path else None
+
+    @staticmethod
+    def get_key(graph_def, **setting):
+        """Get the cache key.
+
+        Args:
+            graph_def (graphdef): the fp32 graph to pre-optimize.
+            setting: the arguments the pre-optimization and the capability query depend on,
+                     e.g. the input and output node names and the device.
+
+        Returns:
+            str: the cache key, which also covers the TensorFlow, ITEX and INC versions.
+        """
+        hasher = hashlib.sha256()
+        hasher.update(graph_def.SerializeToString(deterministic=True))
+        versions = (tf.version.VERSION, get_itex_version(), __version__)
+        hasher.update(repr((versions, sorted(setting.items()))).encode())
+        return hasher.hexdigest()
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, key + '.pkl')
+
+    def load(self, key):
+        """Load the entry, None if missing or unreadable."""
+        if self.cache_dir is None:
+            return None
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            logger.debug("Reuse the pre-optimized graph cached in memory.")
+            return entry
+        path = self._get_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except Exception as e:  # pragma: no cover
+            logger.warning("Fail to load pre-optimize cache {} due to {}.".format(path, e))
+            return None
+        logger.info("Reuse the pre-optimized graph cached in {}.".format(path))
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def save(self, key, entry):
+        """Save the entry, which replaces the previous one of the key."""
+        if self.cache_dir is None:
+            return
+        self._remember(key, entry)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._get_path(key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        logger.debug("Save the pre-optimized graph to {}.".format(path))
@@ -234,7 +234,8 @@ def get_tensor_by_name(graph, name, try_cnt=3):
             name = 'import/' + name
     raise ValueError('can not find tensor by name')
 
-def iterator_sess_run(sess, iter_op, feed_dict, output_tensor, iteration=-1, measurer=None):
+def iterator_sess_run(sess, iter_op, feed_dict, output_tensor, iteration=-1, measurer=None,
+                      callback=None):
     """Run the graph that have iterator integrated in the graph.
 
     Args:
@@ -243,6 +244,7 @@ def iterator_sess_run(sess, iter_op, feed_dict, output_tensor, iteration=-1, mea
         feed_dict(dict): the feeds to initialize a new iterator
         output_tensor(list): the output tensors
         iteration(int): iterations to run, when -1 set, run to end of iterator
+        callback(callable): called with the results of each iteration
 
     Returns:
         preds: the results of the predictions
@@ -258,6 +260,8 @@ def iterator_sess_run(sess, iter_op, feed_dict, output_tensor, iteration=-1, mea
                 measurer.end()
             else:
                 prediction = sess.run(output_tensor)
+            if callback:
+                callback(prediction)
             preds.append(prediction)
             idx += 1
         except tf.errors.OutOfRangeError:
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Activation statistics collected once and reused by the tuning trials."""
+
+import contextlib
+
+from neural_compressor.utils.utility import LazyImport
+
+torch = LazyImport('torch')
+from ...utils import logger
+
+
+class ObserverStats(object):
+    """Activation statistics of the observers, collected once per calibration data.
+
+    Before the conversion, the observers of the eager mode model only observe the fp32
+    activations, so the tensor observed by an observer doesn't depend on the tune_cfg, e.g. on
+    the ops falling back to fp32. The statistics of a calibration pass are kept by the observer
+    name as the state of a HistogramObserver, which also covers MinMaxObserver with its min_val
+    and max_val, as their forwards don't depend on the qscheme, dtype and reduce_range. The
+    observers of a later tune_cfg are restored from the statistics without the data pass if all
+    of them are MinMaxObserver or HistogramObserver with observed statistics.
+    """
+
+    def __init__(self):
+        """Init an ObserverStats object."""
+        self.key = None
+        # observer name -> {'histogram', 'min_val', 'max_val'} of a HistogramObserver
+        self.stats = {}
+
+    @staticmethod
+    def get_key(model, dataloader, iterations, calib_sampling_size):
+        """Get the key of the calibration data, the weights are tracked by their version counters.
+
+        Args:
+            model (torch.nn.Module): the fp32 model.
+            dataloader (object): the calibration dataloader.
+            iterations (int): the calibration iterations.
+            calib_sampling_size (int): the calibration sampling size.
+        """
+        tensors = tuple((name, tensor.data_ptr(), tensor._version) for name, tensor in \
+                        list(model.named_parameters()) + list(model.named_buffers()))
+        return (id(model), tensors, id(dataloader), iterations, calib_sampling_size)
+
+    def _reset(self, key):
+        if key != self.key:
+            self.key = key
+            self.stats = {}
+
+    def restore(self, key, observers):
+        """Restore the observers from the statistics.
+
+        Args:
+            key (tuple): the key of the calibration data.
+            observers (dict): the observers of the prepared model keyed by their names.
+
+        Returns:
+            bool: whether all the observers are restored, so the calibration can be skipped.
+        """
+        self._reset(key)
+        if not observers:
+            return False
+        for name, observer in observers.items():
+            stats = self.stats.get(name)
+            if stats is None or type(observer) not in (torch.quantization.MinMaxObserver,
+                                                       torch.quantization.HistogramObserver):
+                return False
+            if isinstance(observer, torch.quantization.HistogramObserver) and \
+                    (observer.bins != stats['histogram'].numel() or
+                     getattr(observer, 'upsample_rate', None) != stats['upsample_rate']):
+                return False
+        for name, observer in observers.items():
+            stats = self.stats[name]
+            device = observer.min_val.device
+            observer.min_val = stats['min_val'].clone().to(device)
+            observer.max_val = stats['max_val'].clone().to(device)
+            if isinstance(observer, torch.quantization.HistogramObserver):
+                observer.histogram = stats['histogram'].clone().to(device)
+        logger.debug("Restore {} observers from the collected statistics, " \
+                     "skip the calibration.".format(len(observers)))
+        return True
+
+    @contextlib.contextmanager
+    def collect(self, key, observers):
+        """Collect the statistics of the observers during the calibration in the context.
+
+        The MinMaxObserver observers are shadowed by HistogramObserver, so the statistics cover
+        both algorithms. The statistics are kept only if the calibration runs the model.
+
+        Args:
+            key (tuple): the key of the calibration data.
+            observers (dict): the observers of the prepared model keyed by their names.
+        """
+        self._reset(key)
+        shadows, handles = {}, []
+        for name, observer in observers.items():
+            if type(observer) is torch.quantization.HistogramObserver:
+                shadows[name] = observer
+            elif type(observer) is torch.quantization.MinMaxObserver:
+                shadow = torch.quantization.HistogramObserver().to(observer.min_val.device)
+                handles.append(observer.register_forward_hook(
+                    lambda module, input, output, shadow=shadow: shadow(input[0])))
+                shadows[name] = shadow
+        # whether the calibration runs the model, instead of restoring the observers from a cache
+        observed = set()
+        for name in shadows:
+            handles.append(observers[name].register_forward_hook(
+                lambda module, input, output, name=name: observed.add(name)))
+        try:
+            yield
+        finally:
+            for handle in handles:
+                handle.remove()
+        if not observed:
+            return
+        for name, shadow in shadows.items():
+            self.stats[name] = {'histogram': shadow.histogram.detach().clone(),
+                                'min_val': shadow.min_val.detach().clone(),
+                                'max_val': shadow.max_val.detach().clone(),
+                                'upsample_rate': getattr(shadow, 'upsample_rate', None)}
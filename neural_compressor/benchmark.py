@@ -16,9 +16,12 @@
 # limitations under the License.
 """Benchmark is used for evaluating the model performance."""
 
+import json
+import multiprocessing
 import os
 import re
 import sys
+import traceback
 import numpy as np
 import subprocess
 import signal
@@ -40,6 +43,9 @@ from .conf.pythonic_config import Config
 from .config import BenchmarkConfig
 from .utils.utility import Statistics
 
+# the latency percentiles reported by the benchmark
+LATENCY_PERCENTILES = (50, 90, 99, 99.9)
+
 
 def set_env_var(env_var, value, overwrite_existing=False):
     """Set the specified environment variable.
@@ -73,6 +79,77 @@ def set_all_env_var(conf, overwrite_existing=False):
         set_env_var(var.upper(), value, overwrite_existing)
 
 
+def get_latency_percentiles(latency_list, percentiles=LATENCY_PERCENTILES):
+    """Get the percentiles of the latency distribution.
+
+    Args:
+        latency_list (list): the latencies of the iterations.
+        percentiles (tuple, optional): the percentiles in [0, 100]. Defaults to LATENCY_PERCENTILES.
+
+    Returns:
+        dict: the latency of each percentile, keyed by its name, e.g. 'p99.9'.
+    """
+    values = np.percentile(np.array(latency_list, dtype=np.float64), percentiles) \
+        if len(latency_list) else [float('nan')] * len(percentiles)
+    return {'p{:g}'.format(p): float(v) for p, v in zip(percentiles, values)}
+
+
+def get_instance_result_path(num_of_instance, cores_per_instance, instance_id):
+    """Get the path of the json result file of an instance, next to its log file."""
+    return '{}_{}_{}.json'.format(num_of_instance, cores_per_instance, instance_id)
+
+
+def get_sweep_candidates(num_of_cores, num_of_sockets=1, batch_sizes=(None,), cores_per_instance=None):
+    """Get the (num_of_instance, cores_per_instance, batch_size) layouts of the sweep.
+
+    The instances fill the cores and don't cross the socket boundaries, i.e. the cores per
+    instance is a divisor of the cores per socket or spans whole sockets.
+
+    Args:
+        num_of_cores (int): the number of physical cores.
+        num_of_sockets (int, optional): the number of sockets. Defaults to 1.
+        batch_sizes (list, optional): the batch sizes, None to keep the batch size of the
+                                      dataloader. Defaults to (None,).
+        cores_per_instance (list, optional): the candidate cores per instance. Defaults to None,
+                                             i.e. all the layouts respecting the sockets.
+
+    Returns:
+        list: the (num_of_instance, cores_per_instance, batch_size) tuples.
+    """
+    num_of_sockets = max(1, min(num_of_sockets, num_of_cores))
+    cores_per_socket = num_of_cores // num_of_sockets
+    valid = [cores for cores in range(1, cores_per_socket + 1) if cores_per_socket % cores == 0]
+    valid += [cores_per_socket * sockets for sockets in range(2, num_of_sockets + 1) \
+        if num_of_sockets % sockets == 0]
+    if cores_per_instance is not None:
+        for cores in cores_per_instance:
+            if cores not in valid:
+                logger.warning("Skip {} cores per instance which doesn't fit the {} sockets of {} " \
+                    "cores.".format(cores, num_of_sockets, cores_per_socket))
+        valid = [cores for cores in valid if cores in cores_per_instance]
+    return [(num_of_cores // cores, cores, batch_size) for cores in valid for batch_size in batch_sizes]
+
+
+def get_pareto_frontier(sweep_results):
+    """Get the layouts which no other layout beats in both throughput and p99 latency.
+
+    Args:
+        sweep_results (list): the results of the sweep, dicts with 'throughput' and 'p99'.
+
+    Returns:
+        list: the results on the Pareto frontier, ordered by throughput.
+    """
+    results = [result for result in sweep_results if np.isfinite(result['p99'])]
+    frontier = []
+    for result in results:
+        dominated = any(other['throughput'] >= result['throughput'] and other['p99'] <= result['p99'] \
+            and (other['throughput'] > result['throughput'] or other['p99'] < result['p99']) \
+            for other in results)
+        if not dominated:
+            frontier.append(result)
+    return sorted(frontier, key=lambda result: result['throughput'])
+
+
 def get_architecture():
     """Get the architecture name of the system."""
     p1 = subprocess.Popen("lscpu", stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
@@ -156,6 +233,7 @@ class Benchmark(object):
         self._b_dataloader = None
         self._b_func = None
         self._results = {}
+        self._instance_result = None
         assert isinstance(conf, BenchmarkConfig), \
             "The config object should be config.BenchmarkConfig, not {}".format(type(conf))
         conf = Config(quantization=None, benchmark=conf, pruning=None, distillation=None, nas=None)
@@ -181,19 +259,126 @@ class Benchmark(object):
         logger.info("Start to run Benchmark.")
         if os.environ.get('NC_ENV_CONF') == 'True':
             return self.run_instance()
+        self._launch_instance(raw_cmd)
+        return None
+
+    fit = __call__
+
+    def _launch_instance(self, raw_cmd=None):
+        """Launch the instances with the launcher of the config and summarize their results."""
+        launcher = deep_get(self.conf.usr_cfg, 'evaluation.performance.launcher') or 'subprocess'
+        if launcher == 'fork' and sys.platform not in ['linux']:  # pragma: no cover
+            logger.warning("The fork launcher is only supported on linux, use the subprocess launcher.")
+            launcher = 'subprocess'
+        if launcher == 'fork':
+            self.fork_instance()
+            return
         if raw_cmd is None:
             raw_cmd = sys.executable + ' ' + ' '.join(sys.argv)
         self.config_instance(raw_cmd)
         self.summary_benchmark()
-        return None
 
-    fit = __call__
+    def sweep(self, raw_cmd=None, batch_sizes=None, cores_per_instance=None):
+        """Sweep the multi-instance layouts and batch sizes to find the throughput-optimal ones.
+
+        Each (num_of_instance, cores_per_instance, batch_size) candidate of get_sweep_candidates
+        runs the multi-instance benchmark, so a small iteration of the config is recommended.
+        The Pareto frontier of throughput vs the p99 latency of a batch, i.e. of a request served
+        with the batch size, is reported and kept in results['pareto_frontier'].
+
+        Args:
+            raw_cmd: raw command used for benchmark
+            batch_sizes (list, optional): the batch sizes to sweep, which re-batch the
+                                          b_dataloader. Defaults to None, i.e. its batch size.
+            cores_per_instance (list, optional): the candidate cores per instance. Defaults to
+                                                 None, i.e. all the layouts respecting the sockets.
+        """
+        cfg = self.conf.usr_cfg
+        assert cfg.evaluation is not None, 'benchmark evaluation filed should not be None...'
+        if os.environ.get('NC_ENV_CONF') == 'True':
+            return self.run_instance()
+        assert sys.platform in ['linux'], 'only support sweep on linux...'
+        # the layout of each candidate is set in the environment, restored once the sweep is done
+        saved_environ = dict(os.environ)
+        try:
+            sweep_results = self._sweep_candidates(raw_cmd, batch_sizes, cores_per_instance)
+        finally:
+            for name in set(os.environ) - set(saved_environ):
+                os.environ.pop(name)
+            os.environ.update(saved_environ)
+        frontier = get_pareto_frontier(sweep_results)
+        if not frontier:
+            logger.warning("The instances reported no latency percentiles, e.g. with b_func, " \
+                "so the sweep has no Pareto frontier.")
+        output_data = [[result['num_of_instance'], result['cores_per_instance'], result['batch_size'],
+                        "{:.3f}".format(result['throughput']), "{:.3f}".format(result['p99'] * 1000),
+                        'yes' if result in frontier else 'no'] for result in sweep_results]
+        logger.info("********************************************")
+        Statistics(
+            output_data,
+            header='Benchmark Sweep Summary',
+            field_names=["Instances", "Cores per instance", "Batch size", "Throughput [samples/second]",
+                         "Latency p99 [ms/batch]", "Pareto frontier"]).print_stat()
+        self._results['sweep'] = sweep_results
+        self._results['pareto_frontier'] = frontier
+        return frontier
+
+    def _sweep_candidates(self, raw_cmd, batch_sizes, cores_per_instance):
+        """Run the multi-instance benchmark of each candidate layout of the sweep.
+
+        Returns:
+            list: the results of the candidates, dicts with the layout, 'throughput' and 'p99'.
+        """
+        cfg = self.conf.usr_cfg
+        set_all_env_var(deep_get(cfg, 'evaluation.performance.configs'))
+        physical_ids = get_physical_ids()
+        num_of_sockets = len(set(physical_ids)) if physical_ids else 1
+        candidates = get_sweep_candidates(psutil.cpu_count(logical=False), num_of_sockets,
+                                          batch_sizes or [None], cores_per_instance)
+        sweep_results = []
+        for num_of_instance, cores, batch_size in candidates:
+            logger.info("Sweep {} instances of {} cores with batch size {}.".format(
+                num_of_instance, cores, batch_size or 'of the dataloader'))
+            set_env_var('NUM_OF_INSTANCE', num_of_instance, overwrite_existing=True)
+            set_env_var('CORES_PER_INSTANCE', cores, overwrite_existing=True)
+            if batch_size is not None:
+                set_env_var('NC_BATCH_SIZE', batch_size, overwrite_existing=True)
+            else:
+                os.environ.pop('NC_BATCH_SIZE', None)
+            for key in ['throughput', 'latency', 'batch_latency_percentiles']:
+                self._results.pop(key, None)
+            self._launch_instance(raw_cmd)
+            batch_size = self._results.get('batch_size', batch_size)
+            # a request waits for its whole batch, so the p99 latency is per batch
+            p99 = self._results.get('batch_latency_percentiles', {}).get('p99', float('nan'))
+            sweep_results.append({'num_of_instance': num_of_instance,
+                                  'cores_per_instance': cores,
+                                  'batch_size': batch_size,
+                                  'throughput': self._results.get('throughput', float('nan')),
+                                  'p99': p99})
+        return sweep_results
 
     def summary_benchmark(self):
-        """Get the summary of the benchmark."""
+        """Get the summary of the benchmark.
+
+        The json result files of the instances are merged, so the latency percentiles per batch are
+        computed over the iterations of all the instances. The Latency and Throughput lines of
+        the instance logs are used instead if an instance has no result file, e.g. with b_func.
+        """
         if sys.platform in ['linux']:
             num_of_instance = int(os.environ.get('NUM_OF_INSTANCE'))
             cores_per_instance = int(os.environ.get('CORES_PER_INSTANCE'))
+            instance_results = []
+            for i in range(0, num_of_instance):
+                result_path = get_instance_result_path(num_of_instance, cores_per_instance, i)
+                if not os.path.exists(result_path):
+                    instance_results = None
+                    break
+                with open(result_path, "r") as f:
+                    instance_results.append(json.load(f))
+            if instance_results:
+                self._summary_instance_results(instance_results)
+                return
             latency_l = []
             throughput_l = []
             for i in range(0, num_of_instance):
@@ -207,9 +392,10 @@ class Benchmark(object):
             if throughput_l and latency_l:
                 assert len(latency_l)==len(throughput_l)==num_of_instance, \
                     "Multiple instance benchmark failed with some instance!"
+                self._results['throughput'] = sum(throughput_l)
 
                 output_data = [
-                    ["Latency average [second/sample]", "{:.3f}".format(sum(latency_l)/len(latency_l))],
+                    ["Latency average [ms/sample]", "{:.3f}".format(sum(latency_l)/len(latency_l))],
                     ["Throughput sum [samples/second]", "{:.3f}".format(sum(throughput_l))]
                 ]
                 logger.info("********************************************")
@@ -221,34 +407,73 @@ class Benchmark(object):
             # (TODO) should add summary after win32 benchmark has log
             pass
 
-    def config_instance(self, raw_cmd):
-        """Configure the multi-instance commands and trigger benchmark with sub process.
+    def _summary_instance_results(self, instance_results):
+        """Merge the results of the instances and print the summary."""
+        latency_l = [result['latency'] for result in instance_results]
+        throughput_l = [result['throughput'] for result in instance_results]
+        batch_latency_l = [latency for result in instance_results for latency in result['latency_list']]
+        percentiles = get_latency_percentiles(batch_latency_l)
+        self._results['batch_latency_percentiles'] = percentiles
+        self._results['latency'] = sum(latency_l) / len(latency_l)
+        self._results['throughput'] = sum(throughput_l)
+        self._results['batch_size'] = instance_results[0]['batch_size']
+        # the results are in seconds, the summary is in ms as the instance logs
+        output_data = [
+            ["Latency average [ms/sample]", "{:.3f}".format(sum(latency_l)/len(latency_l) * 1000)]]
+        output_data += [["Latency {} [ms/batch]".format(name), "{:.3f}".format(value * 1000)] \
+            for name, value in percentiles.items()]
+        output_data.append(["Throughput sum [samples/second]", "{:.3f}".format(sum(throughput_l))])
+        logger.info("********************************************")
+        Statistics(
+            output_data,
+            header='Multiple Instance Benchmark Summary',
+            field_names=["Items", "Result"]).print_stat()
+
+    def get_core_lists(self, num_of_instance, cores_per_instance):
+        """Get the lists of the cores bound with the instances.
 
         Args:
-            raw_cmd: raw command used for benchmark
+            num_of_instance: the number of instances
+            cores_per_instance: the number of cores of each instance
         """
-        multi_instance_cmd = ''
-        num_of_instance = int(os.environ.get('NUM_OF_INSTANCE'))
-        cores_per_instance = int(os.environ.get('CORES_PER_INSTANCE'))
-
-        logger.info("num of instance: {}".format(num_of_instance))
-        logger.info("cores per instance: {}".format(cores_per_instance))
-
         if(sys.platform in ['linux'] and get_architecture() == 'aarch64' and int(get_threads_per_core()) > 1):
             raise OSError('Currently no support on ARM with hyperthreads')
         elif sys.platform in ['linux']:
             bounded_threads = get_bounded_threads(get_core_ids(), get_threads(), get_physical_ids())
 
+        core_lists = []
         for i in range(0, num_of_instance):
             if sys.platform in ['linux'] and get_architecture() == 'x86_64':
                 core_list_idx = np.arange(0, cores_per_instance) + i * cores_per_instance
                 core_list = np.array(bounded_threads)[core_list_idx]
             else:
                 core_list = np.arange(0, cores_per_instance) + i * cores_per_instance
+            core_lists.append(core_list)
+        return core_lists
+
+    def config_instance(self, raw_cmd):
+        """Configure the multi-instance commands and trigger benchmark with sub process.
+
+        Args:
+            raw_cmd: raw command used for benchmark
+        """
+        multi_instance_cmd = ''
+        num_of_instance = int(os.environ.get('NUM_OF_INSTANCE'))
+        cores_per_instance = int(os.environ.get('CORES_PER_INSTANCE'))
+
+        logger.info("num of instance: {}".format(num_of_instance))
+        logger.info("cores per instance: {}".format(cores_per_instance))
+
+        for i, core_list in enumerate(self.get_core_lists(num_of_instance, cores_per_instance)):
             # bind cores only allowed in linux/mac os with numactl enabled
             prefix = self.generate_prefix(core_list)
             instance_cmd = '{} {}'.format(prefix, raw_cmd)
             if sys.platform in ['linux']:
+                # the instance writes its json result file with the instance id
+                instance_cmd = 'NC_INSTANCE_ID={} {}'.format(i, instance_cmd)
+                result_path = get_instance_result_path(num_of_instance, cores_per_instance, i)
+                if os.path.exists(result_path):
+                    os.remove(result_path)
                 instance_log = '{}_{}_{}.log'.format(num_of_instance, cores_per_instance, i)
                 multi_instance_cmd += '{} 2>&1|tee {} & \\\n'.format(
                     instance_cmd, instance_log)
@@ -283,6 +508,67 @@ class Benchmark(object):
         except KeyboardInterrupt:
             os.killpg(os.getpgid(p.pid), signal.SIGKILL)
 
+    def fork_instance(self):
+        """Fork the instances from the current process and collect their results over pipes.
+
+        Unlike config_instance, the user script is not executed again, so the imports, the model
+        and the dataloader are inherited by the forked instances, with the model weights shared
+        copy-on-write. Each instance is bound to its cores with os.sched_setaffinity, and its
+        threads are limited with OMP_NUM_THREADS and CORES_PER_INSTANCE, so the frameworks which
+        initialize their thread pools after the fork, e.g. onnxruntime sessions, use its cores.
+        """
+        num_of_instance = int(os.environ.get('NUM_OF_INSTANCE'))
+        cores_per_instance = int(os.environ.get('CORES_PER_INSTANCE'))
+
+        logger.info("num of instance: {}".format(num_of_instance))
+        logger.info("cores per instance: {}".format(cores_per_instance))
+
+        context = multiprocessing.get_context('fork')
+        workers = []
+        try:
+            for i, core_list in enumerate(self.get_core_lists(num_of_instance, cores_per_instance)):
+                recv_conn, send_conn = context.Pipe(duplex=False)
+                worker = context.Process(target=self._run_forked_instance,
+                                         args=([int(core) for core in core_list], send_conn))
+                worker.start()
+                send_conn.close()
+                workers.append((worker, recv_conn))
+            instance_results = []
+            for i, (worker, recv_conn) in enumerate(workers):
+                try:
+                    result = recv_conn.recv()
+                except EOFError:
+                    result = {'error': 'Instance {} exited with code {}.'.format(i, worker.exitcode)}
+                recv_conn.close()
+                worker.join()
+                assert 'error' not in result, \
+                    "Multiple instance benchmark failed with some instance!\n{}".format(result['error'])
+                instance_results.append(result)
+        finally:
+            for worker, _ in workers:
+                if worker.is_alive():
+                    worker.terminate()
+        if self._b_func is None:
+            self._summary_instance_results(instance_results)
+
+    def _run_forked_instance(self, core_list, send_conn):
+        """Run the benchmark in a forked instance and send its result to the parent process."""
+        try:
+            os.sched_setaffinity(0, core_list)
+            set_env_var('OMP_NUM_THREADS', len(core_list), overwrite_existing=True)
+            set_env_var('CORES_PER_INSTANCE', len(core_list), overwrite_existing=True)
+            set_env_var('NC_ENV_CONF', True, overwrite_existing=True)
+            if 'torch' in sys.modules:
+                sys.modules['torch'].set_num_threads(len(core_list))
+            self.run_instance()
+            send_conn.send(self._instance_result or {})
+        except BaseException:
+            send_conn.send({'error': traceback.format_exc()})
+        finally:
+            send_conn.close()
+            # skip the exit handlers inherited from the parent process
+            os._exit(0)
+
     def generate_prefix(self, core_list):
         """Generate the command prefix with numactl.
 
@@ -354,6 +640,11 @@ class Benchmark(object):
             b_postprocess_cfg = deep_get(cfg, 'evaluation.performance.postprocess')
 
             assert self._b_dataloader is not None, "dataloader should not be None"
+            if os.environ.get('NC_BATCH_SIZE'):
+                # the batch size of the sweep
+                assert hasattr(self._b_dataloader, 'batch'), \
+                    "Sweeping the batch size needs a dataloader with the batch method."
+                self._b_dataloader.batch(int(os.environ.get('NC_BATCH_SIZE')))
 
             from neural_compressor.utils.create_obj_from_config import create_eval_func
             self._b_func = create_eval_func(self.framework, \
@@ -381,17 +672,48 @@ class Benchmark(object):
 
             result_list = self.objectives.objectives[0].result_list()[warmup:]
             latency = np.array(result_list).mean() / batch_size
+            # the percentiles of the latency per batch, the warmup iterations are excluded
+            percentiles = get_latency_percentiles(result_list)
             self._results["performance"] = acc, batch_size, result_list
+            self._results["batch_latency_percentiles"] = percentiles
 
             logger.info("\nbenchmark result:")
             for i, res in enumerate(result_list):
                 logger.debug("Iteration {} result {}:".format(i, res))
             logger.info("Batch size = {}".format(batch_size))
+            for name, value in percentiles.items():
+                logger.info("Latency {}: {:.3f} ms/batch".format(name, value * 1000))
             logger.info("Latency: {:.3f} ms".format(latency * 1000))
             logger.info("Throughput: {:.3f} images/sec".format(1. / latency))
+            self._instance_result = self._get_instance_result(batch_size, warmup, result_list,
+                                                              latency, percentiles)
+            if os.environ.get('NC_INSTANCE_ID') is not None:
+                self._dump_instance_result()
         else:
             self._b_func(self._model.model)
 
+    def _get_instance_result(self, batch_size, warmup, result_list, latency, percentiles):
+        """Get the result of the instance, the latencies are in seconds.
+
+        The latency is per sample, the latency_list and the batch_latency_percentiles are per batch.
+        """
+        return {'num_of_instance': int(os.environ.get('NUM_OF_INSTANCE', 1)),
+                'cores_per_instance': int(os.environ.get('CORES_PER_INSTANCE', 1)),
+                'batch_size': batch_size,
+                'warmup': warmup,
+                'latency': float(latency),
+                'throughput': float(1. / latency),
+                'batch_latency_percentiles': percentiles,
+                'latency_list': [float(res) for res in result_list]}
+
+    def _dump_instance_result(self):
+        """Dump the json result file of the instance to be merged by summary_benchmark."""
+        instance_id = int(os.environ.get('NC_INSTANCE_ID'))
+        result = dict(self._instance_result, instance_id=instance_id)
+        with open(get_instance_result_path(result['num_of_instance'], result['cores_per_instance'],
+                                           instance_id), 'w') as f:
+            json.dump(result, f, indent=2)
+
     @property
     def results(self):
         """Get the results of benchmarking."""
@@ -545,3 +867,37 @@ def fit(model, config=None, b_dataloader=None, b_func=None):
         benchmarker.b_dataloader = b_dataloader
     benchmarker()
     return benchmarker.results
+
+
+def sweep(model, config=None, b_dataloader=None, b_func=None, batch_sizes=None, cores_per_instance=None):
+    """Sweep the multi-instance layouts and batch sizes for the throughput-optimal deployment.
+
+    Args:
+        model (object):             The model to be benchmarked.
+        config (BenchmarkConfig):   The configuration for benchmark, a small iteration is
+                                    recommended as every candidate layout is benchmarked.
+        b_dataloader:               The dataloader for frameworks.
+        b_func:                     Customized benchmark function. If user passes the dataloader,
+                                    then b_func is not needed.
+        batch_sizes (list):         The batch sizes to sweep. Defaults to None, i.e. the batch size
+                                    of b_dataloader.
+        cores_per_instance (list):  The candidate cores per instance. Defaults to None, i.e. all
+                                    the layouts respecting the sockets.
+
+    Example:
+        # Sweep the layouts and batch sizes, and get the Pareto frontier of throughput vs p99 latency
+        from neural_compressor.benchmark import sweep
+
+        conf = BenchmarkConfig(warmup=5, iteration=50)
+        results = sweep(model='./int8.pb', config=conf, b_dataloader=eval_dataloader,
+                        batch_sizes=[1, 16, 64])
+        frontier = results['pareto_frontier']
+    """
+    benchmarker = Benchmark(config)
+    benchmarker.model = model
+    if b_func is not None:
+        benchmarker.b_func = b_func
+    if b_dataloader is not None:
+        benchmarker.b_dataloader = b_dataloader
+    benchmarker.sweep(batch_sizes=batch_sizes, cores_per_instance=cores_per_instance)
+    return benchmarker.results
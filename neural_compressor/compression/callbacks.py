@@ -24,7 +24,6 @@ The Component class will be inherited by the class 'QuantizationAwareTrainingCal
 import copy
 import numpy as np
 import os
-import pickle
 import random
 from .distillation.criterions import Criterions
 from ..adaptor import FRAMEWORKS
@@ -32,7 +31,7 @@ from ..conf.config import QuantConf, DistillationConf, PruningConf
 from ..conf.dotdict import deep_get, deep_set, DotDict
 from ..conf.pythonic_config import Config
 from ..utils import logger
-from ..utils.utility import time_limit, LazyImport
+from ..utils.utility import time_limit, LazyImport, get_tuning_history
 from ..model import BaseModel, Model
 from ..model.model import get_model_fwk_name
 from ..model.tensorflow_model import TensorflowQATModel
@@ -275,8 +274,7 @@ class BaseCallbacks(object):
         if self.resume_file:
             assert os.path.exists(self.resume_file), \
                 "The specified resume file {} doesn't exist!".format(self.resume_file)
-            with open(self.resume_file, 'rb') as f:
-                _resume = pickle.load(f).__dict__
+            _resume = {'tuning_history': get_tuning_history(self.resume_file)}
 
         self.strategy = STRATEGIES[strategy](
             self._model,
@@ -922,6 +922,10 @@ schema = Schema({
             Optional('latency_weight', default=1.0): float,
             Optional('confidence_batches', default=2): int,
             Optional('hawq_v2_loss', default=None): object,
+            Optional('pipeline_depth', default=0): And(int, lambda s: s >= 0),
+            Optional('parallel_workers', default=0): And(int, lambda s: s >= 0),
+            Optional('sequential_eval_batches', default=0): And(int, lambda s: s >= 0),
+            Optional('sequential_eval_confidence', default=0.99): And(float, lambda s: 0 < s < 1),
         } ,
         Hook('accuracy_criterion', handler=_valid_accuracy_field): object,
         Optional('accuracy_criterion', default={'relative': 0.01}): {
@@ -949,7 +953,8 @@ schema = Schema({
         Optional('tensorboard', default=False): And(bool, lambda s: s in [True, False]),
         Optional('workspace', default={'path': default_workspace}): {
             Optional('path', default=None): str,
-            Optional('resume'): str
+            Optional('resume'): str,
+            Optional('calibration_cache', default=False): bool
         },
         Optional('diagnosis', default = {
             'diagnosis_after_tuning': False,
@@ -1020,7 +1025,10 @@ schema = Schema({
                     Optional('task'): str
                 },
                 Optional('ROC'): {
-                    Optional('task'): str
+                    Optional('task'): str,
+                    Optional('return_auc'): bool,
+                    Optional('num_bins'): And(int, lambda s: s > 0),
+                    Optional('exact'): bool
                 },
             },
             Optional('metric', default=None): {
@@ -1069,7 +1077,10 @@ schema = Schema({
                     Optional('task'): str
                 },
                 Optional('ROC'): {
-                    Optional('task'): str
+                    Optional('task'): str,
+                    Optional('return_auc'): bool,
+                    Optional('num_bins'): And(int, lambda s: s > 0),
+                    Optional('exact'): bool
                 },
             },
             Optional('configs'): configs_schema,
@@ -1082,6 +1093,7 @@ schema = Schema({
         Optional('performance'): {
             Optional('warmup', default=5): int,
             Optional('iteration', default=-1): int,
+            Optional('launcher', default='subprocess'): And(str, lambda s: s in ['subprocess', 'fork']),
             Optional('configs'): configs_schema,
             Optional('dataloader'): dataloader_schema,
             Optional('postprocess'): {
@@ -1422,7 +1434,9 @@ class Conf(object):
             if pythonic_config.quantization.strategy_kwargs:
                 st_kwargs = pythonic_config.quantization.strategy_kwargs
                 for st_key in ['sigopt_api_token', 'sigopt_project_id', 'sigopt_experiment_name', \
-                    'accuracy_weight', 'latency_weight', 'hawq_v2_loss', 'confidence_batches']:
+                    'accuracy_weight', 'latency_weight', 'hawq_v2_loss', 'confidence_batches',
+                    'pipeline_depth', 'parallel_workers', 'sequential_eval_batches',
+                    'sequential_eval_confidence']:
                     if st_key in st_kwargs:
                         st_val =  st_kwargs[st_key]
                         mapping.update({'tuning.strategy.' + st_key: st_val})
@@ -1447,6 +1461,7 @@ class Conf(object):
                 'tuning.random_seed': pythonic_config.options.random_seed,
                 'tuning.workspace.path': pythonic_config.options.workspace,
                 'tuning.workspace.resume': pythonic_config.options.resume_from,
+                'tuning.workspace.calibration_cache': pythonic_config.options.calibration_cache,
                 'tuning.tensorboard': pythonic_config.options.tensorboard,
             })
         if pythonic_config.benchmark is not None:
@@ -1457,6 +1472,7 @@ class Conf(object):
             mapping.update({
                 'evaluation.performance.warmup': pythonic_config.benchmark.warmup,
                 'evaluation.performance.iteration': pythonic_config.benchmark.iteration,
+                'evaluation.performance.launcher': pythonic_config.benchmark.launcher,
                 'evaluation.performance.configs.cores_per_instance':
                     pythonic_config.benchmark.cores_per_instance,
                 'evaluation.performance.configs.num_of_instance':
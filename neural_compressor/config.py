@@ -93,12 +93,13 @@ def check_value(name, src, supported_type, supported_value=[]):
 class Options:
     """Option Class for configs."""
     def __init__(self, random_seed=1978, workspace=default_workspace,
-                 resume_from=None, tensorboard=False):
+                 resume_from=None, tensorboard=False, calibration_cache=False):
         """Init an Option object."""
         self.random_seed = random_seed
         self.workspace = workspace
         self.resume_from = resume_from
         self.tensorboard = tensorboard
+        self.calibration_cache = calibration_cache
 
     @property
     def random_seed(self):
@@ -144,6 +145,17 @@ class Options:
         if check_value('tensorboard', tensorboard, bool):
             self._tensorboard = tensorboard
 
+    @property
+    def calibration_cache(self):
+        """Get calibration_cache."""
+        return self._calibration_cache
+
+    @calibration_cache.setter
+    def calibration_cache(self, calibration_cache):
+        """Set calibration_cache."""
+        if check_value('calibration_cache', calibration_cache, bool):
+            self._calibration_cache = calibration_cache
+
 
 options = Options()
 
@@ -151,6 +163,9 @@ options = Options()
 class BenchmarkConfig:
     """Config Class for Benchmark.
 
+    The instances are launched by executing the user script again for each of them by default,
+    launcher='fork' forks them from the current process instead, e.g. in notebooks (linux only).
+
     Example:
         # Run benchmark according to config
         from neural_compressor.benchmark import fit
@@ -167,7 +182,8 @@ class BenchmarkConfig:
                  cores_per_instance=None,
                  num_of_instance=None,
                  inter_num_of_threads=None,
-                 intra_num_of_threads=None):
+                 intra_num_of_threads=None,
+                 launcher='subprocess'):
         """Init a BenchmarkConfig object."""
         self.inputs = inputs
         self.outputs = outputs
@@ -178,6 +194,7 @@ class BenchmarkConfig:
         self.num_of_instance = num_of_instance
         self.inter_num_of_threads = inter_num_of_threads
         self.intra_num_of_threads = intra_num_of_threads
+        self.launcher = launcher
 
     @property
     def backend(self):
@@ -282,6 +299,17 @@ class BenchmarkConfig:
                                                        intra_num_of_threads, int):
             self._intra_num_of_threads = intra_num_of_threads
 
+    @property
+    def launcher(self):
+        """Get launcher."""
+        return self._launcher
+
+    @launcher.setter
+    def launcher(self, launcher):
+        """Set launcher."""
+        if check_value('launcher', launcher, str, ['subprocess', 'fork']):
+            self._launcher = launcher
+
 
 class AccuracyCriterion:
     """Class of Accuracy Criterion.
@@ -416,6 +444,8 @@ class _BaseQuantizationConfig:
                      'add_qdq_pair_to_weight': whether add QDQ pair for weights, only vaild for onnxrt_trt_ep
                      'optypes_to_exclude_output_quant': don't quantize output of specified optypes
                      'dedicated_qdq_pair': whether dedicate QDQ pair, only vaild for onnxrt_trt_ep
+                     'calibration_workers': number of inference sessions running calibration in parallel,
+                                            only valid for onnx models
             quant_format: support 'default', 'QDQ' and 'QOperator'
             device: support 'cpu' and 'gpu'
             calibration_sampling_size: number of calibration sample
@@ -559,6 +589,12 @@ class _BaseQuantizationConfig:
             else:
                 return False
 
+        def calibration_workers(val=None):
+            if val is not None:
+                return check_value("calibration_workers", val, int)
+            else:
+                return 1
+
         RECIPES = {"smooth_quant": smooth_quant,
                    "smooth_quant_args": smooth_quant_args,
                    "fast_bias_correction": fast_bias_correction,
@@ -570,7 +606,8 @@ class _BaseQuantizationConfig:
                    "pre_post_process_quantization": pre_post_process_quantization,
                    "add_qdq_pair_to_weight": add_qdq_pair_to_weight,
                    "optypes_to_exclude_output_quant": optypes_to_exclude_output_quant,
-                   "dedicated_qdq_pair": dedicated_qdq_pair
+                   "dedicated_qdq_pair": dedicated_qdq_pair,
+                   "calibration_workers": calibration_workers
                    }
         self._recipes = {}
         for k in RECIPES.keys():
@@ -21,8 +21,10 @@
 import neural_compressor.data.datasets
 import neural_compressor.data.transforms
 from .datasets import Datasets, Dataset, IterableDataset, dataset_registry, TensorflowImageRecord, COCORecordDataset
+from .datasets.cached_dataset import CachedDataset
 from .dataloaders import DATALOADERS, DataLoader
 from .dataloaders.default_dataloader import DefaultDataLoader
+from .dataloaders.collate import BufferedCollate, BatchTransformCollate
 from .transforms import TRANSFORMS, BaseTransform, ComposeTransform, transform_registry, Postprocess
 from .transforms import LabelShift, BilinearImagenetTransform, TensorflowResizeCropImagenetTransform
 from .transforms import TFSquadV1PostTransform, TFSquadV1ModelZooPostTransform
@@ -35,9 +37,12 @@ __all__ = [
     "DataLoader",
     "DATALOADERS",
     "DefaultDataLoader",
+    "BufferedCollate",
+    "BatchTransformCollate",
     "Datasets",
     "Dataset",
     "IterableDataset",
+    "CachedDataset",
     "COCORecordDataset",
     "dataset_registry",
     'TensorflowImageRecord',
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Collate functions merging the samples into batches."""
+
+import collections
+import itertools
+import mmap
+import threading
+
+import numpy as np
+
+
+class _BufferRef(object):
+    """Placeholder of a batch array written into a shared buffer by a worker process."""
+
+    def __init__(self, slot, leaf, rows):
+        self.slot = slot
+        self.leaf = leaf
+        self.rows = rows
+
+
+class BufferedCollate(object):
+    """Collate function which writes the samples into a ring of reusable batch buffers.
+
+    It merges the samples the same way as `default_collate`, except that the stacked arrays are
+    views of buffers allocated once per ring slot instead of new arrays for every batch. A batch
+    is overwritten once the ring wraps around, so it's only valid until the next batch is
+    requested and must be copied if it's kept longer, e.g. for the calibration of custom code.
+
+    With the process workers of `DefaultDataLoader`, the buffers are shared with the forked
+    workers, which write the batches in place and send back the buffer slots instead of
+    pickling the arrays.
+
+    Example::
+
+        dataloader = DataLoader(framework='onnxrt_qlinearops', dataset=dataset, batch_size=32,
+                                collate_fn=BufferedCollate())
+    """
+
+    def __init__(self, num_buffers=2):
+        """Initialize BufferedCollate.
+
+        Args:
+            num_buffers (int, optional): the number of batch buffers in the ring. It's raised by
+                                         the dataloader to cover the prefetched batches.
+                                         Defaults to 2.
+        """
+        self.num_buffers = max(1, num_buffers)
+        # buffers[slot][leaf] is the array of a stacked leaf of the sample structure
+        self.buffers = collections.defaultdict(dict)
+        self.shared = False
+        self._counter = itertools.count()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def reserve(self, num_buffers):
+        """Make sure the ring has at least num_buffers slots."""
+        self.num_buffers = max(self.num_buffers, num_buffers)
+
+    def share(self):
+        """Move the buffers into anonymous shared memory to be inherited by the forked workers.
+
+        The buffers of all the slots are allocated with the layouts of the collated batches, so
+        it's called after the first batch is collated in the current process.
+        """
+        layouts = {}
+        for slot_buffers in self.buffers.values():
+            for leaf, buffer in slot_buffers.items():
+                layouts.setdefault(leaf, (buffer.shape, buffer.dtype))
+        self.buffers = collections.defaultdict(dict)
+        for slot in range(self.num_buffers):
+            for leaf, (shape, dtype) in layouts.items():
+                nbytes = int(np.prod(shape)) * dtype.itemsize
+                # the anonymous mapping is MAP_SHARED, so the writes of a child are visible
+                memory = mmap.mmap(-1, max(nbytes, 1))
+                self.buffers[slot][leaf] = np.frombuffer(memory, dtype=dtype,
+                                                         count=int(np.prod(shape))).reshape(shape)
+        self.shared = True
+
+    def set_slot(self, slot, in_worker=False):
+        """Set the slot of the next batch collated by the current thread.
+
+        Args:
+            slot (int): the sequence number of the batch, wrapped around the ring.
+            in_worker (bool, optional): whether the caller is a forked worker process, which
+                                        returns _BufferRef placeholders of the shared buffers.
+                                        Defaults to False.
+        """
+        self._local.slot = slot % self.num_buffers
+        self._local.in_worker = in_worker
+
+    def resolve(self, batch):
+        """Replace the _BufferRef placeholders returned by a worker process with the buffer views."""
+        if isinstance(batch, _BufferRef):
+            return self.buffers[batch.slot][batch.leaf][:batch.rows]
+        if isinstance(batch, dict):
+            return {key: self.resolve(value) for key, value in batch.items()}
+        if isinstance(batch, list) and any(isinstance(elem, (_BufferRef, dict, list)) for elem in batch):
+            return [self.resolve(elem) for elem in batch]
+        return batch
+
+    def __call__(self, batch):
+        """Merge data with outer dimension batch size."""
+        slot = getattr(self._local, 'slot', None)
+        if slot is None:
+            with self._lock:
+                slot = next(self._counter) % self.num_buffers
+        in_worker = getattr(self._local, 'in_worker', False)
+        self._local.slot = None
+        return self._collate(batch, slot, (), in_worker)
+
+    def _collate(self, batch, slot, leaf, in_worker):
+        elem = batch[0]
+        if isinstance(elem, collections.abc.Mapping):
+            return {key: self._collate([d[key] for d in batch], slot, leaf + (key,), in_worker)
+                    for key in elem}
+        elif isinstance(elem, collections.abc.Sequence):
+            batch = zip(*batch)
+            return [self._collate(samples, slot, leaf + (idx,), in_worker)
+                    for idx, samples in enumerate(batch)]
+        elif isinstance(elem, np.ndarray):
+            return self._stack(batch, slot, leaf, in_worker)
+        else:
+            return batch
+
+    def _stack(self, batch, slot, leaf, in_worker):
+        elem = batch[0]
+        if any(sample.shape != elem.shape or sample.dtype != elem.dtype for sample in batch):
+            try:
+                return np.stack(batch)
+            except:
+                return batch
+        buffer = self.buffers[slot].get(leaf)
+        if buffer is None or buffer.shape[1:] != elem.shape or buffer.dtype != elem.dtype \
+            or buffer.shape[0] < len(batch):
+            if self.shared:
+                # the shared buffers can't be reallocated by the workers, so fall back to a copy
+                return np.stack(batch)
+            buffer = np.empty((len(batch),) + elem.shape, dtype=elem.dtype)
+            self.buffers[slot][leaf] = buffer
+        for idx, sample in enumerate(batch):
+            buffer[idx] = sample
+        if in_worker:
+            return _BufferRef(slot, leaf, len(batch))
+        return buffer[:len(batch)]
+
+
+class BatchTransformCollate(object):
+    """Collate function which applies a transform on the collated batch.
+
+    The deterministic tail of a ComposeTransform, split by `ComposeTransform.split_batch`, runs
+    once per batch with vectorized numpy operations instead of once per sample. The samples are
+    (image, label) pairs as for the per-sample transforms. If the images can't be stacked, e.g.
+    their sizes differ before a crop, the tail is applied per sample.
+
+    Example::
+
+        sample_transform, batch_transform = transform.split_batch()
+        dataset = Datasets('onnxrt_qlinearops')['ImageFolder'](root=root, transform=sample_transform)
+        dataloader = DataLoader(framework='onnxrt_qlinearops', dataset=dataset, batch_size=32,
+                                collate_fn=BatchTransformCollate(batch_transform))
+    """
+
+    def __init__(self, transform, collate_fn=None):
+        """Initialize BatchTransformCollate.
+
+        Args:
+            transform (object): the transform implementing `batch_call`, e.g. the tail of
+                                `ComposeTransform.split_batch`, None to only collate.
+            collate_fn (callable, optional): merge data with outer dimension batch size.
+                                             Defaults to None, i.e. default_collate.
+        """
+        if collate_fn is None:
+            from .default_dataloader import default_collate
+            collate_fn = default_collate
+        self.transform = transform
+        self.collate_fn = collate_fn
+
+    def __call__(self, batch):
+        """Merge data with outer dimension batch size and transform the batch."""
+        if self.transform is None:
+            return self.collate_fn(batch)
+        images, labels = self.collate_fn(batch)
+        if isinstance(images, np.ndarray):
+            images, labels = self.transform.batch_call((images, labels))
+        else:
+            images = [self.transform((image, None))[0] for image in images]
+            images = self.collate_fn([(image,) for image in images])[0]
+        return [images, labels]
@@ -23,6 +23,7 @@ from math import ceil, floor
 from abc import abstractmethod
 from .sampler import IterableSampler, SequentialSampler, BatchSampler
 from .fetcher import FETCHERS
+from .prefetcher import Prefetcher
 from .base_dataloader import BaseDataLoader
 
 def default_collate(batch):    # pragma: no cover
@@ -46,7 +47,7 @@ class DefaultDataLoader(BaseDataLoader):    # pragma: no cover
     
     def __init__(self, dataset, batch_size=1, last_batch='rollover', collate_fn=None,
                  sampler=None, batch_sampler=None, num_workers=0, pin_memory=False,
-                 shuffle=False, distributed=False):
+                 shuffle=False, distributed=False, worker_type='thread', prefetch_factor=2):
         """Initialize DefaultDataLoader.
 
         Args:
@@ -58,10 +59,16 @@ class DefaultDataLoader(BaseDataLoader):    # pragma: no cover
             collate_fn (callable, optional): merge data with outer dimension batch size. Defaults to None.
             sampler (Sampler, optional): Sampler object to sample data. Defaults to None.
             batch_sampler (BatchSampler, optional): BatchSampler object to generate batch of indices. Defaults to None.
-            num_workers (int, optional): number of subprocesses to use for data loading. Defaults to 0.
+            num_workers (int, optional): number of workers to fetch and collate the batches ahead of
+                                         the consumer, 0 means loading the data in the main thread.
+                                         Defaults to 0.
             pin_memory (bool, optional): whether to copy data into pinned memory before returning. Defaults to False.
             shuffle (bool, optional): whether to shuffle data. Defaults to False.
-            distributed (bool, optional): whether the dataloader is distributed. Defaults to False.            
+            distributed (bool, optional): whether the dataloader is distributed. Defaults to False.
+            worker_type (str, optional): 'thread' or 'process' workers. The process workers are forked
+                                         and suit the transforms holding the GIL. Defaults to 'thread'.
+            prefetch_factor (int, optional): number of batches fetched in advance by each worker.
+                                             Defaults to 2.
         """
         self.dataset = dataset
         self.last_batch = last_batch
@@ -73,6 +80,8 @@ class DefaultDataLoader(BaseDataLoader):    # pragma: no cover
         self._batch_size = batch_size
         self.shuffle = shuffle
         self.distributed = distributed
+        self.worker_type = worker_type
+        self.prefetch_factor = prefetch_factor
         self.drop_last = False if last_batch == 'rollover' else True
         if self.collate_fn == None:
             self.collate_fn = default_collate
@@ -125,6 +134,11 @@ class DefaultDataLoader(BaseDataLoader):    # pragma: no cover
         self.batch_sampler = BatchSampler(sampler, batch_size, self.drop_last)
         self.fetcher = FETCHERS[self.dataset_type](dataset, collate_fn, self.drop_last, distributed)
 
+        if num_workers:
+            prefetcher = Prefetcher(self.fetcher, num_workers, self.worker_type, self.prefetch_factor)
+            yield from prefetcher(self.batch_sampler)
+            return
+
         for batched_indices in self.batch_sampler:
             try:
                 data = self.fetcher(batched_indices)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Worker pool to fetch and collate the batches ahead of the consumer."""
+
+import collections
+import itertools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from neural_compressor.utils import logger
+from .collate import BufferedCollate
+from .fetcher import IterableFetcher
+
+WORKER_TYPES = ('thread', 'process')
+
+# the fetcher inherited by the forked worker processes
+_worker_fetcher = None
+
+
+def _init_worker(fetcher):
+    """Set the fetcher of the worker process."""
+    global _worker_fetcher
+    _worker_fetcher = fetcher
+
+
+def _fetch(batched_indices, seq):
+    """Fetch the batch in the worker process."""
+    return _fetch_into(_worker_fetcher, batched_indices, seq, in_worker=True)
+
+
+def _fetch_into(fetcher, batched_indices, seq, in_worker=False):
+    """Fetch the batch, collating it into the buffer slot of its sequence number if buffered."""
+    if isinstance(fetcher.collate_fn, BufferedCollate):
+        fetcher.collate_fn.set_slot(seq, in_worker)
+    return fetcher(batched_indices)
+
+
+class Prefetcher(object):
+    """Fetch the batches with a pool of workers and deliver them in the sampling order.
+
+    At most `num_workers * prefetch_factor` batches are in flight, so the memory is bounded
+    while the decoding and transforms of the next batches overlap with the consumer. The
+    process workers are forked from the current process, so only the indices and the
+    collated batches are serialized while the dataset and collate_fn are inherited. With a
+    BufferedCollate, the batches are collated into its ring of buffers, which are shared with
+    the process workers so that the batches are not serialized either.
+    """
+
+    def __init__(self, fetcher, num_workers, worker_type='thread', prefetch_factor=2):
+        """Initialize Prefetcher.
+
+        Args:
+            fetcher (Fetcher): the fetcher to get a batch from the batched indices.
+            num_workers (int): the number of workers.
+            worker_type (str, optional): 'thread' or 'process'. Defaults to 'thread'.
+            prefetch_factor (int, optional): the number of batches fetched in advance by each worker.
+                                             Defaults to 2.
+        """
+        assert worker_type in WORKER_TYPES, \
+            "worker_type should be one of {}, but got {}".format(WORKER_TYPES, worker_type)
+        if isinstance(fetcher, IterableFetcher):
+            # the samples of an iterable dataset are drawn from a single iterator in order
+            logger.debug("Fetch the batches of the iterable dataset with a single thread worker.")
+            num_workers, worker_type = 1, 'thread'
+        if worker_type == 'process' and 'fork' not in multiprocessing.get_all_start_methods():
+            logger.warning("Process workers need the fork start method, use thread workers instead.")
+            worker_type = 'thread'
+        self.fetcher = fetcher
+        self.num_workers = num_workers
+        self.worker_type = worker_type
+        self.prefetch_size = max(1, num_workers * prefetch_factor)
+        self.buffered = fetcher.collate_fn if isinstance(fetcher.collate_fn, BufferedCollate) else None
+        if self.buffered is not None:
+            # the batches in flight and the one being consumed need their own buffers
+            self.buffered.reserve(self.prefetch_size + 1)
+
+    def _create_executor(self):
+        if self.worker_type == 'process':
+            return ProcessPoolExecutor(max_workers=self.num_workers,
+                                       mp_context=multiprocessing.get_context('fork'),
+                                       initializer=_init_worker, initargs=(self.fetcher,))
+        return ThreadPoolExecutor(max_workers=self.num_workers)
+
+    def __call__(self, batch_sampler):
+        """Yield the batches of the batched indices in order.
+
+        Args:
+            batch_sampler (iterable): the batched indices.
+        """
+        batched_indices_iter = iter(batch_sampler)
+        seq = itertools.count()
+        if self.worker_type == 'process' and self.buffered is not None:
+            # collate the first batch here to get the layouts of the shared buffers before forking
+            for batched_indices in batched_indices_iter:
+                data = _fetch_into(self.fetcher, batched_indices, next(seq))
+                self.buffered.share()
+                yield data
+                break
+        executor = self._create_executor()
+        if self.worker_type == 'process':
+            submit = lambda batched_indices: executor.submit(_fetch, batched_indices, next(seq))
+        else:
+            submit = lambda batched_indices: executor.submit(_fetch_into, self.fetcher,
+                                                             batched_indices, next(seq))
+        pending = collections.deque()
+        try:
+            for batched_indices in batched_indices_iter:
+                pending.append(submit(batched_indices))
+                if len(pending) == self.prefetch_size:
+                    break
+            while pending:
+                try:
+                    data = pending.popleft().result()
+                except StopIteration:
+                    return
+                # refill before yielding so the workers keep busy while the batch is consumed
+                for batched_indices in batched_indices_iter:
+                    pending.append(submit(batched_indices))
+                    break
+                if self.buffered is not None and self.worker_type == 'process':
+                    data = self.buffered.resolve(data)
+                yield data
+        finally:
+            # the consumer may stop early, e.g. the evaluation reaches its iteration limit
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
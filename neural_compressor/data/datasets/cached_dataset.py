@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Cache the preprocessed samples of a dataset across the evaluation passes."""
+
+import collections
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+
+import numpy as np
+
+from neural_compressor.utils import logger
+
+
+def get_transform_fingerprint(transform):
+    """Get the fingerprint of a transform chain from the types and attributes of its transforms.
+
+    Args:
+        transform (object): the transform, e.g. a ComposeTransform, or None.
+
+    Returns:
+        str: the description of the transform chain.
+    """
+    if isinstance(transform, (list, tuple)):
+        return '[' + ','.join(get_transform_fingerprint(item) for item in transform) + ']'
+    if isinstance(transform, dict):
+        return '{' + ','.join('{}:{}'.format(key, get_transform_fingerprint(value))
+                              for key, value in sorted(transform.items(), key=lambda x: str(x[0]))) + '}'
+    if callable(transform) and hasattr(transform, '__dict__') and not isinstance(transform, type):
+        return '{}({})'.format(type(transform).__name__, get_transform_fingerprint(vars(transform)))
+    return repr(transform)
+
+
+def _is_random(transform):
+    """Check whether the transform chain has random transforms, e.g. RandomResizedCrop."""
+    if isinstance(transform, (list, tuple)):
+        return any(_is_random(item) for item in transform)
+    if isinstance(transform, dict):
+        return any(_is_random(value) for value in transform.values())
+    if callable(transform) and hasattr(transform, '__dict__') and not isinstance(transform, type):
+        return type(transform).__name__.startswith('Random') or _is_random(vars(transform))
+    return False
+
+
+class _Spilled(object):
+    """Placeholder of an array spilled to the row of a memory-mapped store."""
+
+    def __init__(self, leaf, index):
+        self.leaf = leaf
+        self.index = index
+
+
+class CachedDataset(object):
+    """Dataset wrapper which caches the preprocessed samples for the repeated passes of the tuning.
+
+    The baseline and every tuning trial evaluate the same dataset, so the decoding and the
+    transforms of the samples are done once. The samples are kept in an in-memory LRU cache
+    within `max_bytes`, and the evicted ones spill to memory-mapped `.npy` stores, one per
+    array of the sample structure with a row per dataset index. The entries are keyed by the
+    dataset index and the fingerprint of the dataset transform, so replacing the transform,
+    e.g. `dataset.transform = ...`, doesn't return stale samples. The fingerprint is computed
+    once per transform object, so a transform modified in place needs a clear(). The datasets
+    with random transforms are not cached. The stores are removed by clear(), or once the
+    CachedDataset is garbage collected or the process exits.
+
+    The cached arrays are read-only, and the cache is local to the process, so it's filled by
+    thread workers of the dataloader but not by process workers.
+
+    Example::
+
+        dataset = Datasets('onnxrt_qlinearops')['ImageFolder'](root=root, transform=transform)
+        dataloader = DataLoader(framework='onnxrt_qlinearops', dataset=CachedDataset(dataset))
+    """
+
+    def __init__(self, dataset, max_bytes=1 << 30, spill=True, cache_dir=None):
+        """Initialize CachedDataset.
+
+        Args:
+            dataset (object): the dataset with __getitem__ and __len__.
+            max_bytes (int, optional): the byte budget of the in-memory cache. Defaults to 1 GiB.
+            spill (bool, optional): whether to spill the evicted samples to disk. Defaults to True.
+            cache_dir (str, optional): the directory of the memory-mapped stores. Defaults to
+                                       the sample_cache sub-directory of the workspace.
+        """
+        assert hasattr(dataset, '__getitem__') and hasattr(dataset, '__len__'), \
+            "CachedDataset only supports the datasets with __getitem__ and __len__."
+        self.dataset = dataset
+        self.max_bytes = max_bytes
+        self.spill = spill
+        if cache_dir is None:
+            from neural_compressor.config import options
+            cache_dir = os.path.join(options.workspace, 'sample_cache')
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+        self.cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # (fingerprint, index) -> sample in memory, in the order of the last access
+        self._memory = collections.OrderedDict()
+        # (fingerprint, index) -> sample structure with _Spilled placeholders
+        self._spilled = {}
+        # fingerprint -> {leaf: memmap of the spilled arrays}
+        self._stores = collections.defaultdict(dict)
+        self._store_dir = None
+        self._store_finalizer = None
+        self._lock = threading.RLock()
+        self._transform = getattr(dataset, 'transform', None)
+        self._transform_fingerprint = self._get_fingerprint(self._transform)
+
+    def __getattr__(self, name):
+        """Forward the other attributes, e.g. transform, to the wrapped dataset."""
+        if name == 'dataset':
+            raise AttributeError(name)
+        return getattr(self.dataset, name)
+
+    def __len__(self):
+        """Length of the dataset."""
+        return len(self.dataset)
+
+    @staticmethod
+    def _get_fingerprint(transform):
+        if _is_random(transform):
+            return None
+        return hashlib.sha256(get_transform_fingerprint(transform).encode()).hexdigest()[:16]
+
+    def _fingerprint(self):
+        transform = getattr(self.dataset, 'transform', None)
+        if transform is not self._transform:
+            # the transform is replaced
+            self._transform = transform
+            self._transform_fingerprint = self._get_fingerprint(transform)
+        return self._transform_fingerprint
+
+    def __getitem__(self, index):
+        """Get the preprocessed sample from the cache, or from the dataset on a miss."""
+        fingerprint = self._fingerprint()
+        if fingerprint is None:
+            return self.dataset[index]
+        key = (fingerprint, index)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+            if key in self._spilled:
+                self.hits += 1
+                return self._load(fingerprint, self._spilled[key])
+        sample = self.dataset[index]
+        sample = self._freeze(sample)
+        with self._lock:
+            self.misses += 1
+            if key not in self._memory:
+                self._memory[key] = sample
+                self.cached_bytes += self._nbytes(sample)
+                self._evict()
+        return sample
+
+    def clear(self):
+        """Drop the cached samples and remove the memory-mapped stores."""
+        with self._lock:
+            self._memory.clear()
+            self._spilled.clear()
+            self._stores.clear()
+            self.cached_bytes = 0
+            if self._store_finalizer is not None:
+                self._store_finalizer()
+                self._store_finalizer = None
+                self._store_dir = None
+            self._transform = getattr(self.dataset, 'transform', None)
+            self._transform_fingerprint = self._get_fingerprint(self._transform)
+
+    def _evict(self):
+        while self.cached_bytes > self.max_bytes and self._memory:
+            (fingerprint, index), sample = self._memory.popitem(last=False)
+            self.cached_bytes -= self._nbytes(sample)
+            if self.spill:
+                spilled = self._spill(fingerprint, index, sample)
+                if spilled is not None:
+                    self._spilled[(fingerprint, index)] = spilled
+
+    def _spill(self, fingerprint, index, sample, leaf=()):
+        """Write the arrays of the sample into the stores, None if an array doesn't fit them."""
+        if isinstance(sample, np.ndarray):
+            store = self._stores[fingerprint].get(leaf)
+            if store is None:
+                store = self._create_store(fingerprint, leaf, sample)
+            if store.shape[1:] != sample.shape or store.dtype != sample.dtype:
+                return None
+            store[index] = sample
+            return _Spilled(leaf, index)
+        if isinstance(sample, (list, tuple)):
+            items = []
+            for idx, item in enumerate(sample):
+                item = self._spill(fingerprint, index, item, leaf + (idx,))
+                if item is None:
+                    return None
+                items.append(item)
+            return type(sample)(items)
+        if isinstance(sample, dict):
+            items = {}
+            for key, value in sample.items():
+                value = self._spill(fingerprint, index, value, leaf + (key,))
+                if value is None:
+                    return None
+                items[key] = value
+            return items
+        return sample
+
+    def _create_store(self, fingerprint, leaf, sample):
+        if self._store_dir is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._store_dir = tempfile.mkdtemp(dir=self.cache_dir)
+            # the stores are sized for the whole dataset, don't leave them in the workspace
+            self._store_finalizer = weakref.finalize(
+                self, shutil.rmtree, self._store_dir, ignore_errors=True)
+        path = os.path.join(self._store_dir, '{}_{}.npy'.format(fingerprint, len(self._stores[fingerprint])))
+        store = np.lib.format.open_memmap(path, mode='w+', dtype=sample.dtype,
+                                          shape=(len(self.dataset),) + sample.shape)
+        logger.debug("Spill the cached samples to {}.".format(path))
+        self._stores[fingerprint][leaf] = store
+        return store
+
+    def _load(self, fingerprint, sample):
+        if isinstance(sample, _Spilled):
+            return self._freeze(self._stores[fingerprint][sample.leaf][sample.index])
+        if isinstance(sample, (list, tuple)):
+            return type(sample)(self._load(fingerprint, item) for item in sample)
+        if isinstance(sample, dict):
+            return {key: self._load(fingerprint, value) for key, value in sample.items()}
+        return sample
+
+    def _freeze(self, sample):
+        """Make the arrays read-only so the consumers can't modify the cached samples."""
+        if isinstance(sample, np.ndarray):
+            sample = sample.view()
+            sample.flags.writeable = False
+        elif isinstance(sample, (list, tuple)):
+            sample = type(sample)(self._freeze(item) for item in sample)
+        elif isinstance(sample, dict):
+            sample = {key: self._freeze(value) for key, value in sample.items()}
+        return sample
+
+    def _nbytes(self, sample):
+        if isinstance(sample, np.ndarray):
+            return sample.nbytes
+        if isinstance(sample, (list, tuple)):
+            return sum(self._nbytes(item) for item in sample)
+        if isinstance(sample, dict):
+            return sum(self._nbytes(value) for value in sample.values())
+        return 0
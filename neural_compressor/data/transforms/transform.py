@@ -385,7 +385,11 @@ def transform_registry(transform_type, process, framework):
 
 
 class BaseTransform(object):
-    """The base class for transform."""
+    """The base class for transform.
+
+    The deterministic transforms which can be applied on a batch of samples stacked on the
+    first axis also implement `batch_call`, see `ComposeTransform.split_batch`.
+    """
 
     @abstractmethod
     def __call__(self, *args, **kwargs):
@@ -393,6 +397,13 @@ class BaseTransform(object):
         raise NotImplementedError
 
 
+def support_batch(transform):
+    """Check whether the transform can be applied on a batch of samples with `batch_call`."""
+    if isinstance(transform, ComposeTransform):
+        return all(support_batch(item) for item in transform.transform_list)
+    return callable(getattr(transform, 'batch_call', None))
+
+
 class TensorflowWrapFunction(object):
     """Tensorflow wrapper function class."""
 
@@ -528,6 +539,29 @@ class ComposeTransform(BaseTransform):
             sample = transform(sample)
         return sample
 
+    def batch_call(self, sample):
+        """Call transforms in transform_list on a batch of samples."""
+        for transform in self.transform_list:
+            sample = transform.batch_call(sample)
+        return sample
+
+    def split_batch(self):
+        """Split the transforms into the per-sample head and the tail applied on the batch.
+
+        The tail is the longest suffix of the transforms supporting `batch_call`, e.g. crop,
+        normalize, cast and transpose after a resize. The head is given to the dataset and the
+        tail to the BatchTransformCollate of the dataloader, so the tail runs once per batch with
+        vectorized numpy operations instead of once per sample.
+
+        Returns:
+            tuple: (head ComposeTransform, tail ComposeTransform or None if no transform supports it)
+        """
+        index = len(self.transform_list)
+        while index > 0 and support_batch(self.transform_list[index - 1]):
+            index -= 1
+        tail = ComposeTransform(self.transform_list[index:]) if index < len(self.transform_list) else None
+        return ComposeTransform(self.transform_list[:index]), tail
+
 @transform_registry(transform_type="CropToBoundingBox", process="preprocess", \
         framework="pytorch")
 class CropToBoundingBox(BaseTransform):
@@ -779,6 +813,13 @@ class Transpose(BaseTransform):
         image = np.transpose(image, axes=self.perm)
         return (image, label)
 
+    def batch_call(self, sample):
+        """Transpose the images in the batch according to perm, keeping the batch axis first."""
+        image, label = sample
+        assert len(image.shape) == len(self.perm) + 1, "Image rank doesn't match Perm rank"
+        image = np.transpose(image, axes=[0] + [axis + 1 for axis in self.perm])
+        return (image, label)
+
 @transform_registry(transform_type="Transpose", process="preprocess", \
                     framework="tensorflow, tensorflow_itex")
 class TensorflowTranspose(Transpose):
@@ -791,6 +832,9 @@ class TensorflowTranspose(Transpose):
         tuple of processed image and label
     """
 
+    # the batch transform of Transpose is numpy only
+    batch_call = None
+
     def __call__(self, sample):
         """Transpose the image according to perm in sample."""
         image, label = sample
@@ -812,6 +856,9 @@ class MXNetTranspose(Transpose):
         tuple of processed image and label
     """
 
+    # the batch transform of Transpose is numpy only
+    batch_call = None
+
     def __call__(self, sample):
         """Transpose the image according to perm in sample."""
         image, label = sample
@@ -830,6 +877,9 @@ class PyTorchTranspose(Transpose):
         tuple of processed image and label
     """
 
+    # the batch transform of Transpose is numpy only
+    batch_call = None
+
     def __call__(self, sample):
         """Transpose the image according to perm in sample."""
         image, label = sample
@@ -990,6 +1040,10 @@ class CastONNXTransform(BaseTransform):
         image = image.astype(np_dtype_map[self.dtype])
         return (image, label)
 
+    def batch_call(self, sample):
+        """Convert the images in the batch to given dtype."""
+        return self(sample)
+
 @transform_registry(transform_type="Cast", process="general", framework="pytorch")
 class CastPyTorchTransform(BaseTransform):
     """Convert image to given dtype.
@@ -1509,6 +1563,10 @@ class RescaleTransform(BaseTransform):
             image = image.astype('float32') / 255.
         return (image, label)
 
+    def batch_call(self, sample):
+        """Scale the values of the images in the batch."""
+        return self(sample)
+
 @transform_registry(transform_type='AlignImageChannel', process="preprocess", \
                     framework='tensorflow, tensorflow_itex, \
                                onnxrt_qlinearops, onnxrt_integerops, mxnet')
@@ -1865,6 +1923,23 @@ class CenterCropTransform(BaseTransform):
         image = image[y0:y0 + self.height, x0:x0 + self.width, :]
         return (image, label)
 
+    def batch_call(self, sample):
+        """Crop the NHWC images in the batch at the center to the given size."""
+        image, label = sample
+        h, w = image.shape[1], image.shape[2]
+        if h + 1 < self.height or w + 1 < self.width:
+            raise ValueError(
+                "Required crop size {} is larger then input image size {}".format(
+                    (self.height, self.width), (h, w)))
+
+        if self.height == h and self.width == w:
+            return (image, label)
+
+        y0 = (h - self.height) // 2
+        x0 = (w - self.width) // 2
+        image = image[:, y0:y0 + self.height, x0:x0 + self.width, :]
+        return (image, label)
+
 @transform_registry(transform_type="Normalize", process="preprocess", framework="mxnet")
 class MXNetNormalizeTransform(BaseTransform):
     """Normalize a image with mean and standard deviation.
@@ -1958,6 +2033,21 @@ class NormalizeTransform(BaseTransform):
         image = (image - self.mean) / self.std
         return (image, label)
 
+    def batch_call(self, sample):
+        """Normalize the NHWC images in the batch."""
+        image, label = sample
+        assert len(self.mean) == image.shape[-1], 'Mean channel must match image channel'
+        # repeat the channel stats along the width so numpy loops over whole rows
+        # instead of the few channels, the results are the same as __call__
+        mean = np.tile(np.asarray(self.mean), (image.shape[-2], 1))
+        std = np.tile(np.asarray(self.std), (image.shape[-2], 1))
+        image = np.subtract(image, mean)
+        if image.dtype == np.result_type(image, std):
+            np.true_divide(image, std, out=image)
+        else:
+            image = image / std
+        return (image, label)
+
 @transform_registry(transform_type="RandomCrop", process="preprocess", \
                 framework="mxnet, onnxrt_qlinearops, onnxrt_integerops")
 class RandomCropTransform(BaseTransform):
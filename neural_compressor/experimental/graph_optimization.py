@@ -17,7 +17,6 @@
 """Graph Optimization Entry."""
 
 import os
-import pickle
 import random
 import tempfile
 import sys
@@ -28,7 +27,7 @@ from ..conf.dotdict import deep_get, deep_set, DotDict
 from ..strategy import STRATEGIES
 from ..utils import logger
 from ..utils.create_obj_from_config import create_dataloader
-from ..utils.utility import CpuInfo, time_limit
+from ..utils.utility import CpuInfo, time_limit, get_tuning_history
 from .common import Model as NCModel
 from ..model import BaseModel
 from ..model.model import get_model_fwk_name
@@ -149,8 +148,7 @@ class Graph_Optimization():
         if self.resume_file:
             assert os.path.exists(self.resume_file), \
                 "The specified resume file {} doesn't exist!".format(self.resume_file)
-            with open(self.resume_file, 'rb') as f:
-                _resume = pickle.load(f).__dict__
+            _resume = {'tuning_history': get_tuning_history(self.resume_file)}
 
         self.strategy = STRATEGIES[strategy](
             self._model,
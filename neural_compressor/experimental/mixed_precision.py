@@ -17,7 +17,6 @@
 # ==============================================================================
 """Class for low precision model generation across multiple framework backends."""
 import os
-import pickle
 import random
 import sys
 import numpy as np
@@ -27,7 +26,7 @@ from ..conf.dotdict import deep_get
 from ..strategy import STRATEGIES
 from ..utils import logger
 from ..utils.create_obj_from_config import create_dataloader
-from ..utils.utility import CpuInfo, time_limit
+from ..utils.utility import CpuInfo, time_limit, get_tuning_history
 from ..model import BaseModel
 from .graph_optimization import GraphOptimization
 
@@ -159,8 +158,7 @@ class MixedPrecision(GraphOptimization):
         if self.resume_file: # pragma: no cover
             assert os.path.exists(self.resume_file), \
                 "The specified resume file {} doesn't exist!".format(self.resume_file)
-            with open(self.resume_file, 'rb') as f:
-                _resume = pickle.load(f).__dict__
+            _resume = {'tuning_history': get_tuning_history(self.resume_file)}
 
         self.strategy = STRATEGIES[strategy](
             self._model,
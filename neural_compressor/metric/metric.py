@@ -24,7 +24,6 @@ from abc import abstractmethod
 from ctypes import Union
 from neural_compressor.utils.utility import LazyImport, singleton
 from neural_compressor.utils import logger
-from sklearn.metrics import accuracy_score
 
 torch = LazyImport('torch')
 tf = LazyImport('tensorflow')
@@ -573,18 +572,17 @@ class Accuracy(BaseMetric):
     """The Accuracy for the classification tasks.
     
     The accuracy score is the proportion of the total number of predictions
-    that were correct classified.
+    that were correct classified. The correct predictions are counted batch by
+    batch, so the memory doesn't grow with the evaluation dataset.
 
     Attributes:
-        pred_list: List of prediction to score.
-        label_list: List of labels to score.
+        correct_num: The number of correct predictions.
         sample: The total number of samples.
     """
     
     def __init__(self):
-        """Initialize predictions, labels and sample."""
-        self.pred_list = []
-        self.label_list = []
+        """Initialize the number of correct predictions and samples."""
+        self.correct_num = 0
         self.sample = 0
 
     def update(self, preds, labels, sample_weight=None):
@@ -598,12 +596,13 @@ class Accuracy(BaseMetric):
         preds, labels = _accuracy_shape_check(preds, labels)
         update_type = _accuracy_type_check(preds, labels)
         if update_type == 'binary':
-            self.pred_list.extend(preds)
-            self.label_list.extend(labels)
+            if preds.shape != labels.shape and preds.size == labels.size:
+                # (N, 1) predictions of (N,) labels
+                preds = preds.reshape(labels.shape)
+            self.correct_num += int(np.sum(preds == labels))
             self.sample += labels.shape[0]
         elif update_type == 'multiclass':
-            self.pred_list.extend(np.argmax(preds, axis=1).astype('int32'))
-            self.label_list.extend(labels)
+            self.correct_num += int(np.sum(np.argmax(preds, axis=1).astype('int32') == labels))
             self.sample += labels.shape[0]
         elif update_type == 'multilabel':
             #(N, C, ...) -> (N*..., C)
@@ -616,19 +615,16 @@ class Accuracy(BaseMetric):
                 preds = preds.transpose(trans_list).reshape(-1, num_label)
                 labels = labels.transpose(trans_list).reshape(-1, num_label)
             self.sample += preds.shape[0]*preds.shape[1]
-            self.pred_list.append(preds)
-            self.label_list.append(labels)
+            self.correct_num += int(np.sum(preds == labels))
 
     def reset(self):
-        """Clear the predictions and labels."""
-        self.pred_list = []
-        self.label_list = []
+        """Clear the number of correct predictions and samples."""
+        self.correct_num = 0
         self.sample = 0
 
     def result(self):
         """Compute the accuracy."""
-        correct_num = np.sum(
-            np.array(self.pred_list) == np.array(self.label_list))
+        correct_num = self.correct_num
         if getattr(self, '_hvd', None) is not None:
             allghter_correct_num = sum(self._hvd.allgather_object(correct_num))
             allgather_sample = sum(self._hvd.allgather_object(self.sample))
@@ -733,21 +729,21 @@ class MAE(BaseMetric):
     difference between the predicted and actual numeric values.
     
     Attributes:
-        pred_list: List of prediction to score.
-        label_list: List of references corresponding to the prediction result.
+        aes_sum: The sum of the absolute errors.
+        aes_size: The number of the absolute errors.
         compare_label (bool): Whether to compare label. False if there are no 
           labels and will use FP32 preds as labels.
     """
     
     def __init__(self, compare_label=True):
-        """Initialize the list of prediction and labels.
+        """Initialize the sum and number of the absolute errors.
 
         Args:
             compare_label: Whether to compare label. False if there are no 
               labels and will use FP32 preds as labels.
         """
-        self.label_list = []
-        self.pred_list = []
+        self.aes_sum = 0
+        self.aes_size = 0
         self.compare_label = compare_label
 
     def update(self, preds, labels, sample_weight=None):
@@ -759,13 +755,15 @@ class MAE(BaseMetric):
             sample_weight: The sample weight.
         """
         preds, labels = _shape_validate(preds, labels)
-        self.label_list.extend(labels)
-        self.pred_list.extend(preds)
+        for (a, b) in zip(labels, preds):
+            ae = abs(a-b)
+            self.aes_sum += np.sum(ae)
+            self.aes_size += ae.size
 
     def reset(self):
-        """Clear the predictions and labels."""
-        self.label_list = []
-        self.pred_list = []
+        """Clear the sum and number of the absolute errors."""
+        self.aes_sum = 0
+        self.aes_size = 0
 
     def result(self):
         """Compute the MAE score.
@@ -773,9 +771,7 @@ class MAE(BaseMetric):
         Returns:
             The MAE score.
         """
-        aes = [abs(a-b) for (a,b) in zip(self.label_list, self.pred_list)]
-        aes_sum = sum([np.sum(ae) for ae in aes])
-        aes_size = sum([ae.size for ae in aes])
+        aes_sum, aes_size = self.aes_sum, self.aes_size
         assert aes_size, "predictions shouldn't be none"
         if getattr(self, '_hvd', None) is not None:
             aes_sum = sum(self._hvd.allgather_object(aes_sum))
@@ -836,21 +832,21 @@ class MSE(BaseMetric):
     and the actual values.
     
     Attributes:
-        pred_list: List of prediction to score.
-        label_list: List of references corresponding to the prediction result.
+        squares_sum: The sum of the squared errors.
+        squares_size: The number of the squared errors.
         compare_label (bool): Whether to compare label. False if there are no labels
                               and will use FP32 preds as labels.
     """
     
     def __init__(self, compare_label=True):
-        """Initialize the list of prediction and labels.
+        """Initialize the sum and number of the squared errors.
 
         Args:
             compare_label: Whether to compare label. False if there are no 
               labels and will use FP32 preds as labels.
         """
-        self.label_list = []
-        self.pred_list = []
+        self.squares_sum = 0
+        self.squares_size = 0
         self.compare_label = compare_label
 
     def update(self, preds, labels, sample_weight=None):
@@ -862,13 +858,15 @@ class MSE(BaseMetric):
             sample_weight: The sample weight.
         """
         preds, labels = _shape_validate(preds, labels)
-        self.pred_list.extend(preds)
-        self.label_list.extend(labels)
+        for (a, b) in zip(labels, preds):
+            square = (a-b)**2.0
+            self.squares_sum += np.sum(square)
+            self.squares_size += square.size
 
     def reset(self):
-        """Clear the predictions and labels."""
-        self.label_list = []
-        self.pred_list = []
+        """Clear the sum and number of the squared errors."""
+        self.squares_sum = 0
+        self.squares_size = 0
 
     def result(self):
         """Compute the MSE score.
@@ -876,9 +874,7 @@ class MSE(BaseMetric):
         Returns:
             The MSE score.
         """
-        squares = [(a-b)**2.0 for (a,b) in zip(self.label_list, self.pred_list)]
-        squares_sum = sum([np.sum(square) for square in squares])
-        squares_size = sum([square.size for square in squares])
+        squares_sum, squares_size = self.squares_sum, self.squares_size
         assert squares_size, "predictions should't be None"
         if getattr(self, '_hvd', None) is not None:
             squares_sum = sum(self._hvd.allgather_object(squares_sum))
@@ -919,18 +915,17 @@ class TensorflowTopK(BaseMetric):
         """
         preds, labels = _topk_shape_validate(preds, labels)
 
-        labels = labels.reshape([len(labels)])
-        with tf.Graph().as_default() as acc_graph:
-          topk = tf.nn.in_top_k(predictions=tf.constant(preds, dtype=tf.float32),
-                                targets=tf.constant(labels, dtype=tf.int32), k=self.k)
-          fp32_topk = tf.cast(topk, tf.float32)
-          correct_tensor = tf.reduce_sum(input_tensor=fp32_topk)
-
-          with tf.compat.v1.Session() as acc_sess:
-            correct  = acc_sess.run(correct_tensor)
+        labels = labels.reshape([len(labels)]).astype(np.int64)
+        preds = preds.astype(np.float32)
+        # the same as tf.nn.in_top_k, the label is in the top k if less than k classes
+        # have a higher prediction, so the ties at the boundary are all in the top k
+        valid = (labels >= 0) & (labels < preds.shape[1])
+        target_preds = np.take_along_axis(preds, np.where(valid, labels, 0)[:, None], axis=1)
+        higher = np.count_nonzero(preds > target_preds, axis=1)
+        correct = valid & np.isfinite(target_preds[:, 0]) & (higher < self.k)
 
         self.num_sample += len(labels)
-        self.num_correct += correct
+        self.num_correct += int(np.count_nonzero(correct))
 
     def reset(self):
         """Reset the number of samples and correct predictions."""
@@ -985,19 +980,19 @@ class GeneralTopK(BaseMetric):
             sample_weight: The sample weight.
         """
         preds, labels = _topk_shape_validate(preds, labels)
-        preds = preds.argsort()[..., -self.k:]
+        labels = labels.reshape([len(labels)]).astype('int32')
+        valid = (labels >= 0) & (labels < preds.shape[1])
+        labels = np.where(valid, labels, 0)
         if self.k == 1:
-            correct = accuracy_score(preds, labels, normalize=False)
-            self.num_correct += correct
-
+            correct = np.argmax(preds, axis=1) == labels
         else:
-            for p, l in zip(preds, labels):
-                # get top-k labels with np.argpartition
-                # p = np.argpartition(p, -self.k)[-self.k:]
-                l = l.astype('int32')
-                if l in p:
-                    self.num_correct += 1
-
+            # the rank of the label among the classes, the ties are broken by the class index
+            # as np.argmax, so the rows are compared with the label once instead of sorted
+            target_preds = np.take_along_axis(preds, labels[:, None], axis=1)
+            rank = np.count_nonzero(preds > target_preds, axis=1) + np.count_nonzero(
+                (preds == target_preds) & (np.arange(preds.shape[1]) < labels[:, None]), axis=1)
+            correct = rank < self.k
+        self.num_correct += int(np.count_nonzero(valid & correct))
         self.num_sample += len(labels)
 
     def reset(self):
@@ -1560,25 +1555,63 @@ class ONNXRTGLUE(BaseMetric):
             self.task, processed_preds, self.label_list)
         return result[self.return_key[self.task]]
 
+class _GrowableBuffer(object):
+    """1-D array with an amortized constant time append by doubling the capacity."""
+
+    def __init__(self, dtype, capacity=1024):
+        """Initialize the preallocated buffer."""
+        self._buffer = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def append(self, values):
+        """Append the values to the buffer."""
+        values = np.asarray(values, dtype=self._buffer.dtype).reshape(-1)
+        if self.size + values.size > self._buffer.size:
+            capacity = max(self._buffer.size * 2, self.size + values.size)
+            buffer = np.empty(capacity, dtype=self._buffer.dtype)
+            buffer[:self.size] = self._buffer[:self.size]
+            self._buffer = buffer
+        self._buffer[self.size:self.size + values.size] = values
+        self.size += values.size
+
+    @property
+    def data(self):
+        """Return the view of the appended values."""
+        return self._buffer[:self.size]
+
+
 @metric_registry('ROC', 'pytorch')
 class ROC(BaseMetric):
-    """Computes ROC score."""
+    """Computes ROC score.
+
+    The accuracy of the rounded scores is counted batch by batch. If return_auc is True, the area
+    under the ROC curve is returned instead, computed from the histograms of the scores of the
+    positive and negative samples, so the memory doesn't grow with the evaluation dataset. The
+    scores are expected in [0, 1], and the exact mode keeps all the scores to compute the exact
+    area instead.
+    """
     
-    def __init__(self, task='dlrm'):
+    def __init__(self, task='dlrm', return_auc=False, num_bins=10000, exact=False):
         """Initialize the metric.
 
         Args:
-            task:The name of the task (Choices: dlrm, dien, wide_deep.).
+            task: The name of the task (Choices: dlrm, dien, wide_deep.).
+            return_auc: Whether the result is the area under the ROC curve instead of the accuracy.
+            num_bins: The number of the score histogram bins over [0, 1] to approximate the
+              area under the ROC curve, the error is bounded by the pairs of samples within a bin.
+            exact: Whether to keep all the scores to compute the exact area under the ROC curve.
         """
         assert task in ['dlrm', 'dien', 'wide_deep'], 'Unsupported task type'
-        self.pred_list = None
-        self.label_list = None
         self.task = task
+        self.return_auc = return_auc
+        self.num_bins = num_bins
+        self.exact = exact
         self.return_key = {
             "dlrm": "acc",
             "dien": "acc",
             "wide_deep": "acc",
         }
+        self.reset()
 
     def update(self, preds, labels):
         """Add the predictions and labels.
@@ -1591,23 +1624,48 @@ class ROC(BaseMetric):
             preds = preds[0]
         if isinstance(labels, list) and len(labels) == 1:
             labels = labels[0]
-        if self.pred_list is None:
-            self.pred_list = preds
-            self.label_list = labels
-        else:
-            self.pred_list = np.append(self.pred_list, preds, axis=0)
-            self.label_list = np.append(self.label_list, labels, axis=0)
+        scores = np.asarray(preds, dtype=np.float64).reshape(-1)
+        targets = np.asarray(labels).reshape(-1)
+        assert scores.size == targets.size, 'labels size should same with preds'
+        self.correct_num += int(np.sum(np.round(scores) == targets))
+        self.sample += targets.size
+        if not self.return_auc:
+            return
+        if self.exact:
+            self._scores.append(scores)
+            self._targets.append(targets)
+            return
+        bins = np.clip((scores * self.num_bins).astype(np.int64), 0, self.num_bins - 1)
+        positive = targets > 0
+        self.pos_hist += np.bincount(bins[positive], minlength=self.num_bins)
+        self.neg_hist += np.bincount(bins[~positive], minlength=self.num_bins)
 
     def reset(self):
-        """Reset the prediction and labels."""
-        self.pred_list = None
-        self.label_list = None
+        """Reset the counters, histograms and scores."""
+        self.correct_num = 0
+        self.sample = 0
+        # the states of the area under the ROC curve, only kept if it's returned
+        need_hist = self.return_auc and not self.exact
+        self.pos_hist = np.zeros(self.num_bins, dtype=np.int64) if need_hist else None
+        self.neg_hist = np.zeros(self.num_bins, dtype=np.int64) if need_hist else None
+        need_scores = self.return_auc and self.exact
+        self._scores = _GrowableBuffer(np.float64) if need_scores else None
+        self._targets = _GrowableBuffer(np.float64) if need_scores else None
+
+    def auc(self):
+        """Compute the area under the ROC curve."""
+        assert self.return_auc, 'The area under the ROC curve is only computed with return_auc'
+        if self.exact:
+            import sklearn.metrics
+            return sklearn.metrics.roc_auc_score(self._targets.data, self._scores.data)
+        num_pos, num_neg = self.pos_hist.sum(), self.neg_hist.sum()
+        assert num_pos and num_neg, 'Only one class present in labels, ROC AUC is not defined'
+        # the positives rank above the negatives of the lower bins and tie with those of the same bin
+        neg_below = np.cumsum(self.neg_hist) - self.neg_hist
+        return float(np.sum(self.pos_hist * (neg_below + 0.5 * self.neg_hist)) / (num_pos * num_neg))
 
     def result(self):
-        """Compute the ROC score."""
-        import sklearn.metrics
-        scores = np.squeeze(self.pred_list)
-        targets = np.squeeze(self.label_list)
-        roc_auc = sklearn.metrics.roc_auc_score(targets, scores)
-        acc = sklearn.metrics.accuracy_score(targets, np.round(scores))
-        return acc
+        """Compute the ROC score, i.e. the accuracy or the area under the ROC curve."""
+        if self.return_auc:
+            return self.auc()
+        return self.correct_num / self.sample
@@ -17,10 +17,9 @@
 """Mix Precision for Neural Compressor."""
 import os
 import sys
-import pickle
 import numpy as np
 import random
-from .utils.utility import time_limit, CpuInfo
+from .utils.utility import time_limit, CpuInfo, get_tuning_history
 from .strategy import STRATEGIES
 from .conf.pythonic_config import Config
 from .conf.config import MixedPrecision_Conf
@@ -77,8 +76,7 @@ class MixedPrecision:
         if self.resume_file:
             assert os.path.exists(self.resume_file), \
                 "The specified resume file {} doesn't exist!".format(self.resume_file)
-            with open(self.resume_file, 'rb') as f:
-                _resume = pickle.load(f).__dict__
+            _resume = {'tuning_history': get_tuning_history(self.resume_file)}
 
         self.strategy = STRATEGIES[strategy](
             self._model,
@@ -153,10 +153,11 @@ class Performance(Objective):
 
     def start(self):
         """Record the start time."""
-        self.start_time = time.time()
+        # perf_counter is monotonic with the resolution to measure the tail latency
+        self.start_time = time.perf_counter()
     def end(self):
         """Record the duration time."""
-        self.duration = time.time() - self.start_time
+        self.duration = time.perf_counter() - self.start_time
         assert self.duration >= 0, 'please use start() before end()'
         self._result_list.append(self.duration)
 
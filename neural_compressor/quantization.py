@@ -17,7 +17,6 @@
 """Neural Compressor Quantization API."""
 
 import os
-import pickle
 import random
 import numpy as np
 from .conf.config import QuantConf
@@ -26,7 +25,7 @@ from .conf.pythonic_config import Config
 from .model.model import BaseModel, get_model_fwk_name, get_model_type, Model, MODELS
 from .strategy import STRATEGIES
 from .utils import logger
-from .utils.utility import time_limit
+from .utils.utility import time_limit, get_tuning_history
 
 
 class PostTrainingQuant:
@@ -105,8 +104,7 @@ class PostTrainingQuant:
         if self.resume_file:
             assert os.path.exists(self.resume_file), \
                 "The specified resume file {} doesn't exist!".format(self.resume_file)
-            with open(self.resume_file, 'rb') as f:
-                _resume = pickle.load(f).__dict__
+            _resume = {'tuning_history': get_tuning_history(self.resume_file)}
 
         if self._eval_func is None and self._eval_dataloader is None:
             self.conf.usr_cfg.tuning.exit_policy.performance_only = True
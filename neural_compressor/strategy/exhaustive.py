@@ -26,6 +26,8 @@ from ..utils import logger
 class ExhaustiveTuneStrategy(TuneStrategy):
     """The exhaustive tuning strategy."""
 
+    _support_pipelined_traverse = True
+
     def next_tune_cfg(self):
         """Generate and yield the next tuning config using exhaustive search in tuning space.
         
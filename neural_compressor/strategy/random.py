@@ -27,6 +27,8 @@ from ..utils import logger
 class RandomTuneStrategy(TuneStrategy):
     """The random tuning strategy."""
 
+    _support_pipelined_traverse = True
+
     def next_tune_cfg(self):
         """Generate and yield the next tuning config by random searching in tuning space.
         
@@ -24,7 +24,9 @@ import math
 import copy
 from copy import deepcopy
 import pickle
-from collections import OrderedDict, defaultdict
+import threading
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import yaml
 import numpy as np
@@ -52,7 +54,9 @@ import sys
 
 from .utils.tuning_space import TuningItem, TuningSpace
 from .utils.tuning_structs import OpTuningConfig
-from .utils.constant import FALLBACK_RECIPES_SET
+from .utils.utility import get_hashable
+from .utils.parallel import LocalComm, TrialProcessPool, support_process_pool
+from .utils.constant import FALLBACK_RECIPES_SET, TUNING_HISTORY_KEYS
 
 
 STRATEGIES = {}
@@ -79,6 +83,10 @@ def strategy_registry(cls):
 class TuneStrategy(object):
     """Basic class for tuning strategy."""
 
+    # whether next_tune_cfg generates the tuning configs without reading the results of previous
+    # trials, which is required to generate and quantize the tuning configs ahead of evaluation.
+    _support_pipelined_traverse = False
+
     def __init__(self, model, conf, q_dataloader=None, q_func=None, eval_dataloader=None,
                  eval_func=None, resume=None, q_hooks=None):
         """Init the TuneStrategy.
@@ -239,9 +247,25 @@ class TuneStrategy(object):
         The generator of yielding next tuning config list to distributed traverse by concrete strategies or
         quantization level according to tuning result and traverse logic.
 
-        It should be implemented by the sub-class. Currently, it is only implemented in the BasicTuneStrategy.
+        By default, the tuning configs of `next_tune_cfg` are yielded in lists of one config per worker if
+        they don't depend on the previous tuning results, otherwise one by one. It could be overridden by
+        the sub-class, such as the BasicTuneStrategy which yields the tuning configs of each stage together.
+
+        Args:
+            comm (MPI.COMM or LocalComm): The instance of communication.
+
+        Yields:
+            tuning_config_list (list): A list containing dicts of the tuning configuration for quantization.
         """
-        pass
+        batch_size = max(comm.Get_size() - 1, 1) if self._support_pipelined_traverse else 1
+        op_tuning_cfg_lst = []
+        for op_tuning_cfg in self.next_tune_cfg():
+            op_tuning_cfg_lst.append(deepcopy(op_tuning_cfg))
+            if len(op_tuning_cfg_lst) == batch_size:
+                yield op_tuning_cfg_lst
+                op_tuning_cfg_lst = []
+        if op_tuning_cfg_lst:
+            yield op_tuning_cfg_lst
 
     def meet_acc_req(self, eval_res):
         """Compare the result of last tuning with baseline to check whether the result meet requirements.
@@ -594,40 +618,39 @@ class TuneStrategy(object):
             logger.info("use distributed traverse: {}".format(self.cfg.tuning.use_distributed_tuning))
             return self.distributed_traverse()
         traverse_start_time = time()
-        for op_tuning_cfg in self.next_tune_cfg():
-            tuning_start_time = time()
-            tune_cfg = self._tune_cfg_converter(op_tuning_cfg)
-            self.trials_count += 1
-            tuning_history = self._find_tuning_history(tune_cfg)
-            if tuning_history and self.trials_count < self.cfg.tuning.exit_policy.max_trials:
-                self.last_tune_result = tuning_history['last_tune_result']
-                self.best_tune_result = tuning_history['best_tune_result']
-                logger.warn("Find evaluated tuning config, skip.")
-                continue
-            self._remove_redundant_qmodel()
-            logger.debug("Dump current tuning configuration:")
-            logger.debug(tune_cfg)
-            self.tuning_times += 1
-            # set the parameter for pre quantization algos and run
-            self.set_param_for_pre_quantization_algos(self.algo_scheduler, tune_cfg, self.model)
-            self.model = self.algo_scheduler('pre_quantization')
-            # quantize
-            q_model = self.adaptor.quantize(copy.deepcopy(tune_cfg), self.model, self.calib_dataloader, self.q_func)
-            assert self.adaptor.pre_optimized_model
-            # set the parameter for post quantization algos and run
-            self.set_param_for_post_quantization_algos(self.algo_scheduler, tune_cfg, self.adaptor.pre_optimized_model,
-                                                       q_model)
-            self.last_qmodel = self.algo_scheduler('post_quantization')
+        pipeline_depth = self.cfg.tuning.strategy.get('pipeline_depth', 0)
+        parallel_workers = self.cfg.tuning.strategy.get('parallel_workers', 0)
+        if parallel_workers > 1 and not support_process_pool():
+            logger.warning("Fork is not supported on this platform, ignore the parallel_workers.")
+            parallel_workers = 0
+        if pipeline_depth > 0 and not self._support_pipelined_traverse:
+            logger.warning("{} generates tuning configs by the previous tuning results, " \
+                           "ignore the pipeline_depth.".format(type(self).__name__))
+            pipeline_depth = 0
+        if self.cfg.tuning.exit_policy.performance_only:
+            trials = self._serial_trials()
+        elif parallel_workers > 1:
+            logger.info("Quantize and evaluate the tuning configs with {} workers.".format(parallel_workers))
+            trials = self._parallel_trials(parallel_workers)
+        elif pipeline_depth > 0:
+            logger.info("Quantize up to {} tuning configs ahead of evaluation.".format(pipeline_depth))
+            trials = self._pipelined_trials(pipeline_depth)
+        else:
+            trials = self._serial_trials()
+        for op_tuning_cfg, tune_cfg, (last_qmodel, q_config), tune_result, tuning_start_time in trials:
+            self.last_qmodel = last_qmodel
             self.last_tune_cfg = copy.deepcopy(tune_cfg)
-            # Remove the reference to model
-            self.algo_scheduler.reset_exec_algorithms()
-            assert self.last_qmodel
             # Return the last quantized model as a result. if performance only.
             if self.cfg.tuning.exit_policy.performance_only:
+                assert self.last_qmodel
                 self.best_qmodel = self.last_qmodel
                 self._add_tuning_history(copy.deepcopy(tune_cfg), (-1, [0]), q_config=self.last_qmodel.q_config)
+                trials.close()
                 return
-            self.last_tune_result = self._evaluate(self.last_qmodel)
+            if tune_result is None:
+                assert self.last_qmodel
+                tune_result = self._evaluate(self.last_qmodel)
+            self.last_tune_result = tune_result
             self.cur_best_acc, self.cur_best_tuning_cfg = self.update_best_op_tuning_cfg(op_tuning_cfg)
             need_stop = self.stop(self.cfg.tuning.exit_policy.timeout, self.trials_count)
 
@@ -636,7 +659,7 @@ class TuneStrategy(object):
             saved_last_tune_result = copy.deepcopy(self.last_tune_result)
             self._add_tuning_history(saved_tune_cfg,
                                     saved_last_tune_result,
-                                    q_config=q_model.q_config)
+                                    q_config=q_config)
             self.tune_result_record.append(copy.deepcopy(self.last_tune_result))
             self.tune_cfg = tune_cfg
             now_time = time()
@@ -673,8 +696,207 @@ class TuneStrategy(object):
                         self.best_tune_result = best_result
                     self._dump_tuning_process_statistics()
                 break
+        trials.close()
         self._recover_best_qmodel_from_tuning_cfg()
-            
+
+    def _quantize_tune_cfg(self, tune_cfg, cancelled=None, producer=None):
+        """Quantize the model with the tuning config, including the pre and post quantization algorithms.
+
+        Args:
+            tune_cfg (dict): The tuning config for adaptor.
+            cancelled (threading.Event, optional): Skip the remaining steps once it is set.
+            producer (dict, optional): The adaptor, model, algo_scheduler and calibration dataloader to
+                                       quantize with, see `_create_quantize_producer`. Defaults to
+                                       None, i.e. the ones of the strategy.
+
+        Returns:
+            The quantized model and its q_config, None if cancelled.
+        """
+        if producer is None:
+            producer = {'adaptor': self.adaptor, 'model': self.model, 'algo_scheduler': self.algo_scheduler,
+                        'dataloader': self.calib_dataloader}
+        adaptor, algo_scheduler = producer['adaptor'], producer['algo_scheduler']
+        # set the parameter for pre quantization algos and run
+        self.set_param_for_pre_quantization_algos(algo_scheduler, tune_cfg, producer['model'])
+        model = algo_scheduler('pre_quantization')
+        if adaptor is self.adaptor:
+            self.model = model
+        else:
+            producer['model'] = model
+        if cancelled is not None and cancelled.is_set():
+            return None
+        # quantize
+        q_model = adaptor.quantize(copy.deepcopy(tune_cfg), model, producer['dataloader'], self.q_func)
+        assert adaptor.pre_optimized_model
+        # set the parameter for post quantization algos and run
+        self.set_param_for_post_quantization_algos(algo_scheduler, tune_cfg, adaptor.pre_optimized_model,
+                                                   q_model)
+        last_qmodel = algo_scheduler('post_quantization')
+        # Remove the reference to model
+        algo_scheduler.reset_exec_algorithms()
+        return last_qmodel, q_model.q_config
+
+    def _create_quantize_producer(self):
+        """Create the adaptor, model, algo_scheduler and calibration dataloader used by the worker thread.
+
+        The adaptors aren't thread-safe, e.g. quantize updates the tune_cfg, the pre-optimized model
+        and the calibration states of the adaptor, so the worker thread quantizes a copy of the model
+        with its own adaptor while the adaptor of the strategy evaluates the current trial. The
+        calibration dataloader, often the evaluation one as well, is re-batched by quantize, so the
+        worker thread calibrates with a shallow copy of it, which shares the dataset only.
+
+        Returns:
+            dict: The adaptor, model, algo_scheduler and dataloader, None if they can't be copied.
+        """
+        try:
+            model = copy.deepcopy(self.model)
+            dataloader = copy.copy(self.calib_dataloader)
+        except Exception as e:
+            logger.warning("Fail to copy the model or the calibration dataloader for pipelined tuning " \
+                           "due to {}, quantize and evaluate serially.".format(e))
+            return None
+        framework, framework_specific_info = self._set_framework_info(dataloader, self.q_func)
+        adaptor = FRAMEWORKS[framework](framework_specific_info)
+        adaptor.query_fw_capability(model)
+        algo_scheduler = AlgorithmScheduler(self.cfg.quantization.recipes)
+        algo_scheduler.dataloader = dataloader
+        algo_scheduler.origin_model = model
+        algo_scheduler.adaptor = adaptor
+        return {'adaptor': adaptor, 'model': model, 'algo_scheduler': algo_scheduler,
+                'dataloader': dataloader}
+
+    def _start_trial(self, tune_cfg):
+        """Count the trial and check whether it is needed to quantize and evaluate the tuning config.
+
+        Returns:
+            bool: False if the tuning config was evaluated before and should be skipped.
+        """
+        self.trials_count += 1
+        tuning_history = self._find_tuning_history(tune_cfg)
+        if tuning_history and self.trials_count < self.cfg.tuning.exit_policy.max_trials:
+            self.last_tune_result = tuning_history['last_tune_result']
+            self.best_tune_result = tuning_history['best_tune_result']
+            logger.warn("Find evaluated tuning config, skip.")
+            return False
+        self._remove_redundant_qmodel()
+        logger.debug("Dump current tuning configuration:")
+        logger.debug(tune_cfg)
+        self.tuning_times += 1
+        return True
+
+    def _serial_trials(self):
+        """Generate the quantized trials one by one.
+
+        Yields:
+            tuple: (op_tuning_cfg, tune_cfg, (quantized model, q_config), None, start time of the trial).
+        """
+        for op_tuning_cfg in self.next_tune_cfg():
+            tuning_start_time = time()
+            tune_cfg = self._tune_cfg_converter(op_tuning_cfg)
+            if not self._start_trial(tune_cfg):
+                continue
+            yield op_tuning_cfg, tune_cfg, self._quantize_tune_cfg(tune_cfg), None, tuning_start_time
+
+    def _pipelined_trials(self, pipeline_depth):
+        """Generate the quantized trials with the quantization of the next ones overlapped with evaluation.
+
+        A worker thread quantizes up to `pipeline_depth` tuning configs ahead while the caller evaluates
+        the current trial, so it's only used by strategies whose `next_tune_cfg` doesn't read the results
+        of previous trials. The worker thread quantizes a copy of the model with its own adaptor, see
+        `_create_quantize_producer`, as neither the adaptor nor the model is thread-safe. The trials are
+        yielded in order, and the pending ones are cancelled once the caller stops.
+
+        Args:
+            pipeline_depth (int): The max number of tuning configs quantized ahead.
+
+        Yields:
+            tuple: (op_tuning_cfg, tune_cfg, (quantized model, q_config), None, start time of the trial).
+        """
+        producer = self._create_quantize_producer()
+        if producer is None:
+            yield from self._serial_trials()
+            return
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='nc_quantize')
+        pending = deque()
+        tune_cfgs = self.next_tune_cfg()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) <= pipeline_depth:
+                    op_tuning_cfg = next(tune_cfgs, None)
+                    if op_tuning_cfg is None:
+                        exhausted = True
+                        break
+                    tune_cfg = self._tune_cfg_converter(op_tuning_cfg)
+                    # don't quantize the tuning configs evaluated before or pending
+                    evaluated = self._find_tuning_history(tune_cfg) is not None or \
+                        any(tune_cfg == pending_tune_cfg for _, pending_tune_cfg, _ in pending)
+                    future = None if evaluated else \
+                        executor.submit(self._quantize_tune_cfg, tune_cfg, cancelled, producer)
+                    pending.append((op_tuning_cfg, tune_cfg, future))
+                if not pending:
+                    break
+                op_tuning_cfg, tune_cfg, future = pending.popleft()
+                tuning_start_time = time()
+                if not self._start_trial(tune_cfg):
+                    if future is not None:
+                        future.result()
+                    continue
+                yield op_tuning_cfg, tune_cfg, future.result() if future is not None else \
+                    self._quantize_tune_cfg(tune_cfg), None, tuning_start_time
+        finally:
+            cancelled.set()
+            for _, _, future in pending:
+                if future is not None:
+                    future.cancel()
+            executor.shutdown(wait=True)
+
+    def _parallel_trials(self, num_workers):
+        """Generate the trials quantized and evaluated by a pool of worker processes.
+
+        The tuning config lists of `distributed_next_tune_cfg_lst` are submitted to up to `num_workers`
+        workers at a time, and the trials are yielded in order with their tuning results. The next list
+        is generated once all the trials of the current one are consumed, as it may depend on their
+        results recorded in `self.eval_results`.
+
+        Args:
+            num_workers (int): The number of worker processes.
+
+        Yields:
+            tuple: (op_tuning_cfg, tune_cfg, (None, q_config), tuning result, start time of the trial).
+        """
+        pool = TrialProcessPool(self, num_workers)
+        pending = deque()
+        try:
+            for op_tuning_cfg_lst in self.distributed_next_tune_cfg_lst(LocalComm(num_workers + 1)):
+                self.eval_results = {}
+                trials = deque(enumerate(op_tuning_cfg_lst))
+                while trials or pending:
+                    while trials and len(pending) < num_workers:
+                        index, op_tuning_cfg = trials.popleft()
+                        tune_cfg = self._tune_cfg_converter(op_tuning_cfg)
+                        # don't submit the tuning configs evaluated before or pending
+                        evaluated = self._find_tuning_history(tune_cfg) is not None or \
+                            any(tune_cfg == pending_tune_cfg for _, _, pending_tune_cfg, _ in pending)
+                        future = None if evaluated else pool.submit(tune_cfg)
+                        pending.append((index, op_tuning_cfg, tune_cfg, future))
+                    index, op_tuning_cfg, tune_cfg, future = pending.popleft()
+                    tuning_start_time = time()
+                    if self._start_trial(tune_cfg):
+                        if future is not None:
+                            tune_result, q_config = future.result()
+                            # the objectives compare the value evaluated in the worker process
+                            self.objectives.val = tune_result
+                            yield op_tuning_cfg, tune_cfg, (None, q_config), tune_result, tuning_start_time
+                        else:
+                            yield op_tuning_cfg, tune_cfg, self._quantize_tune_cfg(tune_cfg), None, \
+                                tuning_start_time
+                    history = self._find_history(tune_cfg)
+                    self.eval_results[index] = history['tune_result'] if history else self.last_tune_result
+        finally:
+            pool.shutdown([future for _, _, _, future in pending])
+
     def _remove_redundant_qmodel(self):
         """Remove the redundant quantized model to reduce memory use.
         
@@ -1012,7 +1234,9 @@ class TuneStrategy(object):
         framework_specific_info = {'device': self.cfg.device,
                                    'approach': self.cfg.quantization.approach,
                                    'random_seed': self.cfg.tuning.random_seed,
-                                   'performance_only': self.cfg.tuning.exit_policy.performance_only,}
+                                   'performance_only': self.cfg.tuning.exit_policy.performance_only,
+                                   'calibration_cache': \
+                                       self.cfg.tuning.workspace.get('calibration_cache', False)}
         framework = self.cfg.model.framework.lower()
         framework_specific_info.update({'backend': self.cfg.model.get('backend', 'default')})
         framework_specific_info.update({'format': self.cfg.model.get('quant_format', 'default')})
@@ -1218,6 +1442,27 @@ class TuneStrategy(object):
         """
         return self._evaluate(self.model)
 
+    def _get_sequential_eval_kwargs(self):
+        """Get the kwargs to evaluate the quantized model chunk by chunk against the accuracy target.
+
+        The evaluation of the FP32 baseline is always complete, as well as the evaluations with
+        multiple objectives measured during evaluation.
+
+        Returns:
+            dict: The kwargs of SequentialEvaluationDataLoader, None if the sequential evaluation is disabled.
+        """
+        chunk_batches = self.cfg.tuning.strategy.get('sequential_eval_batches', 0)
+        if chunk_batches <= 0 or self.baseline is None or self.use_multi_objective or \
+            getattr(self.eval_dataloader, 'distributed', False):
+            return None
+        accuracy_target = self.objectives._get_accuracy_target()
+        if len(accuracy_target) != 1:
+            return None
+        return {'accuracy_target': accuracy_target[0],
+                'higher_is_better': self.objectives.higher_is_better,
+                'chunk_batches': chunk_batches,
+                'confidence': self.cfg.tuning.strategy.get('sequential_eval_confidence', 0.99)}
+
     def _evaluate(self, model):
         """Interface of evaluating model.
 
@@ -1258,7 +1503,8 @@ class TuneStrategy(object):
                 postprocess_cfg,
                 iteration,
                 tensorboard = self.cfg.tuning.tensorboard,
-                fp32_baseline = self.baseline == None)
+                fp32_baseline = self.baseline == None,
+                sequential_eval = self._get_sequential_eval_kwargs())
 
             if getattr(self.eval_dataloader, 'distributed', False):
                 if 'tensorflow' in self.framework:
@@ -1442,29 +1688,84 @@ class TuneStrategy(object):
 
         return need_stop
 
-    def _save(self):
-        """Save current tuning state to snapshot for resuming."""
-        logger.info("Save tuning history to {}.".format(self.history_path))
-        with fault_tolerant_file(self.history_path) as f:
-            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+    def _save(self, record=None):
+        """Save current tuning state to snapshot for resuming.
 
-    def _find_tuning_history(self, tune_cfg):
-        """Check if the specified tune_cfg is evaluated or not on same yaml config.
+        The snapshot is a journal of pickled records which starts with the whole tuning history,
+        then each change of the tuning history is appended as one record, so the cost of saving
+        doesn't grow with the trials. An appended record carries the resume state which the
+        strategy sets in the tuning history by `__getstate__`. `get_tuning_history` replays the
+        journal.
 
         Args:
-            tune_cfg (dict): The tune_cfg to check if evaluated before.
+            record (dict, optional): The change of the tuning history to append. The snapshot is
+                                     rewritten with the whole tuning history if None.
+        """
+        logger.info("Save tuning history to {}.".format(self.history_path))
+        # the strategies put their resume state, e.g. bayes_opt, into the tuning history
+        self.__getstate__()
+        if record is not None and record['type'] == 'append':
+            tuning_history = self.tuning_history[record['index']]
+            record['state'] = {k: v for k, v in tuning_history.items() if k not in TUNING_HISTORY_KEYS}
+        if record is None or not self.__dict__.get('_snapshot_started', False):
+            with fault_tolerant_file(self.history_path) as f:
+                pickle.dump({'type': 'snapshot', 'tuning_history': self.tuning_history},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._snapshot_started = True
+        else:
+            with open(self.history_path, 'ab') as f:
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _get_tuning_history_index(self):
+        """Get the index of the tuning history.
+
+        The index maps the hash of yaml config to the index entries of tuning history, each of which
+        maps the hash of tune_cfg to the evaluated histories. It is kept in memory only since the
+        hashes differ across processes, and is rebuilt once the tuning history is replaced, e.g. by resume.
 
         Returns:
-            tuning_history or None: The tuning history containing evaluated tune_cfg.
+            dict: The index of the tuning history.
         """
-        for tuning_history in self.tuning_history:
+        index = self.__dict__.get('_tuning_history_index')
+        if index is None or index['source'] is not self.tuning_history or \
+           index['size'] != len(self.tuning_history):
+            index = {'source': self.tuning_history, 'size': 0, 'yaml': {}}
+            for tuning_history in self.tuning_history:
+                self._add_tuning_history_index(index, tuning_history)
+            self._tuning_history_index = index
+        return index
+
+    def _add_tuning_history_index(self, index, tuning_history):
+        """Add the tuning history of a yaml config to the index."""
+        entry = {'tuning_history': tuning_history, 'position': index['size'], 'size': 0, 'tune_cfg': {}}
+        index['yaml'].setdefault(self._yaml_hash(tuning_history['cfg']), []).append(entry)
+        index['size'] += 1
+        return entry
+
+    def _yaml_hash(self, cfg):
+        """Get the hash of yaml config consistent with `_same_yaml`."""
+        return hash(get_hashable({k: v for k, v in cfg.items() if k != 'tuning'}))
+
+    def _find_tuning_history_entry(self):
+        """Find the index entry of the tuning history under same yaml config.
+
+        Returns:
+            dict or None: The index entry, whose histories are indexed by the hash of tune_cfg.
+        """
+        index = self._get_tuning_history_index()
+        for entry in index['yaml'].get(self._yaml_hash(self.cfg), []):
             # only check if a tune_cfg is evaluated under same yam config, excluding
             # some fields in tuning section of yaml, such as tensorboard, snapshot, resume.
-            if self._same_yaml(tuning_history['cfg'], self.cfg):
-                for history in tuning_history['history']:
-                    if history and history['tune_cfg'] == tune_cfg:
-                        return tuning_history
-
+            if self._same_yaml(entry['tuning_history']['cfg'], self.cfg):
+                histories = entry['tuning_history']['history']
+                for history in histories[entry['size']:]:
+                    if history:
+                        entry['tune_cfg'].setdefault(
+                            hash(get_hashable(history['tune_cfg'])), []).append(history)
+                entry['size'] = len(histories)
+                return entry
         return None
 
     def _find_history(self, tune_cfg):
@@ -1473,47 +1774,54 @@ class TuneStrategy(object):
         Returns:
             history or None: The history containing evaluated tune_cfg.
         """
-        for tuning_history in self.tuning_history:
-            # only check if a tune_cfg is evaluated under same yam config, excluding
-            # some fields in tuning section of yaml, such as tensorboard, snapshot, resume.
-            if self._same_yaml(tuning_history['cfg'], self.cfg):
-                for history in tuning_history['history']:
-                    if history and history['tune_cfg'] == tune_cfg:
-                        return history
+        entry = self._find_tuning_history_entry()
+        if entry is None:
+            return None
+        for history in entry['tune_cfg'].get(hash(get_hashable(tune_cfg)), []):
+            if history['tune_cfg'] == tune_cfg:
+                return history
         return None
 
+    def _find_tuning_history(self, tune_cfg):
+        """Check if the specified tune_cfg is evaluated or not on same yaml config.
+
+        Args:
+            tune_cfg (dict): The tune_cfg to check if evaluated before.
+
+        Returns:
+            tuning_history or None: The tuning history containing evaluated tune_cfg.
+        """
+        return self._find_self_tuning_history() if self._find_history(tune_cfg) else None
+
     def _find_self_tuning_history(self):
         """Find self history dict.
 
         Returns:
             history or None: The history for self.
         """
-        for tuning_history in self.tuning_history:
-            # only check if a tune_cfg is evaluated under same yam config, excluding
-            # some fields in tuning section of yaml, such as tensorboard, snapshot, resume.
-            if self._same_yaml(tuning_history['cfg'], self.cfg):
-                return tuning_history
-
-        return None
+        entry = self._find_tuning_history_entry()
+        return entry['tuning_history'] if entry else None
 
     def _add_tuning_history(self, tune_cfg=None, tune_result=None, **kwargs):
         """Add tuning config to tuining history.
 
         Note this record is added under same yaml config.
         """
-        found = False
         d = {'tune_cfg': tune_cfg, 'tune_result': tune_result}
-        for tuning_history in self.tuning_history:
-            if self._same_yaml(tuning_history['cfg'], self.cfg):
-                d.update(kwargs)
-                tuning_history['history'].append(d)
-                tuning_history['last_tune_result'] = self.last_tune_result
-                tuning_history['best_tune_result'] = self.best_tune_result
-                tuning_history['cfg'] = self.cfg
-                found = True
-                break
-
-        if not found:
+        entry = self._find_tuning_history_entry()
+        if entry is not None:
+            tuning_history = entry['tuning_history']
+            d.update(kwargs)
+            record = {'type': 'append', 'index': entry['position'], 'history': d,
+                      'last_tune_result': self.last_tune_result,
+                      'best_tune_result': self.best_tune_result}
+            if tuning_history['cfg'] is not self.cfg:
+                record['cfg'] = self.cfg
+            tuning_history['history'].append(d)
+            tuning_history['last_tune_result'] = self.last_tune_result
+            tuning_history['best_tune_result'] = self.best_tune_result
+            tuning_history['cfg'] = self.cfg
+        else:
             tuning_history = {}
             tuning_history['version']  = __version__
             tuning_history['cfg']     = self.cfg
@@ -1524,9 +1832,13 @@ class TuneStrategy(object):
             if tune_cfg and tune_result:
                 d.update(kwargs)
                 tuning_history['history'].append(d)
+            # get the index before the new history is added, so it isn't rebuilt
+            index = self._get_tuning_history_index()
             self.tuning_history.append(tuning_history)
+            self._add_tuning_history_index(index, tuning_history)
+            record = {'type': 'add', 'tuning_history': tuning_history}
 
-        self._save()
+        self._save(record)
 
     def _collect_ops_by_quant_mode(self, tune_cfg, quant_mode):
         ops_lst = []
@@ -32,4 +32,7 @@ dynamic_query_order = ['dynamic', 'bf16', 'fp16', 'fp32']
 
 
 FALLBACK_RECIPES_SET = {'first_conv_or_matmul_quantization', 'last_conv_or_matmul_quantization' \
-    'pre_post_process_quantization'}
\ No newline at end of file
+    'pre_post_process_quantization'}
+
+# the keys of a tuning history set by the base strategy, the others are the resume state of the strategy
+TUNING_HISTORY_KEYS = {'version', 'cfg', 'baseline', 'last_tune_result', 'best_tune_result', 'history'}
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process pool to quantize and evaluate the tuning configs in parallel on a single node."""
+
+import os
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ...utils import logger
+
+# the strategy inherited by the forked worker processes
+_worker_strategy = None
+
+
+class LocalComm(object):
+    """The single process counterpart of MPI.COMM used by `distributed_next_tune_cfg_lst`.
+
+    The caller is the master (rank 0) and the `size - 1` workers of the process pool play the
+    role of the slave ranks, so the strategy contexts are broadcast to nobody.
+    """
+
+    def __init__(self, size):
+        """Init a LocalComm object.
+
+        Args:
+            size (int): the number of workers plus one for the master.
+        """
+        self.size = size
+
+    def Get_rank(self):
+        """Get the rank of the caller, which is always the master."""
+        return 0
+
+    def Get_size(self):
+        """Get the number of ranks."""
+        return self.size
+
+    def bcast(self, obj, root=0):
+        """Broadcast the object, which is already known by all the ranks."""
+        return obj
+
+
+def get_core_groups(num_workers):
+    """Split the cores available to the current process into groups for each worker.
+
+    Args:
+        num_workers (int): the number of workers.
+
+    Returns:
+        list: the list of the core ids of each worker, empty if there are less cores than workers.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        cores = sorted(os.sched_getaffinity(0))
+    else:  # pragma: no cover
+        cores = list(range(os.cpu_count() or 1))
+    if len(cores) < num_workers:
+        return [[] for _ in range(num_workers)]
+    return [group.tolist() for group in np.array_split(cores, num_workers)]
+
+
+def support_process_pool():
+    """Check whether the workers can be forked to inherit the model, dataloaders and eval function."""
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def _init_worker(strategy, core_queue):
+    """Bind the worker process to its cores."""
+    global _worker_strategy
+    _worker_strategy = strategy
+    cores = core_queue.get()
+    if cores:
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, cores)
+        os.environ['OMP_NUM_THREADS'] = str(len(cores))
+        if 'torch' in sys.modules:
+            sys.modules['torch'].set_num_threads(len(cores))
+    logger.debug("Tuning worker {} is bound to cores {}.".format(os.getpid(), cores))
+
+
+def _run_trial(tune_cfg):
+    """Quantize and evaluate the tuning config in the worker process.
+
+    Returns:
+        tuple: (tuning result, q_config of the quantized model).
+    """
+    last_qmodel, q_config = _worker_strategy._quantize_tune_cfg(tune_cfg)
+    return _worker_strategy._evaluate(last_qmodel), q_config
+
+
+class TrialProcessPool(object):
+    """Process pool which quantizes and evaluates the tuning configs, one worker per core group.
+
+    The workers are forked from the tuning process, so only the tuning configs and the results
+    are serialized, while the model, dataloaders and evaluation function are inherited.
+    """
+
+    def __init__(self, strategy, num_workers):
+        """Init a TrialProcessPool object.
+
+        Args:
+            strategy (TuneStrategy): the strategy to quantize and evaluate the tuning configs.
+            num_workers (int): the number of worker processes.
+        """
+        mp_context = multiprocessing.get_context('fork')
+        core_queue = mp_context.Queue()
+        for cores in get_core_groups(num_workers):
+            core_queue.put(cores)
+        self.num_workers = num_workers
+        self.executor = ProcessPoolExecutor(max_workers=num_workers, mp_context=mp_context,
+                                            initializer=_init_worker, initargs=(strategy, core_queue))
+
+    def submit(self, tune_cfg):
+        """Submit the tuning config, return the future of (tuning result, q_config)."""
+        return self.executor.submit(_run_trial, tune_cfg)
+
+    def shutdown(self, pending=()):
+        """Cancel the pending futures and wait for the running ones."""
+        for future in pending:
+            if future is not None:
+                future.cancel()
+        self.executor.shutdown(wait=True)
@@ -54,4 +54,27 @@ def get_adaptor_name(adaptor):
     for name in adaptor_name_lst:
         if adaptor_name.startswith(name):
             return name
-    return ""
\ No newline at end of file
+    return ""
+
+
+def get_hashable(obj):
+    """Convert a (nested) config into a hashable object.
+
+    Equal configs are converted into equal objects regardless of the dict order, so the hash of
+    the result can index configs. Unhashable leaves are replaced by their type names, so the
+    indexed candidates should still be compared with the original configs.
+
+    Args:
+        obj: The config, such as a yaml config or a tune_cfg.
+    """
+    if isinstance(obj, dict):
+        return frozenset((get_hashable(key), get_hashable(val)) for key, val in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return tuple(get_hashable(item) for item in obj)
+    if isinstance(obj, (set, frozenset)):
+        return frozenset(get_hashable(item) for item in obj)
+    try:
+        hash(obj)
+    except TypeError:
+        return type(obj).__name__
+    return obj
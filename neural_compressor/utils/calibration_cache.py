@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Calibration cache: persist calibration statistics in the workspace across tuning runs."""
+
+import hashlib
+import os
+import pickle
+
+import numpy as np
+
+from neural_compressor.utils import logger
+
+
+def _update_hash(hasher, data):
+    """Feed a (nested) batch of data into the hasher."""
+    if isinstance(data, dict):
+        for key in sorted(data.keys(), key=str):
+            hasher.update(str(key).encode())
+            _update_hash(hasher, data[key])
+    elif isinstance(data, (list, tuple)):
+        for item in data:
+            _update_hash(hasher, item)
+    elif isinstance(data, (bytes, bytearray)):
+        hasher.update(data)
+    elif isinstance(data, str):
+        hasher.update(data.encode())
+    else:
+        if hasattr(data, 'detach'):
+            data = data.detach().cpu()
+            # numpy doesn't support bfloat16
+            data = data.float().numpy() if str(data.dtype) == 'torch.bfloat16' else data.numpy()
+        elif hasattr(data, 'numpy') and not isinstance(data, np.ndarray):
+            data = data.numpy()
+        if isinstance(data, np.ndarray):
+            hasher.update(str((data.dtype, data.shape)).encode())
+            hasher.update(np.ascontiguousarray(data).tobytes())
+        else:
+            hasher.update(repr(data).encode())
+
+
+def get_dataloader_fingerprint(dataloader):
+    """Get the fingerprint of a calibration dataloader.
+
+    The fingerprint covers the dataloader configuration (types, batch size and dataset
+    length) and, for re-iterable dataloaders, the content of the first batch.
+
+    Args:
+        dataloader (object): the calibration dataloader.
+
+    Returns:
+        str: the hex digest of the fingerprint.
+    """
+    hasher = hashlib.sha256()
+    dataset = getattr(dataloader, 'dataset', None)
+    config = [type(dataloader).__name__, getattr(dataloader, 'batch_size', None),
+              type(dataset).__name__]
+    try:
+        config.append(len(dataset) if dataset is not None else len(dataloader))
+    except TypeError:
+        pass
+    hasher.update(repr(config).encode())
+    try:
+        if iter(dataloader) is not dataloader:
+            for batch in dataloader:
+                _update_hash(hasher, batch)
+                break
+    except Exception as e:  # pragma: no cover
+        logger.debug("Fail to hash the first batch of the dataloader due to {}.".format(e))
+    return hasher.hexdigest()
+
+
+class CalibrationCache(object):
+    """On-disk cache of calibration statistics in the tuning workspace.
+
+    Entries are keyed by a hash of the model to calibrate, the calibration
+    dataloader and the calibration iterations, so repeated or resumed tunings
+    of the same model and dataset skip the calibration inference.
+    """
+
+    def __init__(self, workspace_path):
+        """Init a CalibrationCache object.
+
+        Args:
+            workspace_path (str): the tuning workspace, entries are saved in its
+                                  calibration_cache sub-directory.
+        """
+        self.cache_dir = os.path.join(os.path.abspath(os.path.expanduser(workspace_path)),
+                                      'calibration_cache')
+
+    def get_key(self, model_fingerprint, dataloader, iterations):
+        """Get the cache key.
+
+        Args:
+            model_fingerprint (object): the serialized model or any (nested) data identifying it.
+            dataloader (object): the calibration dataloader.
+            iterations (int or list): the calibration iterations.
+
+        Returns:
+            str: the cache key.
+        """
+        hasher = hashlib.sha256()
+        _update_hash(hasher, model_fingerprint)
+        hasher.update(get_dataloader_fingerprint(dataloader).encode())
+        hasher.update(repr(iterations).encode())
+        return hasher.hexdigest()
+
+    def load(self, key):
+        """Load the cached calibration statistics, None if missing or unreadable."""
+        path = os.path.join(self.cache_dir, key + '.pkl')
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception as e:  # pragma: no cover
+            logger.warning("Fail to load calibration cache {} due to {}.".format(path, e))
+            return None
+        logger.info("Reuse the calibration statistics cached in {}.".format(path))
+        return data
+
+    def save(self, key, data):
+        """Save the calibration statistics."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, key + '.pkl')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        logger.debug("Save calibration statistics to {}.".format(path))
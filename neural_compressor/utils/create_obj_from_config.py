@@ -122,7 +122,7 @@ def create_dataloader(framework, dataloader_cfg):
 def create_eval_func(framework, dataloader, adaptor,
                      metric, postprocess_cfg=None,
                      iteration=-1, tensorboard=False,
-                     fp32_baseline=False):
+                     fp32_baseline=False, sequential_eval=None):
     """The interface to create evaluate function from config.
 
     Args:
@@ -134,6 +134,10 @@ def create_eval_func(framework, dataloader, adaptor,
         iteration: The number of iterations to evaluate.
         tensorboard: Whether to use tensorboard.
         fp32_baseline: The fp32 baseline score.
+        sequential_eval: The kwargs of SequentialEvaluationDataLoader except the dataloader and
+                         metric, to stop the evaluation once the metric is decided against the
+                         accuracy target. Only used with a single metric averaged over the
+                         samples, e.g. Accuracy, Loss, MAE and MSE.
 
     Returns:
         The constructed evaluation function
@@ -158,6 +162,12 @@ def create_eval_func(framework, dataloader, adaptor,
     else:
         metrics = metric
 
+    if sequential_eval and len(metrics) == 1:
+        from neural_compressor.utils.sequential_evaluation import SequentialEvaluationDataLoader, \
+            support_sequential_evaluation
+        if support_sequential_evaluation(metrics[0]):
+            dataloader = SequentialEvaluationDataLoader(dataloader, metrics[0], **sequential_eval)
+
     def eval_func(model, measurer=None):
         return adaptor.evaluate(model, dataloader, postprocess,
                                 metrics, measurer, iteration,
@@ -18,6 +18,7 @@
 """KL Divergence: measure probability distribution difference to determine the thresholds per quantized op."""
 
 import math
+import numpy as np
 
 
 class KL_Divergence(object):
@@ -76,78 +77,100 @@ class KL_Divergence(object):
                       num_bins,
                       quantized_type,
                       num_quantized_bins=255):
-        """The interface of getting threshold per op using KL divergency algorithm."""
+        """The interface of getting threshold per op using KL divergency algorithm.
+
+        All candidate thresholds in the search window are evaluated at once by
+        the vectorized engine in `_kl_divergence_batch`.
+        """
+        hist = np.asarray(hist)
+        starting_iter, ending_iter = self._get_search_window(hist, min_val, max_val, num_bins)
+        kl = self._kl_divergence_batch(hist[np.newaxis, :], num_quantized_bins)[0]
+        min_kl_index = self._select_min_kl_index(hist, kl, starting_iter, ending_iter)
+        bin_width = hist_edges[1] - hist_edges[0]
+        return (min_kl_index + 0.5) * bin_width
+
+    @staticmethod
+    def _get_search_window(hist, min_val, max_val, num_bins):
+        """Get the [starting_iter, ending_iter] range of candidate threshold bins."""
         if min_val >= 0:
             ending_iter = num_bins - 1
             starting_iter = int(ending_iter * 0.7)
         else:
-            th = max(abs(max_val), abs(min_val))
             starting_iter = 0
             ending_iter = num_bins - 1
             if abs(max_val) > abs(min_val):
-                while starting_iter < ending_iter:
-                    if hist[starting_iter] == 0:
-                        starting_iter += 1
-                        continue
-                    else:
-                        break
+                nonzero = np.flatnonzero(hist[:ending_iter])
+                starting_iter = int(nonzero[0]) if len(nonzero) else ending_iter
                 starting_iter += int((ending_iter - starting_iter) * 0.6)
             else:
-                while ending_iter > 0:
-                    if hist[ending_iter] == 0:
-                        ending_iter -= 1
-                        continue
-                    else:
-                        break
+                nonzero = np.flatnonzero(hist[1:ending_iter + 1])
+                ending_iter = int(nonzero[-1]) + 1 if len(nonzero) else 0
                 starting_iter = int(0.6 * ending_iter)
+        return starting_iter, ending_iter
 
-        bin_width = hist_edges[1] - hist_edges[0]
-        min_kl_divergence = 0
-        min_kl_index = 0
-        kl_inited = False
-
-        for i in range(starting_iter, ending_iter + 1):
-            reference_distr_P = hist[0:i].tolist()
-            outliers_count = sum(hist[i:2048])
-            if reference_distr_P[i - 1] == 0:
-                continue
-            reference_distr_P[i - 1] += outliers_count
-            reference_distr_bins = reference_distr_P[:]
-            candidate_distr_Q = hist[0:i].tolist()
-            num_merged_bins = int(i / num_quantized_bins)
-            candidate_distr_Q_quantized = [0] * num_quantized_bins
-            j_start = 0
-            j_end = num_merged_bins
-
-            for idx in range(num_quantized_bins):
-                candidate_distr_Q_quantized[idx] = sum(
-                    candidate_distr_Q[j_start:j_end])
-                j_start += num_merged_bins
-                j_end += num_merged_bins
-                if idx + 1 == num_quantized_bins - 1:
-                    j_end = i
-            candidate_distr_Q = self.expand_quantized_bins(
-                candidate_distr_Q_quantized, reference_distr_bins)
-            P_sum = sum(reference_distr_P)
-            Q_sum = sum(candidate_distr_Q)
-            kl_divergence = self.safe_entropy(reference_distr_P, P_sum,
-                                              candidate_distr_Q, Q_sum)
-            if not kl_inited:
-                min_kl_divergence = kl_divergence
-                min_kl_index = i
-                kl_inited = True
-            elif kl_divergence < min_kl_divergence:
-                min_kl_divergence = kl_divergence
-                min_kl_index = i
-            else:
-                pass
-
-        if min_kl_index == 0:
-            while starting_iter > 0:
-                if hist[starting_iter] == 0:
-                    starting_iter -= 1
-                    continue
-                else:
-                    break
-            min_kl_index = starting_iter
-        return (min_kl_index + 0.5) * bin_width
\ No newline at end of file
+    @staticmethod
+    def _select_min_kl_index(hist, kl, starting_iter, ending_iter):
+        """Pick the first candidate bin with the minimal KL divergence in the window."""
+        candidates = np.arange(len(kl))
+        valid = (candidates >= max(starting_iter, 1)) & (candidates <= ending_iter) & np.isfinite(kl)
+        if np.any(valid):
+            return int(np.argmin(np.where(valid, kl, np.inf)))
+        nonzero = np.flatnonzero(hist[1:starting_iter + 1])
+        return int(nonzero[-1]) + 1 if len(nonzero) else 0
+
+    @staticmethod
+    def _kl_divergence_batch(hists, num_quantized_bins=255):
+        """Compute the KL divergence of every candidate threshold bin for a batch of histograms.
+
+        For candidate i, the reference distribution P is hist[0:i] with the outliers
+        hist[i:] folded into its last bin, and the candidate distribution Q is hist[0:i]
+        merged into `num_quantized_bins` bins and expanded back onto the non-zero bins
+        of P. Using per-segment cumulative sums, the divergence reduces to
+        log(Q_sum) - log(P_sum) + (sum(p * log(p)) - sum(p * log(q))) / P_sum.
+
+        Args:
+            hists (np.array): histograms with shape (num_tensors, num_bins).
+            num_quantized_bins (int, optional): number of quantized bins. Defaults to 255.
+
+        Returns:
+            np.array: KL divergences with shape (num_tensors, num_bins + 1), the entry at
+                      index i is for candidate bin i and is inf when i is not a valid candidate.
+        """
+        hists = np.asarray(hists, dtype=np.float64)
+        num_tensors, num_bins = hists.shape
+        candidates = np.arange(1, num_bins + 1)
+
+        zeros = np.zeros((num_tensors, 1))
+        cum_hist = np.concatenate([zeros, np.cumsum(hists, axis=1)], axis=1)
+        cum_nonzero = np.concatenate([zeros, np.cumsum(hists != 0, axis=1)], axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hist_log_hist = np.where(hists > 0, hists * np.log(hists), 0.)
+        cum_hist_log_hist = np.concatenate([zeros, np.cumsum(hist_log_hist, axis=1)], axis=1)
+
+        # segment s of candidate i covers [s * m, (s + 1) * m) with m = i // num_quantized_bins,
+        # the last segment absorbs the remainder up to i.
+        num_merged_bins = candidates // num_quantized_bins
+        seg_idx = np.arange(num_quantized_bins)
+        seg_start = num_merged_bins[:, np.newaxis] * seg_idx
+        seg_end = seg_start + num_merged_bins[:, np.newaxis]
+        seg_end[:, -1] = candidates
+
+        total = cum_hist[:, -1:]
+        outliers = total - cum_hist[:, candidates]
+        last_bin = hists[:, candidates - 1] + outliers
+
+        quantized = cum_hist[:, seg_end] - cum_hist[:, seg_start]
+        nonzero = cum_nonzero[:, seg_end] - cum_nonzero[:, seg_start]
+        reference = quantized.copy()
+        reference[:, :, -1] += outliers
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p_log_q = np.where(reference > 0, reference * np.log(quantized / nonzero), 0.).sum(axis=2)
+            p_log_p = cum_hist_log_hist[:, candidates - 1] + \
+                np.where(last_bin > 0, last_bin * np.log(last_bin), 0.)
+            kl = np.log(cum_hist[:, candidates]) - np.log(total) + (p_log_p - p_log_q) / total
+
+        # the threshold bin itself must be populated
+        kl[hists[:, candidates - 1] == 0] = np.inf
+        kl[~np.isfinite(kl)] = np.inf
+        return np.concatenate([np.full((num_tensors, 1), np.inf), kl], axis=1)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Sequential evaluation: stop the evaluation once the metric is decided against the accuracy target."""
+
+import math
+
+import numpy as np
+from scipy.stats import t
+
+from neural_compressor.metric.metric import Accuracy, Loss, MAE, MSE, GeneralTopK, TensorflowTopK
+from neural_compressor.utils import logger
+
+# the minimum number of chunks to estimate the variance of the metric
+MIN_CHUNKS = 3
+
+# the metrics averaged over the samples, whose chunk metric can be recovered from the running metric
+SEQUENTIAL_METRICS = (Accuracy, Loss, MAE, MSE, GeneralTopK, TensorflowTopK)
+
+
+def support_sequential_evaluation(metric):
+    """Check whether the metric can be evaluated sequentially.
+
+    The metrics computed from all the predictions, e.g. F1, mAP and ROC, can't be recovered chunk
+    by chunk, so they are always fully evaluated.
+
+    Args:
+        metric (object): the metric to evaluate.
+
+    Returns:
+        bool: whether the metric is an average over the samples.
+    """
+    return isinstance(metric, SEQUENTIAL_METRICS) and getattr(metric, 'compare_label', True)
+
+
+class SequentialEvaluationDataLoader(object):
+    """Evaluation dataloader which tests the running metric against the accuracy target chunk by chunk.
+
+    The metric updated by the evaluation loop is read after every `chunk_batches` batches, and the
+    metric of each chunk is recovered from the running metric as the metric is an average over
+    batches, i.e. one of SEQUENTIAL_METRICS such as Accuracy, Loss and MAE. The confidence bound of the full
+    evaluation is estimated from the spread of the chunk metrics, and the iteration stops once the
+    bound is entirely below the target, i.e. the tuning config can't meet the accuracy target, or
+    entirely above it, i.e. it clearly meets the target. The evaluation loop then returns the
+    metric of the evaluated batches.
+    """
+
+    def __init__(self, dataloader, metric, accuracy_target, higher_is_better=True,
+                 chunk_batches=10, confidence=0.99):
+        """Init a SequentialEvaluationDataLoader object.
+
+        Args:
+            dataloader (object): the evaluation dataloader.
+            metric (object): the metric updated by the evaluation loop.
+            accuracy_target (float): the accuracy target of the tuning.
+            higher_is_better (bool, optional): whether a higher metric is better. Defaults to True.
+            chunk_batches (int, optional): the number of batches between two tests. Defaults to 10.
+            confidence (float, optional): the confidence level of the decision over all the tests.
+                                          Defaults to 0.99.
+        """
+        self.dataloader = dataloader
+        self.metric = metric
+        self.accuracy_target = accuracy_target
+        self.higher_is_better = higher_is_better
+        self.chunk_batches = chunk_batches
+        self.confidence = confidence
+        self.total_batches = None
+        # the number of evaluated batches and the decision of the last iteration
+        self.batches = 0
+        self.decision = None
+
+    def __getattr__(self, name):
+        """Forward the other attributes, e.g. batch_size, to the wrapped dataloader."""
+        if name == 'dataloader':
+            raise AttributeError(name)
+        return getattr(self.dataloader, name)
+
+    def __len__(self):
+        """Get the length of the wrapped dataloader."""
+        return len(self.dataloader)
+
+    def _alpha(self):
+        """Get the significance level of each one-sided test, corrected by the max number of tests."""
+        alpha = (1 - self.confidence) / 2
+        if self.total_batches:
+            alpha /= max(math.ceil(self.total_batches / self.chunk_batches) - MIN_CHUNKS + 1, 1)
+        return alpha
+
+    def _test(self, chunk_results):
+        """Test the running metric against the accuracy target.
+
+        Returns:
+            str: 'fail' if the target can't be met, 'pass' if it's met, None if undecided.
+        """
+        results = np.array(chunk_results, dtype=np.float64)
+        if len(results) < MIN_CHUNKS or not np.all(np.isfinite(results)):
+            return None
+        mean = np.mean(results)
+        stderr = np.std(results, ddof=1) / math.sqrt(len(results))
+        if self.total_batches:
+            # finite population correction, the bound is exact once all the batches are evaluated
+            stderr *= math.sqrt(max(1 - self.batches / self.total_batches, 0))
+        # the variance is estimated from a few chunks, so use the t-distribution
+        margin = t.ppf(1 - self.alpha, df=len(results) - 1) * stderr
+        lower, upper = mean - margin, mean + margin
+        if (upper < self.accuracy_target) if self.higher_is_better else (lower > self.accuracy_target):
+            return 'fail'
+        if (lower > self.accuracy_target) if self.higher_is_better else (upper < self.accuracy_target):
+            return 'pass'
+        return None
+
+    def __iter__(self):
+        """Yield the batches until the metric is decided."""
+        self.batches = 0
+        self.decision = None
+        # the dataloader may be re-batched by the evaluation loop, e.g. `dataloader.batch(1)`
+        try:
+            self.total_batches = len(self.dataloader)
+        except TypeError:
+            self.total_batches = None
+        self.alpha = self._alpha()
+        testing = True
+        chunk_results = []
+        last_result, last_batches = 0., 0
+        for batch in self.dataloader:
+            if testing and self.batches > 0 and self.batches % self.chunk_batches == 0:
+                result = self.metric.result()
+                if np.isscalar(result):
+                    # recover the metric of the chunk from the running average
+                    chunk_results.append((result * self.batches - last_result * last_batches) /
+                                         (self.batches - last_batches))
+                    last_result, last_batches = result, self.batches
+                    self.decision = self._test(chunk_results)
+                else:
+                    logger.debug("Sequential evaluation only supports scalar metrics, evaluate all batches.")
+                    testing = False
+                if self.decision is not None:
+                    logger.info("Stop the evaluation after {} of {} batches, the metric {:.4f} {} the " \
+                        "accuracy target {:.4f}.".format(self.batches, self.total_batches or 'unknown',
+                        result, 'meets' if self.decision == 'pass' else 'can not meet', self.accuracy_target))
+                    return
+            self.batches += 1
+            yield batch
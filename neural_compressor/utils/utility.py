@@ -331,7 +331,7 @@ def get_tensor_histogram(tensor_data, bins=2048):
     max_val = np.max(tensor_data)
     min_val = np.min(tensor_data)
     th = max(abs(min_val), abs(max_val))
-    hist, hist_edges = np.histogram(tensor_data, bins=2048, range=(-th, th))
+    hist, hist_edges = np.histogram(tensor_data, bins=bins, range=(-th, th))
     return (hist, hist_edges, min_val, max_val, th)
 
 
@@ -343,12 +343,38 @@ def get_all_fp32_data(data):
 def get_tuning_history(tuning_history_path):
     """Get tuning history.
 
+    The snapshot is replayed from a journal of records saved by the tuning strategy, i.e. the
+    whole tuning history followed by its appended changes. A pickled strategy object saved by
+    earlier versions is loaded as well.
+
     Args:
         tuning_history_path: The tuning history path, which need users to assign
     """
+    tuning_history = []
     with open(tuning_history_path, 'rb') as f:
-        strategy_object = pickle.load(f)
-    tuning_history = strategy_object.tuning_history
+        while True:
+            try:
+                record = pickle.load(f)
+            except EOFError:
+                break
+            except Exception as e:  # pragma: no cover
+                logger.warning("Ignore the incomplete records at the end of {} due to {}.".format(
+                    tuning_history_path, e))
+                break
+            if not isinstance(record, dict):
+                tuning_history = record.tuning_history
+            elif record['type'] == 'snapshot':
+                tuning_history = record['tuning_history']
+            elif record['type'] == 'add':
+                tuning_history.append(record['tuning_history'])
+            else:
+                target = tuning_history[record['index']]
+                target['history'].append(record['history'])
+                for key in ['last_tune_result', 'best_tune_result', 'cfg']:
+                    if key in record:
+                        target[key] = record[key]
+                # the resume state of the strategy, e.g. bayes_opt of the bayesian strategy
+                target.update(record.get('state', {}))
     return tuning_history
 
 
@@ -554,6 +580,12 @@ def set_tensorboard(tensorboard: bool):
     from neural_compressor.config import options
     options.tensorboard = tensorboard
 
+
+def set_calibration_cache(calibration_cache: bool):
+    """Set the calibration_cache in config."""
+    from neural_compressor.config import options
+    options.calibration_cache = calibration_cache
+
 def show_memory_info(hint):
     """Show process full memory."""
     pid = os.getpid()
@@ -10,7 +10,9 @@ from onnx import helper, TensorProto, numpy_helper
 sys.path.append('..')
 from neural_compressor.experimental.data.datasets.dataset import Dataset
 from neural_compressor.adaptor.ox_utils.calibration import ONNXRTAugment
+from neural_compressor.adaptor.ox_utils.calibrator import CALIBRATOR
 from neural_compressor.model.onnx_model import ONNXModel
+from neural_compressor.utils.calibration_cache import CalibrationCache
 from neural_compressor.data import Datasets, DATALOADERS
 
 def generate_input_initializer(tensor_shape, tensor_dtype, input_name):
@@ -157,6 +159,140 @@ class TestAugment(unittest.TestCase):
         calib_params = augment.dump_calibration({})
         assert "A" in calib_params and "B" in calib_params and "D" in calib_params and "C" in calib_params
 
+    def test_streaming_calibration(self):
+        model, dataloader = self.cv_session
+        augment = ONNXRTAugment(ONNXModel(model),
+                                dataloader,
+                                ["Conv", "Relu"])
+        augment.augment_graph()
+        _, raw_outputs = augment.get_intermediate_outputs()
+        node_output_names, calibrators = augment.get_intermediate_outputs('naive')
+        min_max = augment._map_calibration(node_output_names, calibrators, 'naive')
+        for name, tensors in raw_outputs.items():
+            rmin = float(min([tensor.min() for tensor in tensors]))
+            rmax = float(max([tensor.max() for tensor in tensors]))
+            self.assertEqual(min_max[name], (rmin, rmax))
+        with self.assertRaises(ValueError):
+            augment.get_intermediate_outputs('unknown')
+
+    def test_parallel_calibration(self):
+        model, _ = self.cv_session
+        datasets = Datasets('onnxrt_qlinearops')
+        dataset = datasets['dummy'](shape=(16, 1, 5, 5), low=-1., high=1., label=True)
+        dataloader = DATALOADERS['onnxrt_qlinearops'](dataset)
+        serial = ONNXRTAugment(ONNXModel(model), dataloader, ["Conv", "Relu"])
+        parallel = ONNXRTAugment(ONNXModel(model), dataloader, ["Conv", "Relu"], num_workers=3)
+        self.assertEqual(serial.dump_minmax(), parallel.dump_minmax())
+
+        serial.augment_graph()
+        parallel.augment_graph()
+        _, serial_calibrators = serial.get_intermediate_outputs('per_channel_percentile')
+        _, parallel_calibrators = parallel.get_intermediate_outputs('per_channel_percentile')
+        for name, calibrator in serial_calibrators.items():
+            self.assertEqual(calibrator.calib_range, parallel_calibrators[name].calib_range)
+            if calibrator.per_channel:
+                self.assertEqual(np.sum(calibrator._histogram),
+                                 np.sum(parallel_calibrators[name]._histogram))
+
+    def test_calibration_cache(self):
+        model, _ = self.cv_session
+        datasets = Datasets('onnxrt_qlinearops')
+        dataset = datasets['dummy'](shape=(4, 1, 5, 5), low=-1., high=1., label=True)
+        dataloader = DATALOADERS['onnxrt_qlinearops'](dataset)
+        calib_cache = CalibrationCache(self.work_space)
+        augment = ONNXRTAugment(ONNXModel(model), dataloader, ["Conv", "Relu"])
+        min_max = augment.dump_minmax(calib_cache=calib_cache)
+        self.assertEqual(min_max, augment.dump_minmax())
+        self.assertEqual(len(os.listdir(calib_cache.cache_dir)), 1)
+
+        # the cached values are reused without inference
+        augment.get_intermediate_outputs = None
+        self.assertEqual(min_max, augment.dump_minmax(calib_cache=calib_cache))
+
+        # a subset of the calibrated tensors is served from the cache as well
+        subset = ONNXRTAugment(ONNXModel(model), dataloader, ["Conv"])
+        subset.get_intermediate_outputs = None
+        subset_min_max = subset.dump_minmax(calib_cache=calib_cache)
+        self.assertTrue(len(subset_min_max) > 0)
+        for name, value in subset_min_max.items():
+            self.assertEqual(value, min_max[name])
+
+        # different calibration data misses the cache
+        dataset = datasets['dummy'](shape=(4, 1, 5, 5), low=-2., high=2., label=True)
+        augment = ONNXRTAugment(ONNXModel(model), DATALOADERS['onnxrt_qlinearops'](dataset),
+                                ["Conv", "Relu"])
+        augment.dump_minmax(calib_cache=calib_cache)
+        self.assertEqual(len(os.listdir(calib_cache.cache_dir)), 2)
+
+    def test_calibrator(self):
+        datas = [np.random.randn(8, 16).astype(np.float32) * (i + 1) for i in range(4)]
+        datas.append(np.zeros((0, 16), dtype=np.float32))
+        calibrator = CALIBRATOR['naive']()
+        self.assertIsNone(calibrator.calib_range)
+        for data in datas:
+            calibrator.collect(data)
+        self.assertEqual(calibrator.calib_range, (min([d.min() for d in datas[:-1]]),
+                                                  max([d.max() for d in datas[:-1]])))
+        calibrator.clear()
+        self.assertIsNone(calibrator.calib_range)
+        self.assertEqual(sorted(CALIBRATOR.keys()), ['naive', 'per_channel_percentile'])
+
+    def test_per_channel_percentile_calibrator(self):
+        # channels with growing ranges and all-zero channels
+        datas = [np.random.randn(4, 32, 16).astype(np.float32) * (i + 1) for i in range(6)]
+        for data in datas:
+            data[..., 0] = 0
+        flatten = np.abs(np.concatenate([d.reshape(-1, 16) for d in datas]))
+        for percentile in [50, 99.9, 100]:
+            calibrator = CALIBRATOR['per_channel_percentile'](percentile=percentile)
+            self.assertIsNone(calibrator.max_per_channel)
+            for data in datas:
+                calibrator.collect(data)
+            self.assertEqual(calibrator.shape, (4, 32, 16))
+            expected = np.percentile(flatten, percentile, axis=0)
+            # the error is bounded by the bin width of each channel
+            np.testing.assert_allclose(calibrator.max_per_channel, expected,
+                                       atol=2 * flatten.max() / calibrator.num_bins)
+            self.assertEqual(calibrator.max_per_channel[0], 0)
+
+        # merge the calibrators of shards
+        merged = CALIBRATOR['per_channel_percentile'](percentile=99)
+        for shard in [datas[::2], datas[1::2]]:
+            calibrator = CALIBRATOR['per_channel_percentile'](percentile=99)
+            for data in shard:
+                calibrator.collect(data)
+            merged.merge(calibrator)
+        np.testing.assert_allclose(merged.max_per_channel, np.percentile(flatten, 99, axis=0),
+                                   atol=2 * flatten.max() / merged.num_bins)
+
+        # 4-D tensors are per channel of the 2nd dim
+        calibrator = CALIBRATOR['per_channel_percentile'](percentile=100)
+        calibrator.collect(np.arange(24, dtype=np.float32).reshape(1, 3, 2, 4))
+        np.testing.assert_array_equal(calibrator.max_per_channel, [7, 15, 23])
+        # tensors whose channels change only keep the min/max values
+        calibrator.collect(np.ones((2, 5), dtype=np.float32))
+        self.assertIsNone(calibrator.max_per_channel)
+        self.assertEqual(calibrator.calib_range, (0, 23))
+
+    def test_calib_smooth(self):
+        A = helper.make_tensor_value_info('A', TensorProto.FLOAT, [1, 4, 8])
+        B_init = numpy_helper.from_array(np.random.randn(8, 3).astype(np.float32), 'B')
+        C = helper.make_tensor_value_info('C', TensorProto.FLOAT, [1, 4, 3])
+        matmul_node = onnx.helper.make_node('MatMul', ['A', 'B'], ['C'], name='matmul')
+        graph = helper.make_graph([matmul_node], 'test_graph_1', [A], [C], [B_init])
+        model = helper.make_model(graph, **{'opset_imports': [helper.make_opsetid('', 13)]})
+        datasets = Datasets('onnxrt_qlinearops')
+        dataset = datasets['dummy'](shape=(16, 4, 8), low=-1., high=1., label=True)
+        dataloader = DATALOADERS['onnxrt_qlinearops'](dataset)
+        inputs = np.abs(np.concatenate([data for data, _ in dataloader]).reshape(-1, 8))
+        for num_workers in [1, 2]:
+            augment = ONNXRTAugment(ONNXModel(model), dataloader, [], num_workers=num_workers)
+            max_vals_per_channel, shape_infos = augment.calib_smooth(99.9, ['MatMul'])
+            self.assertEqual(shape_infos['A'], (1, 4, 8))
+            self.assertEqual(max_vals_per_channel['A'].dtype, np.single)
+            np.testing.assert_allclose(max_vals_per_channel['A'], np.percentile(inputs, 99.9, axis=0),
+                                       atol=2 * inputs.max() / 2048)
+
     def test_augment_graph(self):
 
         ''' TEST_CONFIG_1'''
@@ -734,6 +734,42 @@ class TestPytorchAdaptor(unittest.TestCase):
         get_ops_recursively(model, '', op_map)
         self.assertTrue(op_map['conv1'] == 'Conv2d')
 
+    def test_observer_stats(self):
+        from collections import OrderedDict
+        from neural_compressor.adaptor.torch_utils.observer_stats import ObserverStats
+        model = torch.nn.Sequential(QuantStub(), torch.nn.Conv2d(3, 2, 1), torch.nn.ReLU(), DeQuantStub()).eval()
+        data = [torch.randn(1, 3, 4, 4) for _ in range(3)]
+
+        def prepare(observer):
+            q_model = copy.deepcopy(model)
+            q_model.qconfig = torch.quantization.QConfig(activation=observer,
+                                                         weight=torch.quantization.default_weight_observer)
+            torch.quantization.prepare(q_model, inplace=True)
+            return q_model, OrderedDict((name, module) for name, module in q_model.named_modules() \
+                                        if isinstance(module, torch.quantization.ObserverBase))
+
+        observer_stats = ObserverStats()
+        key = ObserverStats.get_key(model, data, 3, 3)
+        q_model, observers = prepare(torch.quantization.MinMaxObserver)
+        self.assertFalse(observer_stats.restore(key, observers))
+        with observer_stats.collect(key, observers):
+            for x in data:
+                q_model(x)
+        # the minmax and kl observers are restored from the statistics without the data
+        for observer in [torch.quantization.MinMaxObserver, torch.quantization.HistogramObserver]:
+            _, restored_observers = prepare(observer)
+            self.assertTrue(observer_stats.restore(key, restored_observers))
+            calib_model, calib_observers = prepare(observer)
+            for x in data:
+                calib_model(x)
+            for name, calib_observer in calib_observers.items():
+                self.assertEqual(restored_observers[name].calculate_qparams(),
+                                 calib_observer.calculate_qparams())
+        # the statistics are dropped once the weights are changed
+        with torch.no_grad():
+            model[1].weight.add_(1.)
+        self.assertFalse(observer_stats.restore(ObserverStats.get_key(model, data, 3, 3), observers))
+
     def test_forward_wrapper(self):
         vision_model = resnet18()
         class dummymodel(torch.nn.Module):
@@ -1,8 +1,10 @@
+import copy
 import os
 import shutil
 import unittest
 import tensorflow as tf
 import numpy as np
+from unittest import mock
 
 def build_msev2_yaml():
     mse_yaml = '''
@@ -132,5 +134,38 @@ class TestGetOutputTensor(unittest.TestCase):
         self.assertNotIn(('op_to_store', 'conv2d'), op_sensitivity)
         self.assertIn(('Conv2D', 'conv2d'), op_sensitivity)
 
+    def test_estimate_mse_order(self):
+        from neural_compressor.experimental import Quantization, common
+
+        quantizer = Quantization("mse_yaml.yaml")
+        quantizer.model = self.model
+        dataset = quantizer.dataset('dummy', (100, 3, 3, 1), label=True)
+        quantizer.calib_dataloader = common.DataLoader(dataset)
+        quantizer.eval_dataloader = common.DataLoader(dataset)
+        quantizer.pre_process()
+
+        dataloader = quantizer._calib_dataloader
+        adaptor = quantizer.strategy.adaptor
+        tune_cfg = quantizer.strategy._tune_cfg_converter(next(quantizer.strategy.next_tune_cfg()))
+        ops_list = [('op_to_store', 'conv2d'), ('Conv2D', 'conv2d')]
+        q_model = adaptor.quantize(copy.deepcopy(tune_cfg), quantizer.model, dataloader)
+
+        # the Dequantize after the quantized conv is named after the fp32 op
+        boundaries = adaptor._get_boundary_tensors(
+            quantizer.model.graph_def, q_model.graph_def, ops_list)
+        self.assertIsNotNone(boundaries)
+        for op in ops_list:
+            self.assertIn(op, boundaries)
+
+        # the model is quantized once for all the ops
+        adaptor.quantize = mock.Mock(wraps=adaptor.quantize)
+        fp32_op_cfg = {'activation': {'dtype': 'fp32', 'quant_mode': 'fp32'},
+                       'weight': {'dtype': 'fp32'}}
+        mse_result = adaptor._get_mse_order(
+            quantizer.model, copy.deepcopy(tune_cfg), {op: fp32_op_cfg for op in ops_list},
+            ops_list, dataloader, ["Conv2D_dummy_biasadd"], 1)
+        self.assertEqual(adaptor.quantize.call_count, 1)
+        self.assertEqual(set(mse_result), set(ops_list))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -144,6 +144,19 @@ class TestGraph_util(unittest.TestCase):
         assert new_add_node in list(result_graph.node)
 
 
+    def test_query_multi_fusion_pattern_nodes(self):
+        graph_analyzer = GraphAnalyzer()
+        graph_analyzer.graph = copy.deepcopy(self.graph_def)
+        graph_analyzer.parse_graph()
+        patterns = [[['Add'], ['Mul'], ['Rsqrt'], ('Relu',)], [['Mul'], ['Rsqrt']],
+                    [['Add'], ['Mul'], ['Rsqrt'], ('Relu',)]]
+        res = graph_analyzer.query_multi_fusion_pattern_nodes(patterns)
+        self.assertEqual(res, [['add', 'mul', 'rsqrt', 'sqrt1', ['Add', 'Mul', 'Rsqrt', 'Relu']],
+                               ['mul', 'rsqrt', ['Mul', 'Rsqrt']]])
+        # the same as querying the patterns one by one
+        self.assertEqual(graph_analyzer.query_fusion_pattern_nodes(patterns[0]), res[:1])
+        self.assertEqual(graph_analyzer.query_fusion_pattern_nodes(patterns[1]), res[1:])
+
     def test_freeze_value_regrex(self):
         sample_str_1 = ';efficientnet-b3/model/blocks_14/se/conv2d/Conv2D_eightbit_requant_range__print__;__requant_min_max:[-2.35420851e+09][2.59383834e+09]'
         sample_str_2 = ';efficientnet-b3/model/blocks_15/se/conv2d/Conv2D_eightbit_requant_range__print__;__requant_min_max:[-1.254][2.59383834]'
@@ -154,5 +167,22 @@ class TestGraph_util(unittest.TestCase):
         self.assertNotEqual(res_1, None)
         self.assertNotEqual(res_2, None)
 
+    def test_gen_sampling_data(self):
+        messages = [';conv_eightbit_max_input__print__;__max:',
+                    ';conv_eightbit_min_input__print__;__min:',
+                    ';conv_eightbit_requant_range__print__;__requant_max:',
+                    ';conv_eightbit_requant_range__print__;__requant_min:']
+        sampling_values = [[np.float32(1.23456789), np.float32(-0.5), np.float32(6.), np.float32(0.1)],
+                           [np.float32(2.5e-06), np.float32(-1e-07), np.float32(3.), np.float32(-2.)]]
+        res = GraphRewriterHelper.gen_sampling_data(messages, sampling_values)
+        self.assertEqual(len(res), 6)
+        # the fetched values aren't rounded as the printed ones
+        self.assertEqual(res[0], ';conv_eightbit_max_input__print__;__max:[{!r}]'.format(
+            float(np.float32(1.23456789))))
+        self.assertEqual(res[2], ';conv_eightbit_requant_range__print__;__requant_min_max:[0][6.0]')
+        self.assertEqual(res[5], ';conv_eightbit_requant_range__print__;__requant_min_max:[-2.0][3.0]')
+        for line in res[:2] + res[3:5]:
+            self.assertIsNotNone(re.search(r"__print__;__m(ax|in):\[\-?\d+\.?\d*e?-?\+?\d*\]", line))
+
 if __name__ == "__main__":
     unittest.main()
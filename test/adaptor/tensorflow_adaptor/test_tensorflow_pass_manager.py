@@ -0,0 +1,66 @@
+import unittest
+
+from tensorflow.core.framework import graph_pb2
+from tensorflow.core.framework import node_def_pb2
+
+from neural_compressor.adaptor.tf_utils.graph_rewriter.graph_base import GraphRewriterBase
+from neural_compressor.adaptor.tf_utils.graph_rewriter.pass_manager import PassManager
+
+
+class FakeReluToRelu6(GraphRewriterBase):
+    calls = 0
+
+    def __init__(self, model, suffix=''):
+        super().__init__(model)
+        self.suffix = suffix
+
+    def do_transformation(self):
+        FakeReluToRelu6.calls += 1
+        graph_def = graph_pb2.GraphDef()
+        graph_def.CopyFrom(self.model)
+        for node in graph_def.node:
+            if node.op == 'Relu':
+                node.op = 'Relu6'
+                node.name += self.suffix
+        return graph_def
+
+
+class TestPassManager(unittest.TestCase):
+    def build_graph(self):
+        graph_def = graph_pb2.GraphDef()
+        input_node = node_def_pb2.NodeDef()
+        input_node.name = 'input'
+        input_node.op = 'Placeholder'
+        relu_node = node_def_pb2.NodeDef()
+        relu_node.name = 'relu'
+        relu_node.op = 'Relu'
+        relu_node.input.append('input')
+        graph_def.node.extend([input_node, relu_node])
+        return graph_def
+
+    def test_pass_manager(self):
+        FakeReluToRelu6.calls = 0
+        manager = PassManager(self.build_graph())
+        manager.run(FakeReluToRelu6, trigger_ops=('FusedBatchNorm',))
+        self.assertEqual(FakeReluToRelu6.calls, 0)
+        self.assertEqual(manager.skipped_passes, ['FakeReluToRelu6'])
+
+        graph_def = manager.run(FakeReluToRelu6, suffix='_6', trigger_ops=('Relu', 'Elu'))
+        self.assertEqual(FakeReluToRelu6.calls, 1)
+        self.assertEqual([node.name for node in graph_def.node], ['input', 'relu_6'])
+        # the op types are updated from the rewritten graph
+        self.assertTrue(manager.has_op('Relu6'))
+        self.assertFalse(manager.has_op('Relu'))
+        manager.run(FakeReluToRelu6, trigger_ops=('Relu',))
+        self.assertEqual(FakeReluToRelu6.calls, 1)
+
+        # the passes without trigger ops always run
+        manager.run(FakeReluToRelu6)
+        self.assertEqual(FakeReluToRelu6.calls, 2)
+        self.assertEqual(list(manager.pass_time.keys()), ['FakeReluToRelu6'])
+        self.assertGreaterEqual(manager.pass_time['FakeReluToRelu6'], 0)
+        manager.summary()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import shutil
+import unittest
+
+import tensorflow as tf
+
+from neural_compressor.adaptor.tf_utils.pre_optimize_cache import PreOptimizeCache
+
+
+def build_fake_graph_def(name='relu'):
+    tf.compat.v1.disable_eager_execution()
+    graph = tf.Graph()
+    with graph.as_default():
+        x = tf.compat.v1.placeholder(tf.float32, shape=(1, 3, 3, 1), name='x')
+        tf.nn.relu(x, name=name)
+    return graph.as_graph_def()
+
+
+class TestPreOptimizeCache(unittest.TestCase):
+    workspace = './saved_pre_optimize_cache'
+
+    @classmethod
+    def tearDownClass(self):
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def setUp(self):
+        PreOptimizeCache._memory.clear()
+
+    def test_get_key(self):
+        graph_def = build_fake_graph_def()
+        key = PreOptimizeCache.get_key(graph_def, device='cpu', itex_mode=False)
+        self.assertEqual(key, PreOptimizeCache.get_key(graph_def, itex_mode=False, device='cpu'))
+        self.assertNotEqual(key, PreOptimizeCache.get_key(graph_def, device='gpu', itex_mode=False))
+        self.assertNotEqual(key, PreOptimizeCache.get_key(build_fake_graph_def('relu_1'),
+                                                          device='cpu', itex_mode=False))
+
+    def test_disabled_cache(self):
+        # without a workspace nothing is kept, even in memory
+        cache = PreOptimizeCache()
+        key = cache.get_key(build_fake_graph_def())
+        cache.save(key, {'graph_def': build_fake_graph_def().SerializeToString()})
+        self.assertIsNone(cache.load(key))
+        self.assertEqual(len(PreOptimizeCache._memory), 0)
+
+    def test_memory_cache(self):
+        cache = PreOptimizeCache(self.workspace)
+        key = cache.get_key(build_fake_graph_def())
+        self.assertIsNone(cache.load(key))
+        entry = {'graph_def': build_fake_graph_def().SerializeToString()}
+        cache.save(key, entry)
+        # shared by the caches of the session
+        self.assertIs(PreOptimizeCache(self.workspace).load(key), entry)
+
+        for index in range(PreOptimizeCache.max_memory_entries):
+            cache.save(str(index), {})
+        self.assertNotIn(key, PreOptimizeCache._memory)
+        self.assertEqual(len(PreOptimizeCache._memory), PreOptimizeCache.max_memory_entries)
+
+    def test_workspace_cache(self):
+        cache = PreOptimizeCache(self.workspace)
+        key = cache.get_key(build_fake_graph_def())
+        graph_def = build_fake_graph_def()
+        cache.save(key, {'graph_def': graph_def.SerializeToString(), 'excluded_node_names': []})
+        self.assertTrue(os.path.exists(os.path.join(self.workspace, 'pre_optimize_cache',
+                                                    key + '.pkl')))
+
+        # a later run loads the entry from the workspace
+        PreOptimizeCache._memory.clear()
+        entry = PreOptimizeCache(self.workspace).load(key)
+        loaded_graph_def = tf.compat.v1.GraphDef()
+        loaded_graph_def.ParseFromString(entry['graph_def'])
+        self.assertEqual([node.name for node in loaded_graph_def.node],
+                         [node.name for node in graph_def.node])
+
+
+if __name__ == "__main__":
+    unittest.main()
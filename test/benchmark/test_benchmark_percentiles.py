@@ -0,0 +1,166 @@
+"""Tests for the latency percentiles of the benchmark."""
+import glob
+import json
+import os
+import re
+import shutil
+import unittest
+
+import numpy as np
+import onnx
+from onnx import helper, TensorProto
+
+from neural_compressor.benchmark import Benchmark, get_latency_percentiles
+from neural_compressor.benchmark import get_pareto_frontier, get_sweep_candidates
+from neural_compressor.benchmark import fit
+from neural_compressor.config import BenchmarkConfig
+from neural_compressor.data import Datasets
+from neural_compressor.data.dataloaders.dataloader import DataLoader
+
+
+def build_fake_model():
+    weight = helper.make_tensor('weight', TensorProto.FLOAT, [16, 8],
+                                np.random.random((16, 8)).astype(np.float32).flatten())
+    node = helper.make_node('MatMul', ['input', 'weight'], ['output'])
+    graph = helper.make_graph([node], 'test_graph',
+                              [helper.make_tensor_value_info('input', TensorProto.FLOAT, [None, 16])],
+                              [helper.make_tensor_value_info('output', TensorProto.FLOAT, [None, 8])],
+                              [weight])
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)])
+    model.ir_version = 8
+    onnx.save(model, 'fake_model.onnx')
+
+
+def build_benchmark():
+    seq = '''
+import onnx
+from neural_compressor.benchmark import fit
+from neural_compressor.config import BenchmarkConfig
+from neural_compressor.data import Datasets
+from neural_compressor.data.dataloaders.dataloader import DataLoader
+dataset = Datasets('onnxrt_qlinearops')['dummy'](shape=(100, 16), label=True)
+b_dataloader = DataLoader(framework='onnxrt_qlinearops', dataset=dataset, batch_size=2)
+conf = BenchmarkConfig(warmup=5, iteration=30, cores_per_instance=1, num_of_instance=1)
+fit(onnx.load('fake_model.onnx'), conf, b_dataloader=b_dataloader)
+    '''
+    with open('fake_percentiles.py', "w", encoding="utf-8") as f:
+        f.writelines(seq)
+    sweep_seq = seq.replace('import fit', 'import fit, sweep').replace(
+        'fit(onnx.load(\'fake_model.onnx\'), conf, b_dataloader=b_dataloader)',
+        'results = sweep(onnx.load(\'fake_model.onnx\'), conf, b_dataloader=b_dataloader, batch_sizes=[1, 4], '
+        'cores_per_instance=[1])\n'
+        'print(\'Sweep results: {}\'.format(len(results.get(\'sweep\', []))))\n'
+        'import os\n'
+        'print(\'Layout after sweep: {}\'.format([os.environ.get(name) for name in '
+        '[\'NUM_OF_INSTANCE\', \'CORES_PER_INSTANCE\', \'NC_BATCH_SIZE\']]))\n'
+        'results = fit(onnx.load(\'fake_model.onnx\'), conf, b_dataloader=b_dataloader)\n'
+        'print(\'Batch size after sweep: {}\'.format(results[\'batch_size\']))')
+    with open('fake_sweep.py', "w", encoding="utf-8") as f:
+        f.writelines(sweep_seq)
+
+
+class TestBenchmarkPercentiles(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        build_fake_model()
+        build_benchmark()
+
+    @classmethod
+    def tearDownClass(self):
+        # the sweep leaves the <num_of_instance>_<cores_per_instance>_<i> files of each layout
+        instance_files = glob.glob('[0-9]*_[0-9]*_[0-9]*.json') + glob.glob('[0-9]*_[0-9]*_[0-9]*.log')
+        for path in ['fake_model.onnx', 'fake_percentiles.py', 'fake_sweep.py'] + instance_files:
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree('nc_workspace', ignore_errors=True)
+
+    def test_get_latency_percentiles(self):
+        percentiles = get_latency_percentiles(np.arange(1, 1001))
+        self.assertEqual(list(percentiles.keys()), ['p50', 'p90', 'p99', 'p99.9'])
+        self.assertAlmostEqual(percentiles['p50'], 500.5)
+        self.assertAlmostEqual(percentiles['p99.9'], 999.001)
+        self.assertTrue(np.isnan(get_latency_percentiles([])['p50']))
+
+    def test_instance_result(self):
+        os.system("python fake_percentiles.py")
+        with open('1_1_0.json', 'r') as f:
+            result = json.load(f)
+        # the warmup iterations are excluded
+        self.assertEqual(len(result['latency_list']), 30 - 5)
+        self.assertEqual(result['batch_size'], 2)
+        # the percentiles are per batch as the latency of each iteration
+        percentiles = result['batch_latency_percentiles']
+        self.assertLessEqual(percentiles['p50'], percentiles['p99.9'])
+        self.assertAlmostEqual(percentiles['p50'], float(np.percentile(result['latency_list'], 50)))
+        self.assertAlmostEqual(result['throughput'], 1. / result['latency'])
+        with open('1_1_0.log', 'r') as f:
+            log = f.read()
+        self.assertIsNotNone(re.search(r"Latency p99\.9:\s+(\d+(\.\d+)?) ms/batch", log))
+
+    def test_summary_benchmark(self):
+        os.environ['NUM_OF_INSTANCE'] = '2'
+        os.environ['CORES_PER_INSTANCE'] = '1'
+        latency_lists = [[0.01] * 100, [0.02] * 99 + [1.]]
+        for i, latency_list in enumerate(latency_lists):
+            with open('2_1_{}.json'.format(i), 'w') as f:
+                json.dump({'batch_size': 2, 'latency': float(np.mean(latency_list)) / 2,
+                           'throughput': float(2. / np.mean(latency_list)),
+                           'latency_list': latency_list}, f)
+        try:
+            benchmark = Benchmark(BenchmarkConfig())
+            benchmark.summary_benchmark()
+        finally:
+            for i in range(2):
+                os.remove('2_1_{}.json'.format(i))
+            del os.environ['NUM_OF_INSTANCE']
+            del os.environ['CORES_PER_INSTANCE']
+        # the percentiles per batch are computed over the iterations of all the instances
+        percentiles = benchmark.results['batch_latency_percentiles']
+        self.assertAlmostEqual(percentiles['p50'], 0.015)
+        self.assertAlmostEqual(percentiles['p90'], 0.02)
+        self.assertGreater(percentiles['p99.9'], 0.5)
+
+    def test_sweep_candidates(self):
+        # 2 sockets of 4 cores, the instances don't cross the sockets
+        self.assertEqual(get_sweep_candidates(8, 2), [(8, 1, None), (4, 2, None), (2, 4, None), (1, 8, None)])
+        self.assertEqual(get_sweep_candidates(8, 2, [1, 16], cores_per_instance=[3, 4]),
+                         [(2, 4, 1), (2, 4, 16)])
+
+    def test_pareto_frontier(self):
+        results = [{'throughput': 100., 'p99': 0.01}, {'throughput': 200., 'p99': 0.02},
+                   {'throughput': 150., 'p99': 0.03}, {'throughput': 300., 'p99': float('nan')}]
+        self.assertEqual(get_pareto_frontier(results), results[:2])
+
+    def test_sweep(self):
+        # a single layout of 1 core per instance whatever the core count, with 2 batch sizes
+        with os.popen("python fake_sweep.py") as f:
+            output = f.read()
+        self.assertIn('Sweep results: 2', output)
+        # the swept layouts and batch sizes don't leak into the later benchmark
+        self.assertIn('Layout after sweep: [None, None, None]', output)
+        self.assertIn('Batch size after sweep: 2', output)
+
+    def test_fork_launcher(self):
+        dataset = Datasets('onnxrt_qlinearops')['dummy'](shape=(100, 16), label=True)
+        b_dataloader = DataLoader(framework='onnxrt_qlinearops', dataset=dataset, batch_size=2)
+        conf = BenchmarkConfig(warmup=5, iteration=30, cores_per_instance=1, num_of_instance=1,
+                               launcher='fork')
+        try:
+            # the instances are forked from the test process instead of running a script
+            results = fit(onnx.load('fake_model.onnx'), conf, b_dataloader=b_dataloader)
+            self.assertGreater(results['throughput'], 0)
+            self.assertEqual(results['batch_size'], 2)
+            self.assertNotEqual(os.environ.get('NC_ENV_CONF'), 'True')
+
+            # the error of an instance is raised in the parent process
+            bad_dataloader = DataLoader(framework='onnxrt_qlinearops', batch_size=2,
+                dataset=Datasets('onnxrt_qlinearops')['dummy'](shape=(100, 4), label=True))
+            with self.assertRaises(AssertionError):
+                fit(onnx.load('fake_model.onnx'), conf, b_dataloader=bad_dataloader)
+        finally:
+            for name in ['NUM_OF_INSTANCE', 'CORES_PER_INSTANCE', 'KMP_AFFINITY']:
+                os.environ.pop(name, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
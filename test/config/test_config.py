@@ -18,6 +18,7 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(config.recipes['dedicated_qdq_pair'], False)
         self.assertEqual(config.recipes['add_qdq_pair_to_weight'], False)
         self.assertEqual(config.recipes['graph_optimization_level'], None)
+        self.assertEqual(config.recipes['calibration_workers'], 1)
 
 class TestPyConf(unittest.TestCase):
     def test_config(self):
@@ -0,0 +1,123 @@
+"""Tests for the cache of preprocessed samples"""
+import gc
+import os
+import shutil
+import unittest
+from unittest import mock
+import numpy as np
+
+from neural_compressor.data import DataLoader, CachedDataset
+from neural_compressor.data.transforms.transform import ComposeTransform
+
+
+class ScaleTransform(object):
+    def __init__(self, scale):
+        self.scale = scale
+
+    def __call__(self, sample):
+        image, label = sample
+        return image * self.scale, label
+
+
+class RandomScaleTransform(ScaleTransform):
+    pass
+
+
+class CountingDataset(object):
+    def __init__(self, length=10, transform=None):
+        self.length = length
+        self.transform = transform
+        self.loaded = 0
+
+    def __getitem__(self, index):
+        self.loaded += 1
+        sample = (np.full([2, 3], index, dtype=np.float32), index)
+        if self.transform is not None:
+            sample = self.transform(sample)
+        return sample
+
+    def __len__(self):
+        return self.length
+
+
+class TestCachedDataset(unittest.TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree('./sample_cache', ignore_errors=True)
+
+    def test_cache(self):
+        dataset = CountingDataset(transform=ComposeTransform([ScaleTransform(2)]))
+        cached = CachedDataset(dataset, cache_dir='./sample_cache')
+        dataloader = DataLoader('onnxrt_qlinearops', cached, batch_size=4)
+        first = [data.copy() for data, _ in dataloader]
+        second = [data.copy() for data, _ in dataloader]
+        self.assertEqual(dataset.loaded, 10)
+        self.assertEqual((cached.hits, cached.misses), (10, 10))
+        for data, expected in zip(second, first):
+            np.testing.assert_array_equal(data, expected)
+        np.testing.assert_array_equal(cached[3][0], np.full([2, 3], 6))
+        with self.assertRaises(ValueError):
+            cached[3][0][0, 0] = 1
+        # a new transform chain misses the cache
+        dataset.transform = ComposeTransform([ScaleTransform(3)])
+        np.testing.assert_array_equal(cached[3][0], np.full([2, 3], 9))
+        self.assertEqual(dataset.loaded, 11)
+        # random transforms are not cached
+        dataset.transform = ComposeTransform([RandomScaleTransform(2)])
+        cached[3]
+        cached[3]
+        self.assertEqual(dataset.loaded, 13)
+
+    def test_spill(self):
+        dataset = CountingDataset(transform=ScaleTransform(2))
+        # room for 3 samples in memory
+        cached = CachedDataset(dataset, max_bytes=3 * 24, cache_dir='./sample_cache')
+        first = [cached[idx] for idx in range(10)]
+        self.assertEqual(cached.cached_bytes, 3 * 24)
+        self.assertEqual(len(cached._spilled), 7)
+        for idx in range(10):
+            data, label = cached[idx]
+            np.testing.assert_array_equal(data, first[idx][0])
+            self.assertEqual(label, idx)
+        self.assertEqual(dataset.loaded, 10)
+        cached.clear()
+        cached[0]
+        self.assertEqual(dataset.loaded, 11)
+
+        cached = CachedDataset(dataset, max_bytes=0, spill=False, cache_dir='./sample_cache')
+        cached[0]
+        cached[0]
+        self.assertEqual(dataset.loaded, 13)
+
+    def test_remove_stores(self):
+        dataset = CountingDataset(transform=ScaleTransform(2))
+        cached = CachedDataset(dataset, max_bytes=0, cache_dir='./sample_cache')
+        cached[0]
+        store_dir = cached._store_dir
+        self.assertTrue(os.path.isdir(store_dir))
+        cached.clear()
+        self.assertFalse(os.path.exists(store_dir))
+
+        # the stores of a dataset which isn't cleared are removed once it's collected
+        cached[0]
+        store_dir = cached._store_dir
+        del cached
+        gc.collect()
+        self.assertFalse(os.path.exists(store_dir))
+
+    def test_fingerprint_once(self):
+        dataset = CountingDataset(transform=ScaleTransform(2))
+        with mock.patch('neural_compressor.data.datasets.cached_dataset.get_transform_fingerprint',
+                        return_value='scale') as fingerprint:
+            cached = CachedDataset(dataset, cache_dir='./sample_cache')
+            for idx in range(10):
+                cached[idx]
+            self.assertEqual(fingerprint.call_count, 1)
+            # the fingerprint of a replaced transform is computed again
+            dataset.transform = ScaleTransform(3)
+            cached[0]
+            self.assertEqual(fingerprint.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
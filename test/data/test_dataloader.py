@@ -2,6 +2,7 @@
 import platform
 import unittest
 import os
+import threading
 import numpy as np
 import shutil
 from neural_compressor.utils.create_obj_from_config import create_dataset, create_dataloader
@@ -500,6 +501,116 @@ class TestImageFolder(unittest.TestCase):
             self.assertEqual(data[0][0].shape, (24,24,3))
             break
 
+class TestPrefetchDataloader(unittest.TestCase):
+    class IndexDataset(object):
+        def __init__(self, length=32):
+            self.length = length
+
+        def __getitem__(self, index):
+            if index >= self.length:
+                raise IndexError(index)
+            return np.full([4], index, dtype=np.float32), index
+
+        def __len__(self):
+            return self.length
+
+    def test_ordered_delivery(self):
+        from neural_compressor.data.dataloaders.default_dataloader import DefaultDataLoader
+        dataset = self.IndexDataset(length=30)
+        serial = list(DefaultDataLoader(dataset, batch_size=4))
+        for worker_type in ['thread', 'process']:
+            dataloader = DefaultDataLoader(dataset, batch_size=4, num_workers=3, worker_type=worker_type)
+            batches = list(dataloader)
+            self.assertEqual(len(batches), len(serial))
+            for (data, label), (serial_data, serial_label) in zip(batches, serial):
+                np.testing.assert_array_equal(data, serial_data)
+                self.assertEqual(list(label), list(serial_label))
+        dataloader = DefaultDataLoader(dataset, batch_size=4, last_batch='discard', num_workers=2)
+        self.assertEqual(len(list(dataloader)), 7)
+
+    def test_early_stop_and_error(self):
+        from neural_compressor.data.dataloaders.default_dataloader import DefaultDataLoader
+        dataloader = DefaultDataLoader(self.IndexDataset(length=100), batch_size=2, num_workers=2)
+        for idx, (_, label) in enumerate(dataloader):
+            if idx == 3:
+                break
+        self.assertEqual(list(label), [6, 7])
+
+        class BrokenDataset(self.IndexDataset):
+            def __getitem__(self, index):
+                if index == 5:
+                    raise ValueError("broken sample")
+                return super().__getitem__(index)
+        dataloader = DefaultDataLoader(BrokenDataset(length=10), batch_size=2, num_workers=2)
+        with self.assertRaises(ValueError):
+            list(dataloader)
+
+    def test_iterable_dataset(self):
+        from neural_compressor.data.dataloaders.default_dataloader import DefaultDataLoader
+        class IterDataset(object):
+            def __iter__(self):
+                for i in range(10):
+                    yield np.array([i]), i
+        dataloader = DefaultDataLoader(IterDataset(), batch_size=3, num_workers=4)
+        labels = [list(label) for _, label in dataloader]
+        self.assertEqual(labels, [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]])
+
+    def test_buffered_collate(self):
+        from neural_compressor.data import DefaultDataLoader, BufferedCollate
+        class DictDataset(self.IndexDataset):
+            def __getitem__(self, index):
+                data, label = super().__getitem__(index)
+                return {'input': data, 'mask': np.ones([2], dtype=np.int64)}, label
+        dataset = DictDataset(length=30)
+        serial = [(data['input'].copy(), list(label)) for data, label in
+                  DefaultDataLoader(dataset, batch_size=4)]
+        for num_workers, worker_type in [(0, 'thread'), (3, 'thread'), (3, 'process')]:
+            collate_fn = BufferedCollate()
+            dataloader = DefaultDataLoader(dataset, batch_size=4, num_workers=num_workers,
+                                           worker_type=worker_type, collate_fn=collate_fn)
+            for _ in range(2):
+                batches = [(data['input'].copy(), list(label), data['mask'].shape, data['input'].base)
+                           for data, label in dataloader]
+                self.assertEqual(len(batches), len(serial))
+                for (data, label, mask_shape, base), (serial_data, serial_label) in zip(batches, serial):
+                    np.testing.assert_array_equal(data, serial_data)
+                    self.assertEqual(label, serial_label)
+                    self.assertEqual(mask_shape, (len(label), 2))
+                    # the batches are views of the reused buffers
+                    self.assertIsNotNone(base)
+            if num_workers:
+                self.assertEqual(collate_fn.num_buffers, num_workers * 2 + 1)
+            self.assertEqual(collate_fn.shared, worker_type == 'process')
+
+    def test_overlap(self):
+        # the loading of the next batches overlaps with the consumer
+        from neural_compressor.data.dataloaders.default_dataloader import DefaultDataLoader
+        class GatedDataset(self.IndexDataset):
+            def __init__(self, length, gate):
+                super().__init__(length)
+                self.gate = gate
+                self.fetched = threading.Event()
+
+            def __getitem__(self, index):
+                if index >= self.gate:
+                    self.fetched.set()
+                return super().__getitem__(index)
+
+        # the samples of the third batch are only fetched once the consumer asks for them
+        dataset = GatedDataset(length=40, gate=8)
+        iterator = iter(DefaultDataLoader(dataset, batch_size=4))
+        next(iterator)
+        self.assertFalse(dataset.fetched.is_set())
+        self.assertEqual(len(list(iterator)), 9)
+
+        # the workers fetch them while the consumer still holds the first batch
+        dataset = GatedDataset(length=40, gate=8)
+        iterator = iter(DefaultDataLoader(dataset, batch_size=4, num_workers=4))
+        _, label = next(iterator)
+        self.assertTrue(dataset.fetched.wait(timeout=60))
+        self.assertEqual(list(label), [0, 1, 2, 3])
+        self.assertEqual(len(list(iterator)), 9)
+
 class TestDataloader(unittest.TestCase):
     def test_iterable_dataset(self):
         class iter_dataset(object):
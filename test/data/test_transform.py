@@ -962,6 +962,37 @@ class TestONNXTransfrom(unittest.TestCase):
         with self.assertRaises(ValueError):
             TestONNXTransfrom.transforms["RandomResizedCrop"](**args)
 
+    def testBatchTransform(self):
+        from neural_compressor.data import BatchTransformCollate
+        transforms = TestONNXTransfrom.transforms
+        compose = transforms['Compose']([
+            transforms['Resize'](size=[80]), transforms['CenterCrop'](size=[64, 60]),
+            transforms['Normalize'](mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+            transforms['Transpose'](perm=[2, 0, 1]), transforms['Cast'](dtype='float32')])
+        head, tail = compose.split_batch()
+        self.assertEqual(len(head.transform_list), 1)
+        self.assertEqual(len(tail.transform_list), 4)
+        images = [(np.random.random_sample([100, 90 + idx, 3]) * 255).astype(np.uint8) for idx in range(4)]
+        expected = np.stack([compose((image, None))[0] for image in images])
+        collate_fn = BatchTransformCollate(tail)
+        result, labels = collate_fn([head((image, idx)) for idx, image in enumerate(images)])
+        self.assertEqual(labels, (0, 1, 2, 3))
+        self.assertEqual(result.dtype, np.float32)
+        self.assertTrue((result == expected).all())
+        # the images of different sizes are transformed per sample
+        result, _ = collate_fn([(image, None) for image in images[:1] + [images[1][:95]]])
+        self.assertEqual(result.shape, (2, 3, 64, 60))
+
+        head, tail = transforms['Compose']([transforms['Resize'](size=[80])]).split_batch()
+        self.assertIsNone(tail)
+
+        # the transposes of the other frameworks don't inherit the numpy batch transform
+        from neural_compressor.data.transforms.transform import support_batch, \
+            TensorflowTranspose, MXNetTranspose, PyTorchTranspose
+        self.assertTrue(support_batch(transforms['Transpose'](perm=[2, 0, 1])))
+        for transpose in [TensorflowTranspose, MXNetTranspose, PyTorchTranspose]:
+            self.assertFalse(support_batch(transpose(perm=[2, 0, 1])))
+
 class TestImagenetTransform(unittest.TestCase):
     def testParseDecodeImagenet(self):
         random_array = np.random.random_sample([100,100,3]) * 255
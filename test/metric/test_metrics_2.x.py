@@ -858,6 +858,79 @@ class TestMetrics(unittest.TestCase):
         self.assertRaises(ValueError, acc.update, wrong_predictions, wrong_labels)
  
 
+    def test_ROC(self):
+        metrics = METRICS('pytorch')
+        roc = metrics['ROC']()
+        roc.update([[1, 0, 0, 1]], [[0, 1, 0, 0]])
+        self.assertEqual(roc.result(), 0.25)
+        roc.update([[1]], [[0]])
+        self.assertEqual(roc.result(), 0.2)
+        roc.reset()
+        roc.update([[1, 0, 0, 1]], [[0, 1, 0, 0]])
+        self.assertEqual(roc.result(), 0.25)
+
+        import sklearn.metrics
+        rng = np.random.default_rng(0)
+        acc_roc = metrics['ROC']()
+        roc, exact_roc = metrics['ROC'](return_auc=True), metrics['ROC'](return_auc=True, exact=True)
+        all_scores, all_targets = [], []
+        for _ in range(20):
+            targets = rng.integers(0, 2, [500, 1])
+            scores = np.clip(rng.normal(0.4 + 0.2 * targets, 0.2), 0, 1)
+            for metric in [acc_roc, roc, exact_roc]:
+                metric.update(scores, targets)
+            all_scores.append(scores)
+            all_targets.append(targets)
+        all_scores, all_targets = np.concatenate(all_scores), np.concatenate(all_targets)
+        expected_auc = sklearn.metrics.roc_auc_score(all_targets, all_scores)
+        self.assertEqual(exact_roc.result(), expected_auc)
+        self.assertAlmostEqual(roc.result(), expected_auc, places=4)
+        self.assertEqual(acc_roc.result(), sklearn.metrics.accuracy_score(all_targets, np.round(all_scores)))
+        # the histograms are the only state of the approximate mode
+        self.assertEqual(roc.pos_hist.sum() + roc.neg_hist.sum(), 10000)
+        self.assertIsNone(roc._scores)
+        # nothing but the accuracy counters is kept unless the area is returned
+        self.assertIsNone(acc_roc.pos_hist)
+        self.assertIsNone(acc_roc._scores)
+
+    def test_streaming_accuracy(self):
+        acc = METRICS('onnxrt_qlinearops')['Accuracy']()
+        acc.update([1, 0, 1, 1], [0, 1, 1, 1])
+        acc.update([[0.2, 0.8], [0.9, 0.1]], [1, 1])
+        self.assertEqual((acc.correct_num, acc.sample), (3, 6))
+        self.assertEqual(acc.result(), 0.5)
+        # (N, 1) predictions are compared with (N,) labels element-wise
+        acc.reset()
+        acc.update(np.array([[1], [0], [1]]), np.array([1, 1, 1]))
+        self.assertAlmostEqual(acc.result(), 2 / 3)
+
+    def test_topk_vectorized(self):
+        from neural_compressor.metric.metric import GeneralTopK, TensorflowTopK
+        rng = np.random.default_rng(0)
+        # rounded predictions to have ties
+        preds = np.round(rng.random((64, 20)), 1)
+        labels = rng.integers(0, 20, 64)
+        for k in (1, 5):
+            # reference of the general top-k, the ties are broken by the class index
+            order = np.argsort(-preds, axis=1, kind='stable')[:, :k]
+            expected = np.mean([label in row for row, label in zip(order, labels)])
+            topk = GeneralTopK(k=k)
+            topk.update(preds, labels)
+            self.assertEqual(topk.result(), expected)
+            # reference of tf.nn.in_top_k, the ties at the boundary are in the top k
+            target = preds[np.arange(64), labels]
+            expected = np.mean((preds > target[:, None]).sum(axis=1) < k)
+            topk = TensorflowTopK(k=k)
+            topk.update(preds, labels)
+            self.assertEqual(topk.result(), expected)
+        # the labels out of the class range are never correct
+        topk = GeneralTopK(k=5)
+        topk.update([[0.1, 0.2, 0.7], [0.3, 0.3, 0.4]], [3, 2])
+        self.assertEqual(topk.result(), 0.5)
+        topk = TensorflowTopK(k=5)
+        topk.update([[0.1, 0.2, 0.7], [0.3, 0.3, 0.4]], [3, 2])
+        self.assertEqual(topk.result(), 0.5)
+
     @unittest.skipIf(platform.system().lower() == "windows", "not support mxnet on windows yet")
     def test_mxnet_accuracy(self):
         metrics = METRICS('mxnet')
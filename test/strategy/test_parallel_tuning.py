@@ -0,0 +1,91 @@
+"""Tests for the local parallel tuning with a process pool"""
+
+import shutil
+import unittest
+import multiprocessing
+
+from neural_compressor import PostTrainingQuantConfig
+from neural_compressor.config import TuningCriterion
+from neural_compressor.quantization import fit
+from neural_compressor.strategy.utils.parallel import LocalComm, get_core_groups
+from tuning_test_utils import build_conv_model, build_ort_data
+
+
+@unittest.skipIf('fork' not in multiprocessing.get_all_start_methods(), "fork is not supported")
+class TestParallelTuning(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model = build_conv_model()
+        cls.dataloader = build_ort_data()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree('./nc_workspace', ignore_errors=True)
+
+    def _tune(self, strategy, parallel_workers, accuracy=0.5):
+        # count the evaluations of all the worker processes
+        evaluated = multiprocessing.get_context('fork').Value('i', 0)
+        def fake_eval(model):
+            with evaluated.get_lock():
+                evaluated.value += 1
+                return 1.0 if evaluated.value == 1 else accuracy
+        conf = PostTrainingQuantConfig(approach='static', quant_level=1,
+            tuning_criterion=TuningCriterion(strategy=strategy, max_trials=6,
+                                             strategy_kwargs={'parallel_workers': parallel_workers}))
+        q_model = fit(model=self.model, conf=conf, calib_dataloader=self.dataloader, eval_func=fake_eval)
+        return q_model, evaluated.value
+
+    def test_parallel_strategies(self):
+        for strategy in ['exhaustive', 'bayesian']:
+            _, serial_evals = self._tune(strategy, 0)
+            q_model, evals = self._tune(strategy, 2)
+            self.assertIsNone(q_model)
+            self.assertEqual(evals, serial_evals, strategy)
+
+    def test_parallel_best_model(self):
+        # only the tuning configs falling back one of the two convs meet the accuracy goal,
+        # the per-channel stage 1 config ranks above the per-tensor one to pick the same best
+        def fake_eval(model):
+            initializers = {init.name: init for init in model.graph.initializer}
+            quantized = [node for node in model.graph.node if node.op_type == 'QLinearConv']
+            if len(quantized) < 2:
+                return 1.0
+            per_channel = all(len(initializers[node.input[4]].dims) > 0 for node in quantized)
+            return 0.6 if per_channel else 0.5
+
+        q_models = []
+        for parallel_workers in [0, 2]:
+            conf = PostTrainingQuantConfig(approach='static', quant_level=1,
+                tuning_criterion=TuningCriterion(strategy='basic', max_trials=6,
+                    strategy_kwargs={'parallel_workers': parallel_workers}))
+            q_models.append(fit(model=self.model, conf=conf, calib_dataloader=self.dataloader,
+                                eval_func=fake_eval))
+        serial_model, parallel_model = q_models
+        self.assertIsNotNone(serial_model)
+        self.assertIsNotNone(parallel_model)
+        self.assertEqual(parallel_model.model.SerializeToString(), serial_model.model.SerializeToString())
+
+    def test_parallel_basic(self):
+        # the basic strategy dispatches the tuning configs of each stage together
+        q_model, evals = self._tune('basic', 2)
+        self.assertIsNone(q_model)
+        self.assertGreater(evals, 2)
+        q_model, evals = self._tune('basic', 2, accuracy=1.0)
+        self.assertIsNotNone(q_model)
+
+    def test_parallel_early_stop(self):
+        q_model, evals = self._tune('exhaustive', 2, accuracy=1.0)
+        self.assertIsNotNone(q_model)
+        # the baseline, the first trial meeting the goal and at most one trial in flight
+        self.assertLessEqual(evals, 3)
+
+    def test_utils(self):
+        groups = get_core_groups(2)
+        self.assertEqual(len(groups), 2)
+        self.assertFalse(set(groups[0]) & set(groups[1]))
+        comm = LocalComm(3)
+        self.assertEqual((comm.Get_rank(), comm.Get_size(), comm.bcast('cfg', root=0)), (0, 3, 'cfg'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""Tests for the pipelined quantize/evaluate traversal"""
+
+import shutil
+import threading
+import unittest
+from unittest import mock
+
+from neural_compressor import PostTrainingQuantConfig
+from neural_compressor.adaptor.onnxrt import ONNXRUNTIMEAdaptor
+from neural_compressor.config import TuningCriterion
+from neural_compressor.quantization import fit
+from tuning_test_utils import build_conv_model, build_ort_data
+
+
+class TestPipelinedTuning(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model = build_conv_model()
+        cls.dataloader = build_ort_data()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree('./nc_workspace', ignore_errors=True)
+
+    def _tune(self, strategy, pipeline_depth, accuracy=None, evaluated=None):
+        evaluated = [] if evaluated is None else evaluated
+        def fake_eval(model):
+            evaluated.append(model)
+            if accuracy is not None:
+                return accuracy(len(evaluated))
+            return 1.0 if len(evaluated) == 1 else 0.5
+        conf = PostTrainingQuantConfig(approach='static', quant_level=1,
+            tuning_criterion=TuningCriterion(strategy=strategy, max_trials=6,
+                                             strategy_kwargs={'pipeline_depth': pipeline_depth}))
+        q_model = fit(model=self.model, conf=conf, calib_dataloader=self.dataloader, eval_func=fake_eval)
+        return q_model, len(evaluated)
+
+    def test_pipelined_exhaustive(self):
+        serial_models = []
+        _, serial_evals = self._tune('exhaustive', 0, evaluated=serial_models)
+        for pipeline_depth in [1, 3]:
+            models = []
+            q_model, evals = self._tune('exhaustive', pipeline_depth, evaluated=models)
+            self.assertIsNone(q_model)
+            self.assertEqual(evals, serial_evals)
+            # the same quantized models are evaluated in the same order
+            self.assertEqual([model.SerializeToString() for model in models[1:]],
+                             [model.SerializeToString() for model in serial_models[1:]])
+
+    def test_pipelined_overlap(self):
+        original_quantize = ONNXRUNTIMEAdaptor.quantize
+        main_thread = threading.current_thread()
+        quantize_adaptors = []
+        quantized_ahead = threading.Event()
+
+        def quantize(adaptor, *args, **kwargs):
+            q_model = original_quantize(adaptor, *args, **kwargs)
+            if threading.current_thread() is not main_thread:
+                quantize_adaptors.append(adaptor)
+                if len(quantize_adaptors) == 2:
+                    quantized_ahead.set()
+            return q_model
+
+        def accuracy(evals):
+            if evals == 2:
+                # the next tuning config is quantized while the first trial is evaluated
+                self.assertTrue(quantized_ahead.wait(timeout=60))
+            return 1.0 if evals == 1 else 0.5
+
+        with mock.patch.object(ONNXRUNTIMEAdaptor, 'quantize', quantize):
+            self._tune('exhaustive', 1, accuracy=accuracy)
+        # the worker thread quantizes with its own adaptor
+        self.assertEqual(len(set(map(id, quantize_adaptors))), 1)
+
+    def test_shared_dataloader(self):
+        # the dataloader is used for both calibration and evaluation
+        class FakeMetric(object):
+            def __init__(self):
+                self.evals = 0
+
+            def update(self, preds, labels):
+                pass
+
+            def reset(self):
+                pass
+
+            def result(self):
+                self.evals += 1
+                return 1.0 if self.evals == 1 else 0.5
+
+        original_quantize = ONNXRUNTIMEAdaptor.quantize
+        main_thread = threading.current_thread()
+        worker_dataloaders = []
+
+        def quantize(adaptor, tune_cfg, model, data_loader, q_func=None):
+            if threading.current_thread() is not main_thread:
+                worker_dataloaders.append(data_loader)
+            return original_quantize(adaptor, tune_cfg, model, data_loader, q_func)
+
+        evals = []
+        for pipeline_depth in [0, 2]:
+            # the metric classes are registered by name
+            metric = type('FakeMetric{}'.format(pipeline_depth), (FakeMetric,), {})()
+            conf = PostTrainingQuantConfig(approach='static', quant_level=1,
+                tuning_criterion=TuningCriterion(strategy='exhaustive', max_trials=6,
+                    strategy_kwargs={'pipeline_depth': pipeline_depth}))
+            with mock.patch.object(ONNXRUNTIMEAdaptor, 'quantize', quantize):
+                q_model = fit(model=self.model, conf=conf, calib_dataloader=self.dataloader,
+                              eval_dataloader=self.dataloader, eval_metric=metric)
+            self.assertIsNone(q_model)
+            evals.append(metric.evals)
+        self.assertEqual(evals[0], evals[1])
+        # the worker thread calibrates with its own copy of the dataloader
+        self.assertTrue(len(worker_dataloaders) > 0)
+        for dataloader in worker_dataloaders:
+            self.assertIsNot(dataloader, self.dataloader)
+            self.assertIs(dataloader.dataset, self.dataloader.dataset)
+
+    def test_pipelined_early_stop(self):
+        # the pending quantization is cancelled once the accuracy goal is met
+        q_model, evals = self._tune('random', 2, accuracy=lambda n: 1.0)
+        self.assertIsNotNone(q_model)
+        self.assertEqual(evals, 2)
+
+    def test_unsupported_strategy(self):
+        _, serial_evals = self._tune('basic', 0)
+        q_model, evals = self._tune('basic', 2)
+        self.assertIsNone(q_model)
+        self.assertEqual(evals, serial_evals)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+"""Tests for the tuning history index and snapshot journal."""
+import copy
+import os
+import pickle
+import shutil
+import unittest
+from collections import OrderedDict
+
+from neural_compressor.conf.dotdict import DotDict
+from neural_compressor.strategy.mse import MSETuneStrategy
+from neural_compressor.strategy.strategy import TuneStrategy
+from neural_compressor.strategy.utils.utility import get_hashable
+from neural_compressor.utils.utility import get_tuning_history
+
+
+class FakeStrategy(TuneStrategy):
+    """Strategy with only the states used by the tuning history."""
+
+    def __init__(self, cfg, history_path):
+        self.cfg = cfg
+        self.history_path = history_path
+        self.tuning_history = []
+        self.baseline = (1.0, [0])
+        self.last_tune_result = None
+        self.best_tune_result = None
+
+    def next_tune_cfg(self):
+        pass
+
+
+class FakeMSEStrategy(MSETuneStrategy):
+    """MSE strategy with only the states used by the tuning history and its resume state."""
+
+    __init__ = FakeStrategy.__init__
+
+
+def build_tune_cfg(num_ops, dtype='int8'):
+    tune_cfg = {'op': OrderedDict(), 'calib_iteration': 1}
+    for i in range(num_ops):
+        tune_cfg['op'][('op_{}'.format(i), 'Conv')] = {
+            'weight': {'dtype': dtype, 'scheme': 'sym'},
+            'activation': {'dtype': dtype, 'algorithm': 'minmax'}}
+    return tune_cfg
+
+
+class TestTuningHistory(unittest.TestCase):
+    work_space = './tuning_history_test'
+
+    def setUp(self):
+        os.makedirs(self.work_space, exist_ok=True)
+        self.history_path = os.path.join(self.work_space, 'history.snapshot')
+        self.cfg = DotDict({'model': {'framework': 'onnxrt_qlinearops'},
+                            'tuning': {'random_seed': 1978, 'workspace': {'path': './a'}}})
+
+    def tearDown(self):
+        shutil.rmtree(self.work_space, ignore_errors=True)
+
+    def test_get_hashable(self):
+        tune_cfg = build_tune_cfg(4)
+        reordered = copy.deepcopy(tune_cfg)
+        reordered['op'] = OrderedDict(reversed(list(reordered['op'].items())))
+        self.assertEqual(hash(get_hashable(tune_cfg)), hash(get_hashable(reordered)))
+        self.assertNotEqual(get_hashable(tune_cfg), get_hashable(build_tune_cfg(4, 'fp32')))
+        self.assertEqual(get_hashable({'a': [1, {'b': 2}]}), get_hashable({'a': [1.0, {'b': 2}]}))
+
+    def test_find_tuning_history(self):
+        strategy = FakeStrategy(self.cfg, self.history_path)
+        tune_cfgs = [build_tune_cfg(100, dtype) for dtype in ['int8', 'fp32', 'bf16']]
+        self.assertIsNone(strategy._find_tuning_history(tune_cfgs[0]))
+        for i, tune_cfg in enumerate(tune_cfgs[:2]):
+            strategy._add_tuning_history(copy.deepcopy(tune_cfg), (i, [0]))
+        self.assertEqual(len(strategy.tuning_history), 1)
+        self.assertIs(strategy._find_tuning_history(tune_cfgs[1]), strategy.tuning_history[0])
+        self.assertEqual(strategy._find_history(tune_cfgs[1])['tune_result'], (1, [0]))
+        self.assertIsNone(strategy._find_tuning_history(tune_cfgs[2]))
+
+        # histories appended out of `_add_tuning_history` are indexed as well
+        strategy.tuning_history[0]['history'].append({'tune_cfg': tune_cfgs[2], 'tune_result': None})
+        self.assertIsNotNone(strategy._find_history(tune_cfgs[2]))
+
+        # the tuning section of yaml config is ignored
+        strategy.cfg = copy.deepcopy(self.cfg)
+        strategy.cfg.tuning.workspace.path = './b'
+        self.assertIsNotNone(strategy._find_tuning_history(tune_cfgs[0]))
+
+        # histories of another yaml config are not matched
+        strategy.cfg.model.framework = 'onnxrt_integerops'
+        self.assertIsNone(strategy._find_tuning_history(tune_cfgs[0]))
+        self.assertIsNone(strategy._find_self_tuning_history())
+        strategy._add_tuning_history(copy.deepcopy(tune_cfgs[0]), (0, [0]))
+        self.assertEqual(len(strategy.tuning_history), 2)
+        self.assertIs(strategy._find_tuning_history(tune_cfgs[0]), strategy.tuning_history[1])
+
+    def test_index_entries(self):
+        strategy = FakeStrategy(self.cfg, self.history_path)
+        frameworks = ['onnxrt_qlinearops', 'onnxrt_integerops', 'pytorch_fx']
+        for i, framework in enumerate(frameworks):
+            strategy.cfg = copy.deepcopy(self.cfg)
+            strategy.cfg.model.framework = framework
+            strategy._add_tuning_history(build_tune_cfg(10), (i, [0]))
+            index = strategy._tuning_history_index
+            # the new history is indexed once, without rebuilding the index
+            self.assertIs(strategy._get_tuning_history_index(), index)
+        entries = [entry for entries in index['yaml'].values() for entry in entries]
+        self.assertEqual(index['size'], len(frameworks))
+        self.assertEqual(len(entries), len(frameworks))
+        for position, entry in enumerate(sorted(entries, key=lambda entry: entry['position'])):
+            self.assertEqual(entry['position'], position)
+            self.assertIs(entry['tuning_history'], strategy.tuning_history[position])
+
+    def test_resume_rebuild_index(self):
+        strategy = FakeStrategy(self.cfg, self.history_path)
+        tune_cfg = build_tune_cfg(10)
+        strategy._add_tuning_history(copy.deepcopy(tune_cfg), (0, [0]))
+        resumed = FakeStrategy(copy.deepcopy(self.cfg), self.history_path)
+        self.assertIsNone(resumed._find_tuning_history(tune_cfg))
+        resumed.__setstate__(copy.deepcopy(strategy.__getstate__()))
+        self.assertIsNotNone(resumed._find_tuning_history(tune_cfg))
+
+    def test_snapshot_journal(self):
+        strategy = FakeStrategy(self.cfg, self.history_path)
+        for i in range(3):
+            strategy.last_tune_result = (i, [0])
+            strategy._add_tuning_history(build_tune_cfg(10, str(i)), (i, [0]), q_config={'id': i})
+        size = os.path.getsize(self.history_path)
+        strategy._add_tuning_history(build_tune_cfg(10, '3'), (3, [0]), q_config={'id': 3})
+        # each trial appends one record instead of rewriting the snapshot
+        self.assertLess(os.path.getsize(self.history_path) - size, size)
+        strategy.cfg = copy.deepcopy(self.cfg)
+        strategy.cfg.model.framework = 'onnxrt_integerops'
+        strategy._add_tuning_history(build_tune_cfg(10), (4, [0]))
+
+        tuning_history = get_tuning_history(self.history_path)
+        self.assertEqual(tuning_history, strategy.tuning_history)
+        self.assertEqual(len(tuning_history[0]['history']), 4)
+        self.assertEqual(tuning_history[0]['history'][3]['q_config'], {'id': 3})
+        self.assertEqual(tuning_history[0]['last_tune_result'], (2, [0]))
+
+        # the resumed strategy rewrites the whole tuning history in its own snapshot
+        resumed = FakeStrategy(copy.deepcopy(self.cfg), os.path.join(self.work_space, 'resumed'))
+        resumed.__setstate__({'tuning_history': tuning_history})
+        resumed._add_tuning_history(build_tune_cfg(10, '5'), (5, [0]))
+        self.assertEqual(len(get_tuning_history(resumed.history_path)[0]['history']), 5)
+
+        # snapshot of the pickled strategy object is still supported
+        with open(self.history_path, 'wb') as f:
+            pickle.dump(strategy, f)
+        self.assertEqual(get_tuning_history(self.history_path), strategy.tuning_history)
+
+    def test_resume_strategy_state(self):
+        strategy = FakeMSEStrategy(self.cfg, self.history_path)
+        for i in range(3):
+            strategy.ordered_ops = ['op_{}'.format(j) for j in range(i + 1)]
+            strategy._add_tuning_history(build_tune_cfg(10, str(i)), (i, [0]))
+        # the state of the last trial is saved in the appended record
+        tuning_history = get_tuning_history(self.history_path)
+        self.assertEqual(tuning_history[0]['ordered_ops'], ['op_0', 'op_1', 'op_2'])
+
+        resumed = FakeMSEStrategy(copy.deepcopy(self.cfg), os.path.join(self.work_space, 'resumed'))
+        resumed.ordered_ops = None
+        resumed.setup_resume({'tuning_history': tuning_history})
+        self.assertEqual(resumed.ordered_ops, ['op_0', 'op_1', 'op_2'])
+        # the state is kept in the snapshot of the resumed strategy as well
+        resumed._add_tuning_history(build_tune_cfg(10, '3'), (3, [0]))
+        self.assertEqual(get_tuning_history(resumed.history_path)[0]['ordered_ops'],
+                         ['op_0', 'op_1', 'op_2'])
+
+
+if __name__ == "__main__":
+    unittest.main()
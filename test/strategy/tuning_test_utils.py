@@ -0,0 +1,27 @@
+"""Shared models and dataloaders of the tuning tests"""
+
+import numpy as np
+
+from onnx import helper, TensorProto, numpy_helper
+from neural_compressor.data import Datasets, DATALOADERS
+
+
+def build_conv_model():
+    input = helper.make_tensor_value_info('input', TensorProto.FLOAT, [1, 3, 32, 32])
+    conv1_weight_initializer = numpy_helper.from_array(
+        np.random.randint(-1, 2, [3, 3, 3, 3]).astype(np.float32), name='conv1_weight')
+    conv1_node = helper.make_node('Conv', ['input', 'conv1_weight'], ['conv1_output'], name='conv1')
+    conv2_weight_initializer = numpy_helper.from_array(
+        np.random.randint(-1, 2, [5, 3, 3, 3]).astype(np.float32), name='conv2_weight')
+    conv2_node = helper.make_node('Conv', ['conv1_output', 'conv2_weight'], ['conv2_output'], name='conv2')
+    output = helper.make_tensor_value_info('conv2_output', TensorProto.FLOAT, [1, 5, 28, 28])
+    graph = helper.make_graph([conv1_node, conv2_node], 'test', [input], [output],
+        initializer=[conv1_weight_initializer, conv2_weight_initializer])
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    return model
+
+def build_ort_data():
+    datasets = Datasets('onnxrt_qlinearops')
+    cv_dataset = datasets['dummy'](shape=(4, 3, 32, 32), low=0., high=1., label=True)
+    cv_dataloader = DATALOADERS['onnxrt_qlinearops'](cv_dataset)
+    return cv_dataloader
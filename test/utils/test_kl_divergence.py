@@ -0,0 +1,186 @@
+"""Tests for the vectorized KL divergence threshold search."""
+import math
+import time
+import unittest
+
+import numpy as np
+
+from neural_compressor.utils import logger
+from neural_compressor.utils.kl_divergence import KL_Divergence
+from neural_compressor.utils.utility import get_tensor_histogram
+
+
+class ReferenceKL_Divergence(object):
+    """Verbatim copy of the list-based KL_Divergence before the vectorization."""
+    def __init__(self):
+        """Init a KL Divergence object."""
+        pass
+
+    def expand_quantized_bins(self, quantized_bins, reference_bins):
+        """Expand quantized bins."""
+        expanded_quantized_bins = [0] * len(reference_bins)
+        num_merged_bins = int(len(reference_bins) / len(quantized_bins))
+        j_start = 0
+        j_end = num_merged_bins
+        for idx in range(len(quantized_bins)):
+            zero_count = reference_bins[j_start:j_end].count(0)
+            num_merged_bins = j_end - j_start
+            if zero_count == num_merged_bins:
+                avg_bin_ele = 0
+            else:
+                avg_bin_ele = quantized_bins[idx] / (num_merged_bins -
+                                                     zero_count + 0.0)
+            for idx1 in range(j_start, j_end):
+                expanded_quantized_bins[
+                    idx1] = 0 if reference_bins[idx1] == 0 else avg_bin_ele
+            j_start += num_merged_bins
+            j_end += num_merged_bins
+            if idx + 1 == len(quantized_bins) - 1:
+                j_end = len(reference_bins)
+        return expanded_quantized_bins
+
+    def safe_entropy(self, reference_distr_P, P_sum, candidate_distr_Q, Q_sum):
+        """Safe entropy."""
+        assert len(reference_distr_P) == len(candidate_distr_Q)
+        tmp_sum1 = 0
+        tmp_sum2 = 0
+        for idx in range(len(reference_distr_P)):
+            p_idx = reference_distr_P[idx]
+            q_idx = candidate_distr_Q[idx]
+            if p_idx == 0:
+                tmp_sum1 += 0
+                tmp_sum2 += 0
+            else:
+                if q_idx == 0:
+                    print("Fatal error!, idx = " + str(idx) +
+                          " qindex = 0! p_idx = " + str(p_idx))
+                tmp_sum1 += p_idx * (math.log(Q_sum * p_idx))
+                tmp_sum2 += p_idx * (math.log(P_sum * q_idx))
+        return (tmp_sum1 - tmp_sum2) / P_sum
+
+    def get_threshold(self,
+                      hist,
+                      hist_edges,
+                      min_val,
+                      max_val,
+                      num_bins,
+                      quantized_type,
+                      num_quantized_bins=255):
+        """The interface of getting threshold per op using KL divergency algorithm."""
+        if min_val >= 0:
+            ending_iter = num_bins - 1
+            starting_iter = int(ending_iter * 0.7)
+        else:
+            th = max(abs(max_val), abs(min_val))
+            starting_iter = 0
+            ending_iter = num_bins - 1
+            if abs(max_val) > abs(min_val):
+                while starting_iter < ending_iter:
+                    if hist[starting_iter] == 0:
+                        starting_iter += 1
+                        continue
+                    else:
+                        break
+                starting_iter += int((ending_iter - starting_iter) * 0.6)
+            else:
+                while ending_iter > 0:
+                    if hist[ending_iter] == 0:
+                        ending_iter -= 1
+                        continue
+                    else:
+                        break
+                starting_iter = int(0.6 * ending_iter)
+
+        bin_width = hist_edges[1] - hist_edges[0]
+        min_kl_divergence = 0
+        min_kl_index = 0
+        kl_inited = False
+
+        for i in range(starting_iter, ending_iter + 1):
+            reference_distr_P = hist[0:i].tolist()
+            outliers_count = sum(hist[i:2048])
+            if reference_distr_P[i - 1] == 0:
+                continue
+            reference_distr_P[i - 1] += outliers_count
+            reference_distr_bins = reference_distr_P[:]
+            candidate_distr_Q = hist[0:i].tolist()
+            num_merged_bins = int(i / num_quantized_bins)
+            candidate_distr_Q_quantized = [0] * num_quantized_bins
+            j_start = 0
+            j_end = num_merged_bins
+
+            for idx in range(num_quantized_bins):
+                candidate_distr_Q_quantized[idx] = sum(
+                    candidate_distr_Q[j_start:j_end])
+                j_start += num_merged_bins
+                j_end += num_merged_bins
+                if idx + 1 == num_quantized_bins - 1:
+                    j_end = i
+            candidate_distr_Q = self.expand_quantized_bins(
+                candidate_distr_Q_quantized, reference_distr_bins)
+            P_sum = sum(reference_distr_P)
+            Q_sum = sum(candidate_distr_Q)
+            kl_divergence = self.safe_entropy(reference_distr_P, P_sum,
+                                              candidate_distr_Q, Q_sum)
+            if not kl_inited:
+                min_kl_divergence = kl_divergence
+                min_kl_index = i
+                kl_inited = True
+            elif kl_divergence < min_kl_divergence:
+                min_kl_divergence = kl_divergence
+                min_kl_index = i
+            else:
+                pass
+
+        if min_kl_index == 0:
+            while starting_iter > 0:
+                if hist[starting_iter] == 0:
+                    starting_iter -= 1
+                    continue
+                else:
+                    break
+            min_kl_index = starting_iter
+        return (min_kl_index + 0.5) * bin_width
+
+
+class TestKLDivergence(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        cls.hist_dict = {
+            'normal': get_tensor_histogram(rng.normal(size=20000) * 3),
+            'relu': get_tensor_histogram(np.maximum(rng.normal(size=20000), 0)),
+            'laplace': get_tensor_histogram(rng.laplace(size=5000)),
+            'negative': get_tensor_histogram(-np.abs(rng.standard_t(3, size=3000))),
+        }
+
+    def test_threshold_parity(self):
+        kl_algo = KL_Divergence()
+        reference_algo = ReferenceKL_Divergence()
+        reference_time = 0
+        vectorized_time = 0
+        for name, (hist, hist_edges, min_val, max_val, _) in self.hist_dict.items():
+            start = time.time()
+            expected = reference_algo.get_threshold(hist, hist_edges, min_val, max_val,
+                                                    len(hist), 'int8')
+            reference_time += time.time() - start
+            start = time.time()
+            threshold = kl_algo.get_threshold(hist, hist_edges, min_val, max_val,
+                                              len(hist), 'int8')
+            vectorized_time += time.time() - start
+            self.assertEqual(threshold, expected, name)
+        logger.info("KL threshold search: reference {:.3f}s, vectorized {:.3f}s".format(
+            reference_time, vectorized_time))
+
+    def test_degenerate_histogram(self):
+        kl_algo = KL_Divergence()
+        hist = np.zeros(2048, dtype=np.int64)
+        hist[1024] = 10
+        hist_edges = np.linspace(-1, 1, 2049)
+        threshold = kl_algo.get_threshold(hist, hist_edges, -1., 1., 2048, 'int8')
+        self.assertEqual(threshold, ReferenceKL_Divergence().get_threshold(
+            hist, hist_edges, -1., 1., 2048, 'int8'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Tests for the sequential evaluation with early stopping."""
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from neural_compressor.metric.metric import Accuracy, F1
+from neural_compressor.utils.create_obj_from_config import create_eval_func
+from neural_compressor.utils.sequential_evaluation import SequentialEvaluationDataLoader
+
+
+class FakeAdaptor(object):
+    """Adaptor whose model predicts the label with the given accuracy."""
+
+    def evaluate(self, model, dataloader, postprocess=None, metrics=None, measurer=None,
+                 iteration=-1, tensorboard=False, fp32_baseline=False):
+        for metric in metrics:
+            metric.reset()
+        for idx, (inputs, labels) in enumerate(dataloader):
+            preds = np.where(inputs < model, labels, 1 - labels)
+            for metric in metrics:
+                metric.update(preds, labels)
+            if idx + 1 == iteration:
+                break
+        return metrics[0].result()
+
+
+def build_dataloader(num_batches=100, batch_size=32, seed=0):
+    rng = np.random.default_rng(seed)
+    return [(rng.random(batch_size), rng.integers(0, 2, batch_size)) for _ in range(num_batches)]
+
+
+class TestSequentialEvaluation(unittest.TestCase):
+    def _evaluate(self, accuracy, accuracy_target=0.7, higher_is_better=True):
+        metric = Accuracy()
+        dataloader = SequentialEvaluationDataLoader(build_dataloader(), metric, accuracy_target,
+                                                    higher_is_better, chunk_batches=5)
+        result = FakeAdaptor().evaluate(accuracy, dataloader, metrics=[metric])
+        return result, dataloader
+
+    def test_early_stop(self):
+        result, dataloader = self._evaluate(0.3)
+        self.assertEqual(dataloader.decision, 'fail')
+        self.assertLessEqual(dataloader.batches, 20)
+        self.assertLess(result, 0.7)
+
+        result, dataloader = self._evaluate(0.95)
+        self.assertEqual(dataloader.decision, 'pass')
+        self.assertLessEqual(dataloader.batches, 20)
+        self.assertGreater(result, 0.7)
+
+        # lower is better
+        result, dataloader = self._evaluate(0.95, higher_is_better=False)
+        self.assertEqual(dataloader.decision, 'fail')
+
+    def test_undecided(self):
+        full_result = FakeAdaptor().evaluate(0.7, build_dataloader(), metrics=[Accuracy()])
+        result, dataloader = self._evaluate(0.7, accuracy_target=full_result)
+        self.assertIsNone(dataloader.decision)
+        self.assertEqual(dataloader.batches, 100)
+        self.assertEqual(result, full_result)
+        # the decision is reset by the next iteration
+        self.assertEqual(len(list(dataloader)), 100)
+
+    def test_create_eval_func(self):
+        metric = Accuracy()
+        sequential_eval = {'accuracy_target': 0.7, 'chunk_batches': 5}
+        eval_func = create_eval_func('onnxrt_qlinearops', build_dataloader(), FakeAdaptor(),
+                                     [metric], sequential_eval=sequential_eval)
+        self.assertLess(eval_func(0.3), 0.7)
+        self.assertLess(metric.sample, 100 * 32)
+        # multiple metrics are always fully evaluated
+        eval_func = create_eval_func('onnxrt_qlinearops', build_dataloader(), FakeAdaptor(),
+                                     [metric, Accuracy()], sequential_eval=sequential_eval)
+        eval_func(0.3)
+        self.assertEqual(metric.sample, 100 * 32)
+
+    def test_unsupported_metric(self):
+        # F1 is computed from all the predictions, the chunk metric can't be recovered
+        sequential_eval = {'accuracy_target': 0.7, 'chunk_batches': 5}
+        dataloader = build_dataloader()
+        adaptor = mock.Mock()
+        eval_func = create_eval_func('onnxrt_qlinearops', dataloader, adaptor, [F1()],
+                                     sequential_eval=sequential_eval)
+        eval_func(0.3)
+        self.assertIs(adaptor.evaluate.call_args[0][1], dataloader)
+
+        eval_func = create_eval_func('onnxrt_qlinearops', dataloader, adaptor, [Accuracy()],
+                                     sequential_eval=sequential_eval)
+        eval_func(0.3)
+        self.assertIsInstance(adaptor.evaluate.call_args[0][1], SequentialEvaluationDataLoader)
+
+
+if __name__ == "__main__":
+    unittest.main()